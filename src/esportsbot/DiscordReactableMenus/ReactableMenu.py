@@ -1,4 +1,5 @@
 import ast
+import json
 from typing import Dict, List, Any, Union
 
 import discord
@@ -81,7 +82,11 @@ class ReactableMenu:
     def deserialize_options(options) -> Dict[Union[Emoji, str], Any]:
         data = {}
         if isinstance(options, str):
-            options = ast.literal_eval(options)
+            try:
+                options = json.loads(options)
+            except ValueError:
+                # Options saved as the repr of a dict, rather than as JSON.
+                options = ast.literal_eval(options)
         for option in options:
             option_data = options.get(option)
             emoji = MultiEmoji(option_data.get("emoji"))
@@ -1,4 +1,4 @@
-from esportsbot.db_gateway import DBGatewayActions
+from esportsbot.db_gateway import AsyncDBGatewayActions
 from esportsbot.models import VoicemasterMaster, VoicemasterSlave
 
 
@@ -42,23 +42,23 @@ def user_id_from_mention(pre_clean_data: str) -> int:
     return int(pre_clean_data.lstrip("<@!").rstrip(">"))
 
 
-def get_whether_in_vm_parent(guild_id, channel_id):
+async def get_whether_in_vm_parent(guild_id, channel_id):
     """
     Get if the given channel is a voicemaster parent channel.
     :param guild_id: The ID of the guild to check in.
     :param channel_id: The ID of the channel to check if it is a parent channel.
     :return: True if the given channel ID is for a parent channel, False otherwise.
     """
-    in_parent = DBGatewayActions().get(VoicemasterMaster, guild_id=guild_id, channel_id=channel_id)
+    in_parent = await AsyncDBGatewayActions().get(VoicemasterMaster, guild_id=guild_id, channel_id=channel_id)
     return bool(in_parent)
 
 
-def get_whether_in_vm_child(guild_id, channel_id):
+async def get_whether_in_vm_child(guild_id, channel_id):
     """
     Get if the given channel is a voicemaster child channel.
     :param guild_id: The ID of the guild to check in.
     :param channel_id: The ID of the channel to check if it is a child channel.
     :return: True if the given channel ID is for a child channel, False otherwise.
     """
-    in_child = DBGatewayActions().get(VoicemasterSlave, guild_id=guild_id, channel_id=channel_id)
+    in_child = await AsyncDBGatewayActions().get(VoicemasterSlave, guild_id=guild_id, channel_id=channel_id)
     return bool(in_child)
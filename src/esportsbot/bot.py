@@ -1,6 +1,6 @@
-from esportsbot.lib import client, exceptions
+from esportsbot.lib import client, exceptions, metrics
 
-from esportsbot.db_gateway import DBGatewayActions
+from esportsbot.db_gateway import AsyncDBGatewayActions
 from esportsbot.models import GuildInfo
 
 from discord.ext.commands import CommandNotFound, MissingRequiredArgument
@@ -31,10 +31,10 @@ async def on_guild_join(guild):
     When the bot joins a new server, initialise the DB entry for that guild in the GuildInfo table in the DB.
     :param guild: The server the bot just joined.
     """
-    exists = DBGatewayActions().get(GuildInfo, guild_id=guild.id)
+    exists = await AsyncDBGatewayActions().get(GuildInfo, guild_id=guild.id)
     if not exists:
         db_item = GuildInfo(guild_id=guild.id)
-        DBGatewayActions().create(db_item)
+        await AsyncDBGatewayActions().create(db_item)
 
 
 @client.event
@@ -43,9 +43,9 @@ async def on_guild_remove(guild):
     When the bot leaves a server, remove the data in the GuildInfo table in the DB.
     :param guild: The server the bot just left.
     """
-    guild_from_db = DBGatewayActions().get(GuildInfo, guild_id=guild.id)
+    guild_from_db = await AsyncDBGatewayActions().get(GuildInfo, guild_id=guild.id)
     if guild_from_db:
-        DBGatewayActions().delete(guild_from_db)
+        await AsyncDBGatewayActions().delete(guild_from_db)
         print(client.STRINGS["guild_leave"].format(guild_name=guild.name))
 
 
@@ -57,6 +57,12 @@ async def on_command_error(ctx: Context, exception: Exception):
     :param Context ctx: A context summarising the message which caused the error
     :param Exception exception: The exception caused by the message in ctx
     """
+    metrics.COMMAND_ERRORS.inc(
+        cog=ctx.cog.qualified_name if ctx.cog else "",
+        command=ctx.command.qualified_name if ctx.command else "",
+        error=type(exception).__name__
+    )
+
     if isinstance(exception, MissingRequiredArgument):
         await ctx.message.reply(
             client.STRINGS["command_error_required_arguments"].format(
@@ -173,6 +173,42 @@ class AdminCog(commands.Cog):
         except commands.ExtensionNotLoaded:
             await context.send(f"The cog with name `{cog_name}` is not loaded.")
 
+    @dev_group.command(name="loop-stats", hidden=True)
+    async def loop_stats(self, context: commands.Context):
+        """
+        Get the event loop lag and the handlers that have blocked the event loop for the longest.
+        :param context: The context of the command.
+        """
+        monitor = self.bot.loop_monitor
+        if not monitor:
+            await context.send(self.STRINGS["loop_monitor_disabled"])
+            return
+
+        lag = monitor.lag_stats()
+        stats_embed = Embed(
+            title="Event Loop Stats",
+            description=f"Lag — current `{lag['current'] * 1000:.1f}ms`, average `{lag['average'] * 1000:.1f}ms`, "
+            f"max `{lag['max'] * 1000:.1f}ms`",
+            colour=Color.random()
+        )
+
+        for name, totals in monitor.worst_callbacks():
+            stats_embed.add_field(
+                name=name[-256:],
+                value=f"{totals['count']} times, {totals['total'] * 1000:.0f}ms total, {totals['max'] * 1000:.0f}ms max",
+                inline=False
+            )
+
+        if not monitor.slow_callback_totals:
+            stats_embed.add_field(
+                name="​",
+                value=f"No callbacks slower than {monitor.slow_callback_threshold * 1000:.0f}ms",
+                inline=False
+            )
+
+        stats_embed.set_footer(text=datetime.now().strftime("%m/%d/%Y, %H:%M:%S"))
+        await context.send(embed=stats_embed)
+
     @admin_group.command(name="set-rep")
     async def set_rep_perms(self, context: commands.Context, user: Member, *args):
         """
@@ -1,6 +1,6 @@
 from discord.ext import commands, tasks
 from discord import Embed
-from esportsbot.db_gateway import DBGatewayActions
+from esportsbot.db_gateway import AsyncDBGatewayActions
 from esportsbot.models import GuildInfo, DefaultRoles
 from esportsbot.base_functions import role_id_from_mention
 
@@ -56,7 +56,7 @@ class DefaultRoleCog(commands.Cog):
 
     async def apply_roles(self, member):
         # Get all the default role for the server from database
-        guild_default_roles = DBGatewayActions().list(DefaultRoles, guild_id=member.guild.id)
+        guild_default_roles = await AsyncDBGatewayActions().list(DefaultRoles, guild_id=member.guild.id)
         # Check to see if any roles exist
         if guild_default_roles:
             # Create list of roles from database response
@@ -112,7 +112,7 @@ class DefaultRoleCog(commands.Cog):
                     checking_error = True
             if not checking_error:
                 for role in checked_roles:
-                    DBGatewayActions().create(DefaultRoles(guild_id=ctx.author.guild.id, role_id=role))
+                    await AsyncDBGatewayActions().create(DefaultRoles(guild_id=ctx.author.guild.id, role_id=role))
                 await ctx.channel.send(self.STRINGS['default_roles_set'].format(roles=args))
                 await self.bot.admin_log(
                     responsible_user=ctx.author,
@@ -135,7 +135,7 @@ class DefaultRoleCog(commands.Cog):
         :param ctx: The context of the command.
         """
         # Get all the default role for the server from database
-        guild_default_roles = DBGatewayActions().list(DefaultRoles, guild_id=ctx.author.guild.id)
+        guild_default_roles = await AsyncDBGatewayActions().list(DefaultRoles, guild_id=ctx.author.guild.id)
         # Check to see if any roles exist
         if guild_default_roles:
             # Create list of roles from database response
@@ -155,12 +155,12 @@ class DefaultRoleCog(commands.Cog):
         :param ctx: The context of the command.
         """
         # Get all the default role for the server from database
-        guild_default_roles = DBGatewayActions().list(DefaultRoles, guild_id=ctx.author.guild.id)
+        guild_default_roles = await AsyncDBGatewayActions().list(DefaultRoles, guild_id=ctx.author.guild.id)
         # Check to see if any roles exist
         if guild_default_roles:
             for default_role in guild_default_roles:
                 # Remove the current role
-                DBGatewayActions().delete(default_role)
+                await AsyncDBGatewayActions().delete(default_role)
             # Return a response to the user
             await ctx.channel.send(self.STRINGS['default_role_removed'])
             await self.bot.admin_log(
@@ -9,7 +9,7 @@ from discord.ext import commands
 from esportsbot.DiscordReactableMenus.EventReactMenu import EventReactMenu
 from esportsbot.DiscordReactableMenus.ExampleMenus import ActionConfirmationMenu
 from esportsbot.DiscordReactableMenus.reactable_lib import get_menu
-from esportsbot.db_gateway import DBGatewayActions
+from esportsbot.db_gateway import AsyncDBGatewayActions
 from esportsbot.lib.discordUtil import get_attempted_arg
 from esportsbot.models import EventCategories, DefaultRoles
 
@@ -42,7 +42,7 @@ class EventCategoriesCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.user_strings = bot.STRINGS["event_categories"]
-        self.db = DBGatewayActions()
+        self.db = AsyncDBGatewayActions()
         self.event_menus = defaultdict(dict)
         self.logger = logging.getLogger(__name__)
         self.logger.info(f"Loaded {__name__}!")
@@ -77,7 +77,7 @@ class EventCategoriesCog(commands.Cog):
         :param guild_id: The ID of the guild to load the event menus of .
         :return: A Dictionary of the event menus in the guild .
         """
-        raw_events = self.db.list(EventCategories, guild_id=guild_id)
+        raw_events = await self.db.list(EventCategories, guild_id=guild_id)
 
         to_load = []
 
@@ -92,7 +92,7 @@ class EventCategoriesCog(commands.Cog):
         events = {}
         for event in loaded_events:
             if isinstance(event, dict):
-                self.delete_event_data(event.get("guild_id"), event.get("id"))
+                await self.delete_event_data(event.get("guild_id"), event.get("id"))
             elif isinstance(event, EventReactMenu):
                 events[event.id] = event
 
@@ -127,24 +127,24 @@ class EventCategoriesCog(commands.Cog):
             # IF the event name given is None, try to find the latest menu.
             return get_menu(guild_events, event_name)
 
-    def update_event(self, guild_id, event_menu):
+    async def update_event(self, guild_id, event_menu):
         """
         Updates the DB with the latest event data .
         :param guild_id: The ID of the guild the event is in .
         :param event_menu: The Reaction Menu instance of the event that has been updated .
         """
-        db_item = self.db.get(EventCategories, guild_id=guild_id, event_id=event_menu.id)
+        db_item = await self.db.get(EventCategories, guild_id=guild_id, event_id=event_menu.id)
         db_item.event_menu = event_menu.to_dict()
-        self.db.update(db_item)
+        await self.db.update(db_item)
 
-    def delete_event_data(self, guild_id, event_id):
+    async def delete_event_data(self, guild_id, event_id):
         """
         Deletes an event menu's data from the DB.
         :param guild_id: The ID of the guild where the event is in .
         :param event_id: The ID of the event in the guild .
         """
-        db_item = self.db.get(EventCategories, guild_id=guild_id, event_id=event_id)
-        self.db.delete(db_item)
+        db_item = await self.db.get(EventCategories, guild_id=guild_id, event_id=event_id)
+        await self.db.delete(db_item)
 
     @commands.group(name="events", invoke_without_command=True)
     async def event_command_group(self, context: commands.context):
@@ -168,7 +168,7 @@ class EventCategoriesCog(commands.Cog):
         audit_reason = "Done with `create-event` command"
 
         if not shared_role:
-            db_data = self.db.get(DefaultRoles, guild_id=context.guild.id)
+            db_data = await self.db.get(DefaultRoles, guild_id=context.guild.id)
             if not db_data or not db_data.role_id:
                 shared_role = context.guild.default_role
             else:
@@ -243,7 +243,7 @@ class EventCategoriesCog(commands.Cog):
             event_name=event_menu.title,
             event_menu=event_menu.to_dict()
         )
-        self.db.create(db_item)
+        await self.db.create(db_item)
 
         self.event_menus[context.guild.id][event_menu.id] = event_menu
         self.logger.info(f"Successfully created an event with the name {event_name} in {context.guild.name}!")
@@ -280,7 +280,7 @@ class EventCategoriesCog(commands.Cog):
             return
 
         await event_menu.enable_menu(self.bot)
-        self.update_event(context.guild.id, event_menu)
+        await self.update_event(context.guild.id, event_menu)
 
         signin_channel = event_menu.message.channel
         current_perms = signin_channel.overwrites
@@ -318,7 +318,7 @@ class EventCategoriesCog(commands.Cog):
             return
 
         await event_menu.disable_menu(self.bot)
-        self.update_event(context.guild.id, event_menu)
+        await self.update_event(context.guild.id, event_menu)
 
         signin_channel = event_menu.message.channel
         current_perms = signin_channel.overwrites
@@ -372,7 +372,7 @@ class EventCategoriesCog(commands.Cog):
 
         await event_role.delete(reason=audit_reason)
         self.event_menus[context.guild.id].pop(event_menu.id)
-        self.delete_event_data(guild_id=context.guild.id, event_id=event_menu.id)
+        await self.delete_event_data(guild_id=context.guild.id, event_id=event_menu.id)
 
         self.logger.info(f"Successfully deleted an event with the name {event_menu.title} in {context.guild.name}")
         await context.reply(self.user_strings["success_event_deleted"].format(event_name=event_menu.title))
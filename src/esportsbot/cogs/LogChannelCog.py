@@ -1,6 +1,6 @@
 from discord.ext import commands
 from esportsbot.base_functions import channel_id_from_mention
-from esportsbot.db_gateway import DBGatewayActions
+from esportsbot.db_gateway import AsyncDBGatewayActions
 from esportsbot.models import GuildInfo
 
 
@@ -17,17 +17,17 @@ class LogChannelCog(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def setlogchannel(self, ctx, given_channel_id=None):
         cleaned_channel_id = channel_id_from_mention(given_channel_id) if given_channel_id else ctx.channel.id
-        guild = DBGatewayActions().get(GuildInfo, guild_id=ctx.author.guild.id)
+        guild = await AsyncDBGatewayActions().get(GuildInfo, guild_id=ctx.author.guild.id)
         if not guild:
             db_item = GuildInfo(guild_id=ctx.guild.id, log_channel_id=cleaned_channel_id)
-            DBGatewayActions().create(db_item)
+            await AsyncDBGatewayActions().create(db_item)
         else:
             current_log_channel_id = guild.log_channel_id
             if current_log_channel_id == cleaned_channel_id:
                 await ctx.channel.send(self.STRINGS["channel_set_already"])
                 return
             guild.log_channel_id = cleaned_channel_id
-            DBGatewayActions().update(guild)
+            await AsyncDBGatewayActions().update(guild)
 
         await ctx.channel.send(self.STRINGS["channel_set"].format(channel_id=cleaned_channel_id))
         await self.bot.admin_log(
@@ -43,7 +43,7 @@ class LogChannelCog(commands.Cog):
     @commands.command(name="getlogchannel", usage="", help="Gets the server logging channel for bot actions")
     @commands.has_permissions(administrator=True)
     async def getlogchannel(self, ctx):
-        guild = DBGatewayActions().get(GuildInfo, guild_id=ctx.author.guild.id)
+        guild = await AsyncDBGatewayActions().get(GuildInfo, guild_id=ctx.author.guild.id)
         if not guild:
             await ctx.channel.send(self.STRINGS["channel_get_notfound"])
             return
@@ -56,14 +56,14 @@ class LogChannelCog(commands.Cog):
     @commands.command(name="removelogchannel", usage="", help="Removes the server logging channel for bot actions")
     @commands.has_permissions(administrator=True)
     async def removelogchannel(self, ctx):
-        guild = DBGatewayActions().get(GuildInfo, guild_id=ctx.author.guild.id)
+        guild = await AsyncDBGatewayActions().get(GuildInfo, guild_id=ctx.author.guild.id)
         if not guild:
             await ctx.channel.send(self.STRINGS["channel_get_notfound"])
             return
 
         if guild.log_channel_id:
             guild.log_channel_id = None
-            DBGatewayActions().update(guild)
+            await AsyncDBGatewayActions().update(guild)
             await ctx.channel.send(self.STRINGS["channel_removed"])
             await self.bot.admin_log(
                 responsible_user=ctx.author,
@@ -1,28 +1,36 @@
-import datetime
+import asyncio
 import functools
 import logging
 import os
 import re
 import sys
+import threading
 import time
-from enum import IntEnum
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from random import shuffle
 from urllib.parse import parse_qs, urlparse
 
 import googleapiclient.discovery
+import httplib2
 from yt_dlp import YoutubeDL
-from discord import (ClientException, Colour, Embed, FFmpegPCMAudio, PCMVolumeTransformer, TextChannel)
+from yt_dlp.utils import DownloadError
+from discord import (AudioSource, ClientException, Colour, Embed, FFmpegOpusAudio, NotFound, TextChannel)
 from discord.ext import commands, tasks
-from esportsbot.db_gateway import DBGatewayActions
+from esportsbot.db_gateway import AsyncDBGatewayActions, DBGatewayActions
+from esportsbot.lib.cache import TTLCache
 from esportsbot.lib.discordUtil import send_timed_message
-from esportsbot.models import MusicChannels
+from esportsbot.lib.track import Track
+from esportsbot.lib.youtube_urls import MessageTypeEnum, find_request_type, find_url_type
+from esportsbot.models import MusicChannels, MusicQueues
 from youtubesearchpython import VideosSearch
 
 
 # A discord command check that the command is in the music channel:
-def check_music_channel(context):
+async def check_music_channel(context):
     guild_id = context.guild.id
-    if guild_data := DBGatewayActions().get(MusicChannels, guild_id=guild_id):
+    if guild_data := await AsyncDBGatewayActions().get(MusicChannels, guild_id=guild_id):
         if channel_id := guild_data.channel_id:
             return context.channel.id == channel_id
     return False
@@ -52,12 +60,30 @@ class EmbedColours:
     music = Colour(0xd462fd)
 
 
-class MessageTypeEnum(IntEnum):
-    youtube_url = 0
-    youtube_playlist = 1
-    youtube_thumbnail = 2
-    string = 3
-    invalid = 4
+class TrackedSource(AudioSource):
+    """
+    Wraps the audio source of a song to keep track of how far through the song playback is, so that the song can be
+    restarted from the same point.
+    """
+    def __init__(self, source, start_at=0.0):
+        """
+        :param source: The audio source to play.
+        :param start_at: The number of seconds into the song the source starts at.
+        """
+        self.source = source
+        self.position = start_at
+
+    def read(self):
+        data = self.source.read()
+        if data:
+            self.position += AUDIO_FRAME_LENGTH
+        return data
+
+    def is_opus(self):
+        return self.source.is_opus()
+
+    def cleanup(self):
+        self.source.cleanup()
 
 
 EMPTY_QUEUE_MESSAGE = "Join a Voice Channel and search a song by name or paste a YouTube url.\n" \
@@ -78,20 +104,84 @@ YOUTUBE_API = googleapiclient.discovery.build("youtube", "v3", developerKey=GOOG
 
 FFMPEG_BEFORE_OPT = "-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5"
 
+# Songs are sent to discord as Opus. Streams that are already Opus are passed through without being decoded, but only when
+# played at the default volume. Any other stream, or any stream at another volume, is decoded and re-encoded by ffmpeg to
+# apply the volume, which costs several times the CPU of passing it through (see tests/test_opus_passthrough.py).
+DEFAULT_VOLUME = 1
+OPUS_BITRATE = 128  # kbps
+# The number of seconds of audio in each frame sent to discord.
+AUDIO_FRAME_LENGTH = 0.02
+
 TIMEOUT_DELAY = 60
 
+# Songs are advanced when they finish playing, the playing guilds are only checked on this interval in case that was missed.
+PLAYING_CHECK_INTERVAL = 30
+
+# yt-dlp extraction blocks for seconds at a time, so it is run in a bounded pool of threads shared by all guilds.
+EXTRACT_WORKERS = int(os.getenv("MUSIC_EXTRACT_WORKERS", "4"))
+EXTRACT_TIMEOUT = float(os.getenv("MUSIC_EXTRACT_TIMEOUT", "20"))  # Seconds before giving up on extracting a song.
+extract_executor = ThreadPoolExecutor(max_workers=EXTRACT_WORKERS, thread_name_prefix="yt_dlp")
+# Prefetches run in their own pool, so that slow or stuck prefetches in some guilds cannot hold every worker needed to start
+# the songs that are about to play.
+PREFETCH_WORKERS = int(os.getenv("MUSIC_PREFETCH_WORKERS", "2"))
+prefetch_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="yt_dlp_prefetch")
+
+# The number of songs at the front of each queue whose streams are extracted ahead of time, so that the next song can start
+# as soon as the current one ends.
+PREFETCH_COUNT = int(os.getenv("MUSIC_PREFETCH_COUNT", "2"))
+# Stream URLs stop working once they expire, so prefetched streams are extracted again this many seconds before then.
+STREAM_EXPIRY_MARGIN = 120
+# How long to trust a stream URL for if it does not say when it expires.
+DEFAULT_STREAM_LIFETIME = 3600
+
+# The songs chosen for text searches, shared by all guilds so that popular requests do not search YouTube again.
+QUERY_CACHE_SIZE = int(os.getenv("MUSIC_QUERY_CACHE_SIZE", "1024"))
+QUERY_CACHE_TTL = int(os.getenv("MUSIC_QUERY_CACHE_TTL", "21600"))
+query_cache: TTLCache[str, list] = TTLCache(QUERY_CACHE_SIZE, QUERY_CACHE_TTL)
+
+# The number of lines of a single guild's song requests that are looked up at the same time.
+REQUEST_CONCURRENCY = int(os.getenv("MUSIC_REQUEST_CONCURRENCY", "5"))
+
+# The queue and preview messages of a guild are edited at most once in this many seconds, with any changes made in between
+# shown together in the next edit.
+MESSAGE_UPDATE_WINDOW = float(os.getenv("MUSIC_MESSAGE_UPDATE_WINDOW", "1.5"))
+
+# The maximum number of songs queued from a single playlist request.
+PLAYLIST_LIMIT = int(os.getenv("MUSIC_PLAYLIST_LIMIT", "500"))
+# The number of songs the YouTube API returns in each page of a playlist.
+PLAYLIST_PAGE_SIZE = 50
+
+# The HTTP client used by the YouTube API is not thread safe, so each executor thread making YouTube requests uses its own.
+youtube_http = threading.local()
+
 
 class MusicCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.logger = logging.getLogger(__name__)
-        self.db = DBGatewayActions()
+        self.db = AsyncDBGatewayActions()
         self.user_strings = bot.STRINGS["music"]
         self.unhandled_error_string = bot.STRINGS["command_error_generic"]
         self.music_channels = self.load_channels()
         self.active_guilds = {}
         self.playing_guilds = []
-        self.inactive_guilds = {}
+        self.inactive_guilds = {}  # Guild ID: timer handle that disconnects the bot once the guild has been inactive too long
+        self.loading_songs = {}  # Guild ID: the task extracting the song that is about to play
+        self.prefetched_songs = {}  # Guild ID: {song link: task extracting the stream of the song}
+        self.request_limits = {}  # Guild ID: semaphore limiting the song requests being looked up at once
+        self.playlist_loads = {}  # Guild ID: set of tasks adding the remaining pages of playlists to the queue
+        self.pending_message_updates = {}  # Guild ID: task that will update the queue and preview messages
+        self.message_update_tasks = set()  # Every update task that has not finished, including those already rendering
+        self.last_message_updates = {}  # Guild ID: loop time the queue and preview messages were last updated
+        self.message_update_locks = {}  # Guild ID: lock held while the queue and preview messages are edited
+        self.music_messages = {}  # Guild ID: (queue message, preview message)
+        self.playing_sources = {}  # Guild ID: the audio source of the song currently playing
+        self.rendered_messages = {}  # Guild ID: (queue message content, preview message embed as a dict)
+        self.saved_queues = {}  # Guild ID: the MusicQueues record of the queue saved in the DB
+        self.saved_queue_hashes = {}  # Guild ID: hash of the queue as it was last saved in the DB
+        self.saved_queues_loaded = False
+        self.restorable_queues = {}  # Guild ID: the MusicQueues record loaded at startup, until the bot next joins the guild
+        self.bot.add_shutdown_task(self.save_all_queues)
         self.logger.info(f"Finished loading {__name__}... cog is ready!")
 
     def load_channels(self):
@@ -99,12 +189,48 @@ class MusicCog(commands.Cog):
         Loads the currently set music channels from the DB.
         :return: A dictionary of the guild and its music channel id.
         """
-        channels = self.db.list(MusicChannels)
+        # Called while the cog is loaded, before the event loop is running, so the blocking gateway is fine here.
+        channels = DBGatewayActions.list(MusicChannels)
         channels_dict = {}
         for channel in channels:
             channels_dict[channel.guild_id] = channel.channel_id
         return channels_dict
 
+    def cog_unload(self):
+        """
+        Save the queue of every active guild before the cog is removed, and cancel any timers and background tasks that
+        would otherwise keep running against the removed cog.
+        """
+        self.check_playing_guilds.cancel()
+        for task in self.message_update_tasks:
+            task.cancel()
+        self.message_update_tasks.clear()
+        self.pending_message_updates.clear()
+        for guild_id in list(self.inactive_guilds):
+            self.set_active(guild_id)
+        for guild_id in list(self.playlist_loads):
+            self.cancel_playlist_loads(guild_id)
+        for guild_id in list(self.prefetched_songs):
+            self.clear_prefetched_songs(guild_id)
+        for guild_id in list(self.loading_songs):
+            self.cancel_loading_song(guild_id)
+        self.bot.remove_shutdown_task(self.save_all_queues)
+        asyncio.ensure_future(self.save_all_queues())
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """
+        Load the queues that were saved before the bot last stopped. The songs are only added back to a queue the first time
+        the bot joins a voice channel in that guild again, and their streams are only found once they are played.
+        """
+        if self.saved_queues_loaded:
+            return
+        saved_queues = await self.db.list(MusicQueues)
+        self.saved_queues = {x.guild_id: x for x in saved_queues}
+        self.restorable_queues = dict(self.saved_queues)
+        self.saved_queues_loaded = True
+        self.logger.info(f"Loaded {len(self.saved_queues)} saved music queue(s)")
+
     @commands.Cog.listener()
     async def on_message(self, message):
         """
@@ -147,8 +273,8 @@ class MusicCog(commands.Cog):
             return
 
         if not before.channel and after.channel:
-            # Bot has joined a voice channel.
-            self.new_active_guild(after.channel.guild)
+            # Bot has joined a voice channel. The guild is usually registered by join_member already.
+            await self.guild_joined(after.channel.guild)
             return
 
         if before.channel and not after.channel:
@@ -162,16 +288,14 @@ class MusicCog(commands.Cog):
             return
 
     def run_tasks(self):
-        if not self.check_inactive_guilds.is_running() or self.check_inactive_guilds.is_being_cancelled():
-            self.check_inactive_guilds.start()
-
         if not self.check_playing_guilds.is_running() or self.check_playing_guilds.is_being_cancelled():
             self.check_playing_guilds.start()
 
-    @tasks.loop(seconds=5)
+    @tasks.loop(seconds=PLAYING_CHECK_INTERVAL)
     async def check_playing_guilds(self):
         """
-        Check the guilds who's voice client status is playing.
+        Check the guilds who's voice client status is playing. Songs are normally advanced by `song_finished` as soon as
+        they end, so this only catches songs whose end was missed, and refreshes the prefetched songs.
         """
         if not self.playing_guilds:
             # Stop running if no guilds playing.
@@ -181,50 +305,105 @@ class MusicCog(commands.Cog):
 
         to_remove = []
 
-        now = datetime.datetime.now()
-
         for guild_id in self.playing_guilds:
             if guild_id not in self.active_guilds:
                 # If the guild has been stopped from playing elsewhere it will no longer be in active guilds.
                 to_remove.append(guild_id)
                 continue
+            # Replace any prefetched streams that are about to expire.
+            self.prefetch_songs(guild_id)
             voice_client = self.active_guilds.get(guild_id).get("voice_client")
             if not voice_client.is_playing() and not voice_client.is_paused():
-                if not await self.play_queue(guild_id):
-                    # play queue will return False if there is nothing to play or if it was unable to play something.
-                    self.inactive_guilds[guild_id] = now
+                if not await self.play_queue(guild_id) and self.queue_empty(guild_id):
+                    # play queue will return False if there is nothing to play or if it was unable to play something. If
+                    # there are still songs left, they are tried again on the next check.
+                    self.set_inactive(guild_id)
                     to_remove.append(guild_id)
-                    self.run_tasks()
 
         for guild_id in to_remove:
-            self.playing_guilds.remove(guild_id)
+            if guild_id in self.playing_guilds:
+                self.playing_guilds.remove(guild_id)
 
-    @tasks.loop(seconds=60)
-    async def check_inactive_guilds(self):
+    def song_finished(self, guild_id, source, error):
         """
-        Check the guilds that are in a voice channel but not playing anything.
+        Called by the voice client from its audio thread when a song stops playing, to start the next song on the event loop.
+        :param guild_id: The ID of the guild the song was playing in.
+        :param source: The audio source of the song that stopped.
+        :param error: The error that stopped the song, if any.
+        """
+        if error:
+            self.logger.error(f"Playback stopped with an error in guild {guild_id}: {error!s}")
+        asyncio.run_coroutine_threadsafe(self.advance_queue(guild_id, source), self.bot.loop)
+
+    async def advance_queue(self, guild_id, finished_source):
         """
-        if not self.inactive_guilds:
-            # Stop running if no guilds active.
-            self.check_inactive_guilds.cancel()
-            self.check_inactive_guilds.stop()
+        Play the next song in the queue of a guild after its current song finished.
+        :param guild_id: The ID of the guild to play the next song in.
+        :param finished_source: The audio source of the song that finished.
+        """
+        if self.playing_sources.get(guild_id) is not finished_source:
+            # The song was stopped to play a different song, eg: it was skipped, so the queue was already advanced.
             return
+        self.playing_sources.pop(guild_id)
 
-        to_remove = []
+        if not await self.play_queue(guild_id) and self.queue_empty(guild_id):
+            # There is nothing left to play, so mark the guild as inactive. If songs are left but the next one could not be
+            # played, the guild stays playing so that `check_playing_guilds` tries the queue again.
+            if guild_id in self.playing_guilds:
+                self.playing_guilds.remove(guild_id)
+            if guild_id in self.active_guilds:
+                self.set_inactive(guild_id)
 
-        now = datetime.datetime.now()
+    def queue_empty(self, guild_id):
+        """
+        Check if a guild has no songs left to play.
+        :param guild_id: The ID of the guild to check the queue of.
+        :return: True if the guild is not active or its queue is empty, else False.
+        """
+        return guild_id not in self.active_guilds or len(self.active_guilds.get(guild_id).get("queue")) == 0
 
-        for guild_id in self.inactive_guilds:
-            if (now - self.inactive_guilds.get(guild_id)).seconds > TIMEOUT_DELAY:
-                # If the bot has been inactive for the given timeout delay.
-                to_remove.append(guild_id)
+    def stop_playing(self, guild_id):
+        """
+        Stop the song currently playing in a guild without advancing the queue.
+        :param guild_id: The ID of the guild to stop the song in.
+        """
+        self.playing_sources.pop(guild_id, None)
+        self.active_guilds.get(guild_id).get("voice_client").stop()
 
-        for guild_id in to_remove:
-            # These guilds have reached the timeout and should be disconnected.
-            self.inactive_guilds.pop(guild_id)
-            guild = self.active_guilds.get(guild_id).get("voice_channel").guild
-            await self.disconnect_from_guild(guild)
-            await self.remove_active_guild(guild)
+    def set_inactive(self, guild_id):
+        """
+        Mark a guild as not playing anything, so that the bot disconnects from it if it is still inactive after the timeout.
+        :param guild_id: The ID of the guild that became inactive.
+        """
+        self.set_active(guild_id)
+        self.inactive_guilds[guild_id] = self.bot.loop.call_later(TIMEOUT_DELAY, self.inactivity_timeout, guild_id)
+
+    def set_active(self, guild_id):
+        """
+        Mark a guild as playing again, cancelling its inactivity timeout.
+        :param guild_id: The ID of the guild that became active.
+        """
+        timeout = self.inactive_guilds.pop(guild_id, None)
+        if timeout:
+            timeout.cancel()
+
+    def inactivity_timeout(self, guild_id):
+        """
+        Called by the event loop once a guild has been inactive for the timeout delay, to disconnect from it.
+        :param guild_id: The ID of the guild that reached the timeout.
+        """
+        self.inactive_guilds.pop(guild_id, None)
+        if guild_id in self.active_guilds:
+            asyncio.ensure_future(self.disconnect_inactive_guild(guild_id))
+
+    async def disconnect_inactive_guild(self, guild_id):
+        """
+        Disconnect from a guild that reached the inactivity timeout.
+        :param guild_id: The ID of the guild to disconnect from.
+        """
+        guild = self.active_guilds.get(guild_id).get("voice_channel").guild
+        await self.disconnect_from_guild(guild)
+        await self.remove_active_guild(guild)
 
     def new_active_guild(self, guild):
         """
@@ -237,9 +416,9 @@ class MusicCog(commands.Cog):
         guild_data = {
             "voice_channel": guild.me.voice.channel,
             "voice_client": self.get_guild_client(guild),
-            "queue": [],
+            "queue": deque(),
             "current_song": None,
-            "volume": 1
+            "volume": DEFAULT_VOLUME
         }
         self.active_guilds[guild_id] = guild_data
         return guild_data
@@ -268,6 +447,101 @@ class MusicCog(commands.Cog):
             self.active_guilds[guild_id] = guild_data
             return guild_data
 
+    async def guild_joined(self, guild):
+        """
+        Register a guild the bot has just joined a voice channel in, keeping its queue if it was already registered, and
+        restore the queue saved before the bot last stopped if this is the first time the bot has joined the guild since.
+        :param guild: The guild the bot joined a voice channel in.
+        """
+        self.update_voice_client(guild)
+        if self.restore_queue(guild.id):
+            await self.update_messages(guild.id)
+
+    def restore_queue(self, guild_id):
+        """
+        Add the songs of the queue saved before the bot last stopped back into the queue of a guild. The song that was
+        playing is put back at the front of the queue. A saved queue can only be restored the first time the bot joins the
+        guild after loading it, before any new songs are queued, so an old queue is never mixed into a new one.
+        :param guild_id: The ID of the guild to restore the queue of.
+        :return: True if a saved queue was restored, else False.
+        """
+        saved_queue = self.restorable_queues.pop(guild_id, None)
+        guild_data = self.active_guilds.get(guild_id)
+        if saved_queue is None or guild_data is None or guild_data.get("queue"):
+            return False
+
+        songs = ([saved_queue.current_song] if saved_queue.current_song else []) + saved_queue.queue
+        guild_data["queue"].extend(Track.from_list(x) for x in songs)
+        guild_data["volume"] = saved_queue.volume
+        self.logger.info(f"Restored a saved queue of {len(songs)} song(s) in guild {guild_id}")
+        return True
+
+    async def save_queue(self, guild_id):
+        """
+        Save the queue, current song and volume of a guild to the DB, if they have changed since they were last saved.
+        :param guild_id: The ID of the guild to save the queue of.
+        """
+        guild_data = self.active_guilds.get(guild_id)
+        if guild_data is None:
+            return
+
+        current_song = guild_data.get("current_song")
+        queue = guild_data.get("queue")
+        volume = guild_data.get("volume")
+        # Links identify songs, so the other details of each song do not need to be hashed.
+        queue_hash = hash((current_song.link if current_song else None, volume, tuple(x.link for x in queue)))
+        if self.saved_queue_hashes.get(guild_id) == queue_hash:
+            return
+
+        try:
+            saved_queue = self.saved_queues.get(guild_id)
+            if not current_song and not queue:
+                if saved_queue is not None:
+                    await self.db.delete(saved_queue)
+                    self.saved_queues.pop(guild_id)
+            elif saved_queue is None:
+                saved_queue = MusicQueues(
+                    guild_id=guild_id,
+                    current_song=current_song.to_list() if current_song else None,
+                    queue=[x.to_list() for x in queue],
+                    volume=volume
+                )
+                await self.db.create(saved_queue)
+                self.saved_queues[guild_id] = saved_queue
+            else:
+                saved_queue.current_song = current_song.to_list() if current_song else None
+                saved_queue.queue = [x.to_list() for x in queue]
+                saved_queue.volume = volume
+                await self.db.update(saved_queue)
+            self.saved_queue_hashes[guild_id] = queue_hash
+        except Exception as e:
+            self.logger.error(f"Unable to save the music queue of guild {guild_id}: {e!s}")
+
+    async def save_all_queues(self):
+        """
+        Save the queues of all the active guilds to the DB.
+        """
+        for guild_id in list(self.active_guilds):
+            async with self.message_update_locks.setdefault(guild_id, asyncio.Lock()):
+                await self.save_queue(guild_id)
+
+    async def forget_queue(self, guild_id):
+        """
+        Delete the saved queue of a guild from the DB. The guild must no longer be active, so that no new save is started.
+        :param guild_id: The ID of the guild to delete the saved queue of.
+        """
+        # Saves are made under the same lock, so a save that was in flight finishes before the queue is deleted rather than
+        # recreating it afterwards, and a pending save finds the guild is no longer active and does nothing.
+        async with self.message_update_locks.setdefault(guild_id, asyncio.Lock()):
+            self.saved_queue_hashes.pop(guild_id, None)
+            saved_queue = self.saved_queues.pop(guild_id, None)
+            if saved_queue is None:
+                return
+            try:
+                await self.db.delete(saved_queue)
+            except Exception as e:
+                self.logger.error(f"Unable to delete the saved music queue of guild {guild_id}: {e!s}")
+
     def get_guild_client(self, guild):
         """
         Get a voice client of the bot in a given guild.
@@ -287,9 +561,18 @@ class MusicCog(commands.Cog):
         :return: A boolean if the removal was successful.
         """
         self.logger.info(f"Removing active channel for {guild.name}")
+        self.cancel_loading_song(guild.id)
+        self.cancel_playlist_loads(guild.id)
+        self.clear_prefetched_songs(guild.id)
+        self.set_active(guild.id)
+        self.playing_sources.pop(guild.id, None)
+        self.request_limits.pop(guild.id, None)
         try:
             self.active_guilds.pop(guild.id)
             await self.update_messages(guild.id)
+            if not self.bot.is_closed():
+                # The bot left the channel, rather than being stopped, so the queue is gone for good.
+                await self.forget_queue(guild.id)
             return True
         except AttributeError:
             return False
@@ -311,7 +594,7 @@ class MusicCog(commands.Cog):
         :param guild: The guild to find the music channel in.
         :return: A text channel if the text channel exists, else None.
         """
-        current_music_channel = self.db.get(MusicChannels, guild_id=guild.id)
+        current_music_channel = await self.db.get(MusicChannels, guild_id=guild.id)
         if not current_music_channel:
             return None
 
@@ -322,7 +605,7 @@ class MusicCog(commands.Cog):
         if not channel_instance:
             # Remove the currently set music channel as it doesn't exist anymore.
             current_music_channel.channel_id = None
-            self.db.update(current_music_channel)
+            await self.db.update(current_music_channel)
             return None
 
         return channel_instance
@@ -353,10 +636,7 @@ class MusicCog(commands.Cog):
             cleaned_requests = [k for k in request_options if k not in ('', ' ')]
 
             debug_start_time = time.time()
-            results = []
-            for request in cleaned_requests:
-                results.append(await self.process_request(message.guild.id, request))
-
+            results = await self.process_requests(message.guild.id, cleaned_requests)
             debug_end_time = time.time()
 
             self.logger.info(
@@ -380,8 +660,7 @@ class MusicCog(commands.Cog):
 
             # If any songs succeeded, ensure that the bot is not marked as inactive.
             if results.count(True) >= 1:
-                if message.guild.id in self.inactive_guilds:
-                    self.inactive_guilds.pop(message.guild.id)
+                self.set_active(message.guild.id)
 
             self.run_tasks()
 
@@ -398,107 +677,178 @@ class MusicCog(commands.Cog):
         :param request: The song requested.
         :return: True if the song was added to the queue successfully, else False.
         """
-        request_type = self.find_request_type(request)
-        if request_type == MessageTypeEnum.youtube_url or request_type == MessageTypeEnum.youtube_playlist:
-            # The request was a YouTube video or playlist
-            youtube_api_response = self.get_youtube_request(request, request_type)
-            formatted_response = self.format_youtube_response(youtube_api_response)
-        elif request_type == MessageTypeEnum.string:
-            # The request was a string
-            query_response = self.query_request(request)
-            formatted_response = self.format_query_response(query_response)
-        else:
-            # The request was in an invalid format
+        resolved_request = await self.resolve_request(request)
+        if resolved_request is None:
             return False
-        res = await self.add_songs_to_queue(formatted_response, guild_id)
+        songs, more_songs = resolved_request
+        res = await self.add_songs_to_queue(songs, guild_id)
+        if more_songs is not None:
+            self.load_remaining_pages(guild_id, more_songs)
         await self.update_messages(guild_id)
         return res
 
-    def find_request_type(self, request):
+    async def process_requests(self, guild_id, requests):
         """
-        Find what kind of string the request is. If the string is a URL, determine what kind of URL it is.
-        :param request: The request to identify.
-        :return: A MessageTypeEnum depicting the type of string.
+        Processes several song requests at once, looking them up concurrently and adding them to the queue in the order they
+        were given. The remaining pages of any playlists are added to the end of the queue in the background.
+        :param guild_id: The ID of the guild the song requests are in.
+        :param requests: The songs requested.
+        :return: A list of booleans for each request, True if that song was added to the queue successfully, else False.
         """
-        if request.startswith("https://") or request.startswith("http://"):
-            return self.find_url_type(request)
-        else:
-            return MessageTypeEnum.string
-
-    @staticmethod
-    def find_url_type(url):
-        """
-        Finds what kind of url the given url is:
-        :param url: The url to identify.
-        :return: A MessageTypeEnum depicting what type of url the given url is.
-        """
-        youtube_desktop_signature = r"(http[s]?://)?youtube.com/watch\?v="
-        if re.search(youtube_desktop_signature, url):
-            return MessageTypeEnum.youtube_url
+        request_limit = self.request_limits.setdefault(guild_id, asyncio.Semaphore(REQUEST_CONCURRENCY))
 
-        youtube_playlist_signature = r"(http[s]?://)?youtube.com/playlist\?list="
-        if re.search(youtube_playlist_signature, url):
-            return MessageTypeEnum.youtube_playlist
+        async def limited_resolve(request):
+            async with request_limit:
+                return await self.resolve_request(request)
 
-        youtube_mobile_signature = r"(http[s]?://)?youtu.be/([a-zA-Z]|[0-9])+"
-        if re.search(youtube_mobile_signature, url):
-            return MessageTypeEnum.youtube_url
+        responses = await asyncio.gather(*[limited_resolve(x) for x in requests], return_exceptions=True)
 
-        youtube_thumbnail_signature = r"(http[s]?://)?i.ytimg.com/vi/([a-zA-Z]|[0-9])+"
-        if re.search(youtube_thumbnail_signature, url):
-            return MessageTypeEnum.youtube_thumbnail
+        results = []
+        for request, response in zip(requests, responses):
+            if isinstance(response, Exception):
+                self.logger.error(
+                    f"There was an error looking up the song request {request} in guild {guild_id}: {response!s}"
+                )
+                results.append(False)
+                continue
+            if response is None:
+                results.append(False)
+                continue
+            songs, more_songs = response
+            results.append(self.queue_songs(songs, guild_id))
+            if more_songs is not None:
+                self.load_remaining_pages(guild_id, more_songs)
+
+        voice_client = self.active_guilds.get(guild_id, {}).get("voice_client")
+        if voice_client and not voice_client.is_playing() and not voice_client.is_paused():
+            await self.__play_queue(guild_id)
+        await self.update_messages(guild_id)
+        return results
 
-        return MessageTypeEnum.invalid
+    async def resolve_request(self, request):
+        """
+        Looks up the songs for a song request. Only the first page of a playlist is looked up, the rest of the playlist is
+        returned as an async generator of the remaining pages so that the first songs can be queued straight away.
+        :param request: The song requested.
+        :return: A tuple of the list of Tracks found and an async generator of lists of any further Tracks (or None if there
+                 are no further Tracks), or None if the request was in an invalid format.
+        """
+        request_type, youtube_id = find_request_type(request)
+        if request_type == MessageTypeEnum.youtube_url:
+            # The request was a YouTube video
+            youtube_api_response = await self.bot.loop.run_in_executor(None, self.get_youtube_request, youtube_id)
+            return self.format_youtube_response(youtube_api_response), None
+        elif request_type == MessageTypeEnum.youtube_playlist:
+            # The request was a YouTube playlist
+            pages = self.youtube_playlist_pages(youtube_id)
+            try:
+                first_page = await pages.__anext__()
+            except StopAsyncIteration:
+                return [], None
+            return first_page, pages
+        elif request_type == MessageTypeEnum.string:
+            # The request was a string
+            return await self.search_query(request), None
+        else:
+            # The request was in an invalid format
+            return None
 
     @staticmethod
-    def get_youtube_request(request, request_type):
+    def execute_youtube_request(api_request):
         """
-        Get the data for a given request, when that request is a YouTube URL of some kind.
-        :param request: The request to find the data of.
-        :param request_type: The type of YouTube request the request is.
-        :return: A list of dictionaries for each video found that fits the request.
+        Run a request to the YouTube API using the HTTP client of the current thread.
+        :param api_request: The request to run.
+        :return: The response of the request.
         """
-        api_func = YOUTUBE_API.videos() if request_type == MessageTypeEnum.youtube_url else YOUTUBE_API.playlistItems()
-        key = "v" if request_type == MessageTypeEnum.youtube_url else "list"
+        if not hasattr(youtube_http, "client"):
+            youtube_http.client = httplib2.Http()
+        return api_request.execute(http=youtube_http.client)
 
-        query = parse_qs(urlparse(request).query, keep_blank_values=True)
-        if not query:
-            youtube_id = request.split("/")[-1]
-        else:
-            youtube_id = query[key][0]
+    def get_youtube_request(self, youtube_id):
+        """
+        Get the data for a given request, when that request is a YouTube video URL.
+        :param youtube_id: The ID of the video requested.
+        :return: A list of dictionaries for each video found that fits the request.
+        """
+        api_request = YOUTUBE_API.videos().list(part="snippet", id=youtube_id, maxResults=1)
+        return self.execute_youtube_request(api_request).get("items", [])
 
-        api_args = {"part": "snippet", "maxResults": 1 if request_type == MessageTypeEnum.youtube_url else 50}
+    async def youtube_playlist_pages(self, playlist_id):
+        """
+        Look up the songs of a YouTube playlist one page at a time, stopping once `PLAYLIST_LIMIT` songs have been found.
+        Each page is requested in the executor so that long playlists do not block the event loop.
+        :param playlist_id: The ID of the playlist to look up.
+        :return: An async generator of lists of Tracks, one list for each page of the playlist.
+        """
+        api_func = YOUTUBE_API.playlistItems()
+        remaining = PLAYLIST_LIMIT
+        api_request = api_func.list(part="snippet", playlistId=playlist_id, maxResults=min(PLAYLIST_PAGE_SIZE, remaining))
 
-        if request_type == MessageTypeEnum.youtube_url:
-            api_args["id"] = youtube_id
-        else:
-            api_args["playlistId"] = youtube_id
+        while api_request is not None and remaining > 0:
+            response = await self.bot.loop.run_in_executor(None, self.execute_youtube_request, api_request)
+            songs = self.format_youtube_response(response.get("items", [])[:remaining])
+            remaining -= len(songs)
+            api_request = api_func.list_next(api_request, response)
+            yield songs
 
-        api_request = api_func.list(**api_args)
+    def load_remaining_pages(self, guild_id, pages):
+        """
+        Start adding the remaining pages of a playlist to the queue of a guild in the background.
+        :param guild_id: The ID of the guild to add the songs to.
+        :param pages: The async generator of the remaining pages of the playlist.
+        """
+        task = self.bot.loop.create_task(self.queue_remaining_pages(guild_id, pages))
+        guild_loads = self.playlist_loads.setdefault(guild_id, set())
+        guild_loads.add(task)
+        task.add_done_callback(guild_loads.discard)
 
-        video_responses = []
-        while api_request:
-            response = api_request.execute()
-            video_responses += response["items"]
-            api_request = api_func.list_next(api_request, response)
+    async def queue_remaining_pages(self, guild_id, pages):
+        """
+        Add each page of a playlist to the end of the queue of a guild as it is looked up, starting playback again if the
+        queue ran out while waiting for a page. Stops once the guild is no longer active.
+        :param guild_id: The ID of the guild to add the songs to.
+        :param pages: The async generator of the remaining pages of the playlist.
+        """
+        try:
+            async for songs in pages:
+                if guild_id not in self.active_guilds:
+                    break
+                self.queue_songs(songs, guild_id)
+                voice_client = self.active_guilds.get(guild_id).get("voice_client")
+                if not voice_client.is_playing() and not voice_client.is_paused():
+                    await self.__play_queue(guild_id)
+                    self.set_active(guild_id)
+                await self.update_messages(guild_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.logger.error(f"There was an error adding the rest of a playlist to the queue in guild {guild_id}: {e!s}")
+        finally:
+            await pages.aclose()
 
-        return video_responses
+    def cancel_playlist_loads(self, guild_id):
+        """
+        Stop adding the remaining pages of any playlists to the queue of a guild.
+        :param guild_id: The ID of the guild to stop adding songs to.
+        """
+        for task in self.playlist_loads.pop(guild_id, set()):
+            task.cancel()
 
     def format_youtube_response(self, response):
         """
         Formats a list of dicts that were gained from a YouTube request to be in a format that is the same across
         request types.
         :param response: The response from the YouTube request.
-        :return: A list of dictionaries formatted from the incoming list of dictionaries.
+        :return: A list of Tracks made from the incoming list of dictionaries.
         """
         formatted_response = []
         for item in response:
             snippet = item.get("snippet")
-            video_info = {
-                "title": snippet.get("title"),
-                "thumbnail": self.thumbnail_from_snippet(snippet),
-                "link": self.url_from_response(item)
-            }
+            video_info = Track(
+                title=snippet.get("title"),
+                thumbnail=self.thumbnail_from_snippet(snippet),
+                link=self.url_from_response(item)
+            )
             formatted_response.append(video_info)
         return formatted_response
 
@@ -529,6 +879,33 @@ class MusicCog(commands.Cog):
             video_id = response.get("snippet").get("resourceId").get("videoId")
         return "https://youtube.com/watch?v={}".format(video_id)
 
+    async def search_query(self, request):
+        """
+        Find the song for a request that is a string, using the cached song if the same request was searched recently.
+        :param request: The request to find.
+        :return: A list of Tracks, in the same format as `format_query_response`.
+        """
+        cache_key = self.normalise_query(request)
+        cached_response = query_cache.get(cache_key)
+        if cached_response is not None:
+            return cached_response
+
+        query_response = await self.bot.loop.run_in_executor(None, self.query_request, request)
+        formatted_response = self.format_query_response(query_response)
+        if formatted_response:
+            # Don't cache failed searches, so that they are retried.
+            query_cache.set(cache_key, formatted_response)
+        return formatted_response
+
+    @staticmethod
+    def normalise_query(request):
+        """
+        Normalise a string request so that requests which only differ by case or whitespace search for the same song.
+        :param request: The request to normalise.
+        :return: The normalised request.
+        """
+        return " ".join(request.casefold().split())
+
     @staticmethod
     def query_request(request):
         """
@@ -569,13 +946,13 @@ class MusicCog(commands.Cog):
         """
         Formats the 2-tuple that was gained from a queried request to be in a format that is the same across request types.
         :param response: The response from the query.
-        :return: A list of dictionaries of song data.
+        :return: A list with the Track that was found, or an empty list if no song was found.
         """
         official_result, music_result = response
 
         if not official_result or not music_result:
-            # If either of the dictionaries are emtpy, return an empty list with an empty dictionary.
-            return [{}]
+            # If either of the dictionaries are emtpy, no song was found.
+            return []
 
         official_views = re.sub(r"view(s)?", "", official_result.get("viewCount").get("text").replace(",", ""))
         music_views = re.sub(r"view(s)?", "", music_result.get("viewCount").get("text").replace(",", ""))
@@ -583,21 +960,18 @@ class MusicCog(commands.Cog):
         official_views = 0 if official_views is None or "No" in official_views else int(official_views)
         music_views = 0 if music_views is None or "No" in music_views else int(music_views)
 
-        formatted_query = {
-            "title":
-            official_result.get("title") if official_views > music_views else music_result.get("title"),
-            "thumbnail":
-            official_result.get("thumbnails")[-1].get("url")
+        formatted_query = Track(
+            title=official_result.get("title") if official_views > music_views else music_result.get("title"),
+            thumbnail=official_result.get("thumbnails")[-1].get("url")
             if official_views > music_views else music_result.get("thumbnails")[-1].get("url"),
-            "link":
-            music_result.get("link")
-        }
+            link=music_result.get("link")
+        )
         return [formatted_query]
 
     async def add_songs_to_queue(self, songs, guild_id):
         """
-        Add a list of dictionaries representing songs to the queue of a guild.
-        :param songs: The list of song dictionaries to add to the the guild.
+        Add a list of songs to the queue of a guild.
+        :param songs: The list of Tracks to add to the the guild.
         :param guild_id: The ID of the guild to add the songs to.
         :return: True if the song was added successfully, False otherwise.
         """
@@ -605,12 +979,7 @@ class MusicCog(commands.Cog):
             if guild_id not in self.active_guilds:
                 return False
 
-            ret_val = True
-            for song in songs:
-                if len(song) != 0:
-                    self.active_guilds.get(guild_id)["queue"].append(song)
-                else:
-                    ret_val = False
+            ret_val = self.queue_songs(songs, guild_id)
 
             # If we are not currently playing, start playing.
             if not self.active_guilds.get(guild_id).get("voice_client").is_playing():
@@ -620,6 +989,20 @@ class MusicCog(commands.Cog):
             self.logger.error(f"There was an error adding a song to the queue for guild {guild_id}: {e!s}")
             return False
 
+    def queue_songs(self, songs, guild_id):
+        """
+        Add a list of songs to the end of the queue of a guild, without starting playback.
+        :param songs: The list of Tracks to add to the the guild.
+        :param guild_id: The ID of the guild to add the songs to.
+        :return: True if the songs were added, False if the guild is not active or there were no songs to add.
+        """
+        if guild_id not in self.active_guilds or not songs:
+            return False
+
+        self.active_guilds.get(guild_id)["queue"].extend(songs)
+        self.prefetch_songs(guild_id)
+        return True
+
     async def __play_queue(self, guild_id):
         """
         The internal function for playing the current queue. Should not ever call this function explicitly.
@@ -629,35 +1012,80 @@ class MusicCog(commands.Cog):
         if guild_id not in self.active_guilds:
             return False
 
-        if not len(self.active_guilds.get(guild_id).get("queue")) > 0:
-            self.active_guilds.get(guild_id)["current_song"] = None
-            return False
+        if guild_id in self.loading_songs:
+            # The next song is already being started by another call.
+            return True
 
         voice_client = self.active_guilds.get(guild_id).get("voice_client")
 
         # Voice client cannot be playing when calling play(), so must be stopped first.
         if voice_client.is_playing():
-            voice_client.stop()
+            self.stop_playing(guild_id)
+
+        # A song whose stream cannot be extracted is skipped, so that one bad song does not stop the rest of the queue.
+        while guild_id in self.active_guilds and len(self.active_guilds.get(guild_id).get("queue")) > 0:
+            try:
+                next_song = await self.set_next_song(guild_id)
+                if not next_song:
+                    # Loading the song was cancelled because it was skipped or the bot left the channel, in which case the
+                    # skip or disconnect has already taken over the playback.
+                    return True
+                self.play_stream(guild_id, next_song)
+                if guild_id not in self.playing_guilds:
+                    self.playing_guilds.append(guild_id)
+                return True
+            except AttributeError:
+                return False
+            except KeyError:
+                return False
+            except TypeError:
+                return False
+            except ClientException:
+                return False
+            except (asyncio.TimeoutError, DownloadError) as e:
+                self.logger.warning(f"Unable to get the stream of the next song in guild {guild_id}, skipping it: {e!s}")
 
-        try:
-            next_song = self.set_next_song(guild_id)
-            source = PCMVolumeTransformer(
-                FFmpegPCMAudio(next_song.get("url"),
-                               before_options=FFMPEG_BEFORE_OPT,
-                               options="-vn"),
-                volume=self.active_guilds.get(guild_id).get("volume")
+        if guild_id in self.active_guilds:
+            self.active_guilds.get(guild_id)["current_song"] = None
+        return False
+
+    def play_stream(self, guild_id, song, start_at=0.0):
+        """
+        Start streaming a song to the voice client of a guild at the guild's current volume.
+        :param guild_id: The ID of the guild to play the song in.
+        :param song: The Track to play, with its stream extracted.
+        :param start_at: The number of seconds into the song to start playing from.
+        """
+        voice_client = self.active_guilds.get(guild_id).get("voice_client")
+        source = self.make_audio_source(song, self.active_guilds.get(guild_id).get("volume"), start_at)
+        voice_client.play(source, after=functools.partial(self.song_finished, guild_id, source))
+        self.playing_sources[guild_id] = source
+
+    @staticmethod
+    def make_audio_source(song, volume, start_at=0.0):
+        """
+        Create the audio source that streams a song. Opus streams at the default volume are copied straight through to
+        discord. At any other volume, or for streams in another codec, ffmpeg decodes the stream, applies the volume and
+        encodes it as Opus again, so changing the volume gives up the passthrough.
+        :param song: The Track to stream, with its stream extracted.
+        :param volume: The volume to play the song at, where 1 is the original volume.
+        :param start_at: The number of seconds into the song to start playing from.
+        :return: A TrackedSource of the song.
+        """
+        before_options = FFMPEG_BEFORE_OPT
+        if start_at:
+            before_options += f" -ss {start_at:.2f}"
+
+        if volume == DEFAULT_VOLUME and song.codec == "opus":
+            audio = FFmpegOpusAudio(song.stream_url, codec="opus", before_options=before_options, options="-vn")
+        else:
+            audio = FFmpegOpusAudio(
+                song.stream_url,
+                bitrate=OPUS_BITRATE,
+                before_options=before_options,
+                options=f"-vn -filter:a volume={volume:.2f}"
             )
-            voice_client.play(source)
-            self.playing_guilds.append(guild_id)
-            return True
-        except AttributeError:
-            return False
-        except KeyError:
-            return False
-        except TypeError:
-            return False
-        except ClientException:
-            return False
+        return TrackedSource(audio, start_at)
 
     async def play_queue(self, guild_id):
         """
@@ -669,17 +1097,136 @@ class MusicCog(commands.Cog):
         await self.update_messages(guild_id)
         return res
 
-    def set_next_song(self, guild_id):
+    async def set_next_song(self, guild_id):
         """
         Sets the current song to the next song in the queue.
         :param guild_id: The ID of the guild to set the next song of.
-        :return: The next song in the queue.
-        """
-        next_song = self.active_guilds.get(guild_id).get("queue").pop(0)
-        current_song = {**self.get_youtube_info(next_song.get("link")), **next_song}
+        :return: The next song in the queue, or None if loading the song was cancelled.
+        """
+        next_song = self.active_guilds.get(guild_id).get("queue").popleft()
+        loading_song = self.take_prefetched_song(guild_id, next_song.link)
+        if not loading_song:
+            loading_song = asyncio.ensure_future(self.extract_youtube_info(next_song.link))
+        self.loading_songs[guild_id] = loading_song
+        # Start extracting the song after this one while this one plays.
+        self.prefetch_songs(guild_id)
+        try:
+            # Wait without awaiting the task directly, so that cancelling the load does not cancel the caller.
+            await asyncio.wait({loading_song})
+        finally:
+            if self.loading_songs.get(guild_id) is loading_song:
+                self.loading_songs.pop(guild_id)
+            loading_song.cancel()
+
+        if loading_song.cancelled() or guild_id not in self.active_guilds:
+            return None
+
+        current_song = next_song.with_stream(loading_song.result())
         self.active_guilds.get(guild_id)["current_song"] = current_song
         return current_song
 
+    def prefetch_songs(self, guild_id):
+        """
+        Start extracting the streams of the songs at the front of the queue of a given guild in the background. Streams of
+        songs that are no longer at the front of the queue are dropped, and streams that are about to expire are replaced.
+        :param guild_id: The ID of the guild to prefetch the songs of.
+        """
+        if guild_id not in self.active_guilds:
+            return
+
+        upcoming_links = [x.link for x in islice(self.active_guilds.get(guild_id).get("queue"), PREFETCH_COUNT)]
+        prefetched = self.prefetched_songs.setdefault(guild_id, {})
+
+        for link in list(prefetched):
+            if link not in upcoming_links or not self.is_prefetch_usable(prefetched.get(link)):
+                self.discard_prefetched_song(prefetched.pop(link))
+
+        for link in upcoming_links:
+            if link not in prefetched:
+                prefetched[link] = asyncio.ensure_future(self.extract_youtube_info(link, executor=prefetch_executor))
+
+    def take_prefetched_song(self, guild_id, link):
+        """
+        Remove the prefetched stream of a song so that it can be played.
+        :param guild_id: The ID of the guild the song is queued in.
+        :param link: The link of the song.
+        :return: The task extracting the stream of the song, or None if there is no usable prefetched stream.
+        """
+        prefetch = self.prefetched_songs.get(guild_id, {}).pop(link, None)
+        if not prefetch:
+            return None
+        if not self.is_prefetch_usable(prefetch):
+            self.discard_prefetched_song(prefetch)
+            return None
+        return prefetch
+
+    def clear_prefetched_songs(self, guild_id):
+        """
+        Drop every prefetched stream in a given guild.
+        :param guild_id: The ID of the guild to drop the prefetched streams of.
+        """
+        for prefetch in self.prefetched_songs.pop(guild_id, {}).values():
+            self.discard_prefetched_song(prefetch)
+
+    @staticmethod
+    def is_prefetch_usable(prefetch):
+        """
+        Check if a prefetched stream can still be played. Extractions that are still running are assumed to succeed.
+        :param prefetch: The task extracting the stream.
+        :return: True if the prefetched stream can be played, False if it failed or is about to expire.
+        """
+        if not prefetch.done():
+            return True
+        if prefetch.cancelled() or prefetch.exception():
+            return False
+        return time.time() < MusicCog.stream_expiry(prefetch.result()) - STREAM_EXPIRY_MARGIN
+
+    @staticmethod
+    def discard_prefetched_song(prefetch):
+        """
+        Stop a prefetched stream from being extracted, or mark its failure as handled if it already finished.
+        :param prefetch: The task extracting the stream.
+        """
+        if not prefetch.done():
+            prefetch.cancel()
+        elif not prefetch.cancelled():
+            prefetch.exception()
+
+    @staticmethod
+    def stream_expiry(song_info):
+        """
+        Find when the stream URL of a song expires, using the `expire` parameter of the URL if it has one.
+        :param song_info: The information extracted for the song.
+        :return: The UNIX timestamp the stream URL expires at.
+        """
+        expire = parse_qs(urlparse(song_info.get("url", "")).query).get("expire")
+        if expire and expire[0].isdigit():
+            return int(expire[0])
+        # Assume the URL was extracted just now, as the extraction time is not recorded.
+        return time.time() + DEFAULT_STREAM_LIFETIME
+
+    def cancel_loading_song(self, guild_id):
+        """
+        Stop waiting for the song that is about to play in a given guild to be extracted.
+        :param guild_id: The ID of the guild to cancel loading the song of.
+        """
+        loading_song = self.loading_songs.pop(guild_id, None)
+        if loading_song:
+            loading_song.cancel()
+
+    async def extract_youtube_info(self, url, executor=extract_executor):
+        """
+        Get the information required to stream a song, without blocking the event loop. A yt-dlp extraction cannot be
+        interrupted, so a timeout (or cancellation) only stops waiting for it: the worker thread stays busy until yt-dlp
+        returns, and the executor has one less worker for other extractions until then.
+        :param url: The URL to find the information of.
+        :param executor: The pool of threads to run the extraction in, the prefetch pool for songs that are not playing yet.
+        :return: A dictionary of data which contains the stream data.
+        :raises asyncio.TimeoutError: If the extraction took longer than the extraction timeout.
+        """
+        extraction = self.bot.loop.run_in_executor(executor, self.get_youtube_info, url)
+        return await asyncio.wait_for(extraction, timeout=EXTRACT_TIMEOUT)
+
     @staticmethod
     def get_youtube_info(url):
         """
@@ -690,7 +1237,8 @@ class MusicCog(commands.Cog):
         ydl_opts = {
             "quiet": "true",
             "nowarning": "true",
-            "format": "bestaudio/best",
+            # Prefer Opus streams, which can be passed straight through to discord without being re-encoded.
+            "format": "bestaudio[acodec=opus]/bestaudio/best",
             "outtmpl": "%(title)s-%(id)s.mp3",
             "postprocessors": [{
                 "key": "FFmpegExtractAudio",
@@ -704,26 +1252,92 @@ class MusicCog(commands.Cog):
 
     async def update_messages(self, guild_id):
         """
-        Update the queue and preview messages with the current queue and currently playing song in a given guild.
+        Schedule the queue and preview messages of a given guild to be updated with the current queue and currently playing
+        song. Updates requested within the same update window are combined into a single update.
+        :param guild_id: The ID of the guild to update the messages of.
+        """
+        if guild_id not in self.pending_message_updates:
+            task = asyncio.ensure_future(self.flush_message_update(guild_id))
+            self.pending_message_updates[guild_id] = task
+            self.message_update_tasks.add(task)
+            task.add_done_callback(self.message_update_tasks.discard)
+
+    async def flush_message_update(self, guild_id):
+        """
+        Wait until the update window of a given guild has passed since its messages were last updated, then update them.
         :param guild_id: The ID of the guild to update the messages of.
         """
+        next_update = self.last_message_updates.get(guild_id, 0) + MESSAGE_UPDATE_WINDOW
+        if next_update > self.bot.loop.time():
+            await asyncio.sleep(next_update - self.bot.loop.time())
+
+        # Any changes made from here on need another update, as this one may have already rendered the messages.
+        self.pending_message_updates.pop(guild_id, None)
+        self.last_message_updates[guild_id] = self.bot.loop.time()
+        try:
+            async with self.message_update_locks.setdefault(guild_id, asyncio.Lock()):
+                await self.render_messages(guild_id)
+                await self.save_queue(guild_id)
+        except Exception as e:
+            self.logger.error(f"Unable to update the music channel messages in guild {guild_id}: {e!s}")
+
+    async def render_messages(self, guild_id):
+        """
+        Edit the queue and preview messages of a given guild, skipping the messages whose content has not changed.
+        :param guild_id: The ID of the guild to update the messages of.
+        """
+        if not self.music_channels.get(guild_id):
+            return
+
         queue_message_content = self.get_updated_queue_message(guild_id)
         preview_message_content = self.get_updated_preview_message(guild_id)
+        rendered_queue, rendered_preview = self.rendered_messages.get(guild_id, (None, None))
+
+        if queue_message_content == rendered_queue and preview_message_content.to_dict() == rendered_preview:
+            return
+
+        music_messages = await self.get_music_messages(guild_id)
+        if not music_messages:
+            return
+        queue_message_instance, preview_message_instance = music_messages
+
+        try:
+            if queue_message_content != rendered_queue:
+                await queue_message_instance.edit(content=queue_message_content)
+                rendered_queue = queue_message_content
+            if preview_message_content.to_dict() != rendered_preview:
+                await preview_message_instance.edit(embed=preview_message_content)
+                rendered_preview = preview_message_content.to_dict()
+        except NotFound:
+            # The messages were deleted, so find them again from the DB next time.
+            self.music_messages.pop(guild_id, None)
+            self.rendered_messages.pop(guild_id, None)
+            return
+
+        self.rendered_messages[guild_id] = (rendered_queue, rendered_preview)
+
+    async def get_music_messages(self, guild_id):
+        """
+        Get the queue and preview messages of a given guild, fetching them from Discord only if they are not cached.
+        :param guild_id: The ID of the guild to get the messages of.
+        :return: A tuple of the queue message and the preview message, or None if the guild has no music channel.
+        """
+        if guild_id in self.music_messages:
+            return self.music_messages.get(guild_id)
 
         music_channel_instance = self.bot.get_channel(self.music_channels.get(guild_id))
         if not music_channel_instance:
             music_channel_instance = await self.bot.fetch_channel(self.music_channels.get(guild_id))
 
-        db_item = self.db.get(MusicChannels, guild_id=guild_id)
+        db_item = await self.db.get(MusicChannels, guild_id=guild_id)
 
         if not db_item:
-            return
+            return None
 
         queue_message_instance = await music_channel_instance.fetch_message(db_item.queue_message_id)
         preview_message_instance = await music_channel_instance.fetch_message(db_item.preview_message_id)
-
-        await queue_message_instance.edit(content=queue_message_content)
-        await preview_message_instance.edit(embed=preview_message_content)
+        self.music_messages[guild_id] = (queue_message_instance, preview_message_instance)
+        return self.music_messages.get(guild_id)
 
     def get_updated_queue_message(self, guild_id, complete_list=False):
         """
@@ -752,8 +1366,8 @@ class MusicCog(commands.Cog):
             queue_string = self.reversed_numbered_list(queue)
         elif len(queue) > 25:
             # If the queue is long, truncate it using the start and end with an indicator of how many extra songs are hidden.
-            first_ten = queue[:10]
-            last_ten = queue[-10:]
+            first_ten = list(islice(queue, 10))
+            last_ten = list(islice(reversed(queue), 10))[::-1]
             remainder = len(queue) - 20
 
             first_string = self.reversed_numbered_list(first_ten)
@@ -774,7 +1388,7 @@ class MusicCog(commands.Cog):
         """
         reversed_list = list(reversed(list_data))
         biggest = len(list_data) + offset
-        return "\n".join(f"{biggest - song_num}. {song.get('title')}" for song_num, song in enumerate(reversed_list))
+        return "\n".join(f"{biggest - song_num}. {song.title}" for song_num, song in enumerate(reversed_list))
 
     @staticmethod
     def numbered_list(list_data, offset=0):
@@ -784,7 +1398,7 @@ class MusicCog(commands.Cog):
         :param offset: The song index offset to start at.
         :return: A string representing a list.
         """
-        return "\n".join(f"{song_num + 1 + offset}. {song.get('title')}" for song_num, song in enumerate(list_data))
+        return "\n".join(f"{song_num + 1 + offset}. {song.title}" for song_num, song in enumerate(list_data))
 
     def get_updated_preview_message(self, guild_id):
         """
@@ -799,34 +1413,35 @@ class MusicCog(commands.Cog):
         else:
             current_song = self.active_guilds.get(guild_id).get("current_song")
             updated_message = Embed(
-                title=f"Currently Playing: {current_song.get('title')}",
+                title=f"Currently Playing: {current_song.title}",
                 description=f"Current Volume: {int(self.active_guilds.get(guild_id).get('volume') * 100)}%",
                 colour=EmbedColours.music,
-                url=current_song.get("link"),
-                video=current_song.get("link")
+                url=current_song.link,
+                video=current_song.link
             )
-            thumbnail = current_song.get("thumbnail")
-            if self.find_url_type(thumbnail) != MessageTypeEnum.youtube_thumbnail:
+            thumbnail = current_song.thumbnail
+            if find_url_type(thumbnail)[0] != MessageTypeEnum.youtube_thumbnail:
                 thumbnail = ESPORTS_LOGO_URL
             updated_message.set_image(url=thumbnail)
             updated_message.set_footer(text="Definitely not made by fuxticks#1809 on discord")
             return updated_message
 
-    @staticmethod
-    async def join_member(member):
+    async def join_member(self, member):
         """
-        Join a member's voice channel.
+        Join a member's voice channel, and register the guild as active straight away rather than waiting for the voice
+        state update of the bot, so that songs can be queued as soon as this returns.
         :param member: The member to join.
         :return: A boolean if the bot was able to join the channel.
         """
         try:
             client = await member.voice.channel.connect()
             await member.guild.change_voice_state(channel=client.channel, self_mute=False, self_deaf=True)
-            return True
         except ClientException:
             return False
         except AttributeError:
             return False
+        await self.guild_joined(member.guild)
+        return True
 
     @commands.group(name="music")
     @commands.check(check_music_channel)
@@ -948,12 +1563,15 @@ class MusicCog(commands.Cog):
         if guild_id not in self.active_guilds:
             return
 
-        self.active_guilds.get(guild_id).get("voice_client").stop()
+        self.cancel_loading_song(guild_id)
+        self.stop_playing(guild_id)
         self.active_guilds.get(guild_id)["current_song"] = None
         if skip_count > len(self.active_guilds.get(guild_id).get("queue")) or skip_count < 0:
             await self.play_queue(guild_id)
         else:
-            self.active_guilds.get(guild_id)["queue"] = self.active_guilds.get(guild_id)["queue"][skip_count:]
+            queue = self.active_guilds.get(guild_id).get("queue")
+            for _ in range(skip_count):
+                queue.popleft()
             await self.play_queue(guild_id)
 
     @command_group.command(name="volume")
@@ -990,8 +1608,22 @@ class MusicCog(commands.Cog):
         if volume_level > 100:
             volume_level = 100
 
-        self.active_guilds.get(guild_id).get("voice_client").source.volume = float(volume_level) / float(100)
-        self.active_guilds.get(guild_id)["volume"] = float(volume_level) / float(100)
+        volume = float(volume_level) / float(100)
+        if volume == self.active_guilds.get(guild_id).get("volume"):
+            return
+        self.active_guilds.get(guild_id)["volume"] = volume
+
+        # The volume is applied by ffmpeg, so the current song is restarted from where it got to at the new volume.
+        source = self.playing_sources.get(guild_id)
+        current_song = self.active_guilds.get(guild_id).get("current_song")
+        if source is not None and current_song is not None:
+            voice_client = self.active_guilds.get(guild_id).get("voice_client")
+            was_paused = voice_client.is_paused()
+            # Stopping the song removes it from the playing sources, so the queue is not advanced when it ends.
+            self.stop_playing(guild_id)
+            self.play_stream(guild_id, current_song, start_at=source.position)
+            if was_paused:
+                voice_client.pause()
         await self.update_messages(guild_id)
 
     @command_group.command(name="shuffle")
@@ -1014,7 +1646,13 @@ class MusicCog(commands.Cog):
         if guild_id not in self.active_guilds:
             return
 
-        shuffle(self.active_guilds.get(guild_id).get("queue"))
+        # Shuffling a deque in place is slow as its items are not stored contiguously, so shuffle a list copy instead.
+        queue = self.active_guilds.get(guild_id).get("queue")
+        shuffled_queue = list(queue)
+        shuffle(shuffled_queue)
+        queue.clear()
+        queue.extend(shuffled_queue)
+        self.prefetch_songs(guild_id)
         await self.update_messages(guild_id)
 
     @command_group.command(name="clear", aliases=["purge", "empty"])
@@ -1035,8 +1673,10 @@ class MusicCog(commands.Cog):
         The actual function that performs the clearing of the current queue in a given guild.
         :param guild_id: The ID of the guild to clear the queue of.
         """
+        self.cancel_playlist_loads(guild_id)
         if guild_id in self.active_guilds:
-            self.active_guilds.get(guild_id)["queue"] = []
+            self.active_guilds.get(guild_id).get("queue").clear()
+        self.clear_prefetched_songs(guild_id)
         await self.update_messages(guild_id)
 
     @command_group.command(name="resume", aliases=["play"])
@@ -1062,7 +1702,11 @@ class MusicCog(commands.Cog):
         :param song_to_play: The song to play, if any.
         """
         if member.guild.id not in self.active_guilds and song_to_play == "":
-            return
+            # Only join the member to resume a queue that was saved before the bot last stopped.
+            if member.guild.id not in self.restorable_queues or not await self.join_member(member):
+                return
+            if member.guild.id not in self.active_guilds:
+                return
 
         if song_to_play != "":
             if member.guild.id not in self.active_guilds:
@@ -1074,8 +1718,7 @@ class MusicCog(commands.Cog):
             else:
                 await self.play_queue(member.guild.id)
 
-        if member.guild.id in self.inactive_guilds:
-            self.inactive_guilds.pop(member.guild.id)
+        self.set_active(member.guild.id)
 
         if member.guild.id not in self.playing_guilds:
             self.playing_guilds.append(member.guild.id)
@@ -1123,7 +1766,7 @@ class MusicCog(commands.Cog):
             await send_timed_message(
                 channel=context.channel,
                 content=self.user_strings["song_remove_success"].format(
-                    song_title=removed_song.get("title"),
+                    song_title=removed_song.title,
                     song_position=song_index + 1
                 )
             )
@@ -1139,7 +1782,10 @@ class MusicCog(commands.Cog):
             return None
 
         try:
-            song = self.active_guilds.get(guild_id)["queue"].pop(song_index)
+            queue = self.active_guilds.get(guild_id).get("queue")
+            song = queue[song_index]
+            del queue[song_index]
+            self.prefetch_songs(guild_id)
             await self.update_messages(guild_id)
             return song
         except IndexError:
@@ -1175,7 +1821,7 @@ class MusicCog(commands.Cog):
                 content=self.user_strings["song_moved_success"].format(
                     from_pos=from_pos + 1,
                     to_pos=to_pos + 1,
-                    title=song_at_pos.get("title")
+                    title=song_at_pos.title
                 )
             )
 
@@ -1194,21 +1840,10 @@ class MusicCog(commands.Cog):
             return True
 
         queue = self.active_guilds.get(guild_id).get("queue")
-
-        if from_pos > to_pos:
-            queue_top = queue[:to_pos]
-            inserted_song = [queue[from_pos]]
-            queue_middle = queue[to_pos:from_pos]
-            queue_end = queue[from_pos + 1:]
-            new_queue = queue_top + inserted_song + queue_middle + queue_end
-        else:
-            queue_top = queue[:from_pos]
-            inserted_song = [queue[from_pos]]
-            queue_middle = queue[from_pos + 1:to_pos + 1]
-            queue_end = queue[to_pos + 1:]
-            new_queue = queue_top + queue_middle + inserted_song + queue_end
-
-        self.active_guilds.get(guild_id)["queue"] = new_queue
+        song = queue[from_pos]
+        del queue[from_pos]
+        queue.insert(to_pos, song)
+        self.prefetch_songs(guild_id)
         await self.update_messages(guild_id)
         return True
 
@@ -1282,8 +1917,10 @@ class MusicCog(commands.Cog):
 
         music_channel_instance = await self.find_music_channel_instance(context.guild)
         self.music_channels.pop(context.guild.id)
-        db_item = self.db.get(MusicChannels, guild_id=context.guild.id)
-        self.db.delete(db_item)
+        self.music_messages.pop(context.guild.id, None)
+        self.rendered_messages.pop(context.guild.id, None)
+        db_item = await self.db.get(MusicChannels, guild_id=context.guild.id)
+        await self.db.delete(db_item)
         await context.send(self.user_strings["music_channel_removed"].format(channel=music_channel_instance.mention))
 
     async def song_index_str_to_int(self, context, song_index):
@@ -1329,7 +1966,7 @@ class MusicCog(commands.Cog):
         queue_message = await channel.send(EMPTY_QUEUE_MESSAGE)
         preview_message = await channel.send(embed=default_preview)
 
-        db_item = self.db.get(MusicChannels, guild_id=channel.guild.id)
+        db_item = await self.db.get(MusicChannels, guild_id=channel.guild.id)
         if not db_item:
             db_item = MusicChannels(
                 guild_id=channel.guild.id,
@@ -1337,13 +1974,15 @@ class MusicCog(commands.Cog):
                 queue_message_id=queue_message.id,
                 preview_message_id=preview_message.id
             )
-            self.db.create(db_item)
+            await self.db.create(db_item)
         else:
             db_item.queue_message_id = queue_message.id
             db_item.preview_message_id = preview_message.id
             db_item.channel_id = channel.id
-            self.db.update(db_item)
+            await self.db.update(db_item)
         self.music_channels[channel.guild.id] = channel.id
+        self.music_messages[channel.guild.id] = (queue_message, preview_message)
+        self.rendered_messages[channel.guild.id] = (EMPTY_QUEUE_MESSAGE, default_preview.to_dict())
 
     async def reset_music_channel(self, context):
         """
@@ -1,3 +1,4 @@
+import asyncio
 import datetime
 import logging
 import os
@@ -6,7 +7,7 @@ from typing import Dict, List
 
 from discord import Colour, Embed, Role
 from discord.ext import commands, tasks
-from esportsbot.db_gateway import DBGatewayActions
+from esportsbot.db_gateway import AsyncDBGatewayActions, DBGatewayActions
 from esportsbot.DiscordReactableMenus.EmojiHandler import MultiEmoji
 from esportsbot.DiscordReactableMenus.PingableMenus import (PingableRoleMenu, PingableVoteMenu)
 from esportsbot.lib.discordUtil import get_attempted_arg
@@ -32,6 +33,11 @@ PINGABLE_POLL_DESCRIPTION = "The number of votes required to make this role is:
 
 TASK_INTERVAL = 10
 
+# Ping counts are buffered in memory and written to the DB in one batch every interval, or sooner once the threshold of
+# buffered pings is reached.
+PING_FLUSH_INTERVAL = int(os.getenv("PINGABLE_PING_FLUSH_INTERVAL", "30"))
+PING_FLUSH_THRESHOLD = int(os.getenv("PINGABLE_PING_FLUSH_THRESHOLD", "50"))
+
 
 class PingableRolesCog(commands.Cog):
     """
@@ -49,7 +55,7 @@ class PingableRolesCog(commands.Cog):
     """
     def __init__(self, bot):
         self.bot = bot
-        self.db = DBGatewayActions()
+        self.db = AsyncDBGatewayActions()
         self.user_strings = self.bot.STRINGS["pingable_roles"]
         self.logger = logging.getLogger(__name__)
 
@@ -58,8 +64,10 @@ class PingableRolesCog(commands.Cog):
         self.roles = None  # Menu ID: {role id: pingable role id, menu: role menu instance}
         self.all_role_ids = None  # Guild ID: {role id : menu id}
         self.roles_on_cooldown = []  # List of roles that are on cooldown
+        self.pending_pings = defaultdict(int)  # (Guild ID, Role ID): pings not yet written to the DB
 
         self.init_command_string = "pingme settings default-settings"
+        self.bot.add_shutdown_task(self.flush_pings)
         self.logger.info(f"Finished loading {__name__}... waiting for ready")
 
     @commands.Cog.listener()
@@ -69,12 +77,14 @@ class PingableRolesCog(commands.Cog):
         initialise any saved Pingable Roles, as well as their reaction menus.
         """
         guild_ids = [x.id for x in self.bot.guilds]
-        self.roles = self.load_all_roles(guild_ids)
-        self.polls = self.load_all_polls(guild_ids)
+        self.roles = await self.load_all_roles(guild_ids)
+        self.polls = await self.load_all_polls(guild_ids)
         self.all_role_ids = self.all_roles_from_guild_data(self.roles)
         await self.delete_missing_roles()
         await self.initialise_menus()
         self.ensure_tasks()
+        if not self.flush_pings_task.is_running():
+            self.flush_pings_task.start()
         if os.getenv("RUN_MONTHLY_REPORT", "FALSE").lower() == "true":
             self.monthly_ping_report.start()
         self.logger.info(f"{__name__} is now ready!")
@@ -104,11 +114,42 @@ class PingableRolesCog(commands.Cog):
                 await role.edit(mentionable=False)
                 self.roles_on_cooldown.append(role)
                 self.ensure_tasks()
-                db_item = self.db.get(PingableRoles, guild_id=role.guild.id, role_id=role.id)
-                if db_item:
-                    db_item.total_pings += 1
-                    db_item.monthly_pings += 1
-                    self.db.update(db_item)
+                self.pending_pings[(role.guild.id, role.id)] += 1
+
+        if sum(self.pending_pings.values()) >= PING_FLUSH_THRESHOLD:
+            await self.flush_pings()
+
+    def cog_unload(self):
+        """
+        Stop the ping flushing task and write any buffered pings to the DB before the cog is removed.
+        """
+        self.flush_pings_task.cancel()
+        self.bot.remove_shutdown_task(self.flush_pings)
+        asyncio.ensure_future(self.flush_pings())
+
+    async def flush_pings(self):
+        """
+        Write the buffered ping counts to the DB in a single batch. If the write fails the counts are put back in the buffer
+        to be retried on the next flush.
+        """
+        if not self.pending_pings:
+            return
+
+        pending_pings, self.pending_pings = self.pending_pings, defaultdict(int)
+        try:
+            await self.db.increment(PingableRoles, pending_pings, "total_pings", "monthly_pings")
+            self.logger.debug(f"Wrote {sum(pending_pings.values())} pings for {len(pending_pings)} pingable roles to the DB")
+        except Exception as e:
+            self.logger.error(f"Failed to write buffered pings to the DB, will retry on the next flush - {e}")
+            for key, count in pending_pings.items():
+                self.pending_pings[key] += count
+
+    @tasks.loop(seconds=PING_FLUSH_INTERVAL)
+    async def flush_pings_task(self):
+        """
+        Periodically writes the buffered ping counts to the DB.
+        """
+        await self.flush_pings()
 
     @commands.Cog.listener()
     async def on_guild_role_delete(self, role):
@@ -144,7 +185,7 @@ class PingableRolesCog(commands.Cog):
                 default_poll_emoji=PINGABLE_POLL_EMOJI.to_dict(),
                 default_role_emoji=PINGABLE_ROLE_EMOJI.to_dict()
             )
-            self.db.create(db_item)
+            await self.db.create(db_item)
             self.logger.info(f"Joined new guild: {guild.name} ; Set default pingable settings")
 
     async def delete_missing_roles(self):
@@ -160,7 +201,7 @@ class PingableRolesCog(commands.Cog):
             if guild_id not in bot_guild_ids:
                 # If the guild is not in the bot's guilds, delete every role.
                 for role_id in self.all_role_ids.get(guild_id):
-                    self.delete_role_from_db(guild_id, role_id)
+                    await self.delete_role_from_db(guild_id, role_id)
 
                 continue
 
@@ -168,7 +209,7 @@ class PingableRolesCog(commands.Cog):
             guild_role_ids = [x.id for x in await self.bot.get_guild(guild_id).fetch_roles()]
             for role_id in self.all_role_ids.get(guild_id):
                 if role_id not in guild_role_ids:
-                    self.delete_role_from_db(guild_id, role_id)
+                    await self.delete_role_from_db(guild_id, role_id)
 
             if not self.all_role_ids.get(guild_id):
                 guilds_to_remove.append(guilds_to_remove)
@@ -177,7 +218,7 @@ class PingableRolesCog(commands.Cog):
         for guild_id in guilds_to_remove:
             self.all_role_ids.pop(guild_id)
 
-    def delete_role_from_db(self, guild_id, role_id):
+    async def delete_role_from_db(self, guild_id, role_id):
         """
         Deletes a role from the DB and ensures that the role is not in the internal dicts.
         :param guild_id: The ID of the guild of the role to delete.
@@ -191,8 +232,8 @@ class PingableRolesCog(commands.Cog):
         self.roles.pop(menu_id)
         self.all_role_ids.get(guild_id).pop(role_id)
 
-        db_item = self.db.get(PingableRoles, guild_id=guild_id, role_id=role_id, menu_id=menu_id)
-        self.db.delete(db_item)
+        db_item = await self.db.get(PingableRoles, guild_id=guild_id, role_id=role_id, menu_id=menu_id)
+        await self.db.delete(db_item)
 
     async def remove_pingable_role(self, role):
         """
@@ -200,12 +241,12 @@ class PingableRolesCog(commands.Cog):
         :param role: The role to delete .
         """
         self.logger.debug(f"{role.name} pingable role was just removed from {role.guild.name}")
-        db_item = self.db.get(PingableRoles, guild_id=role.guild.id, role_id=role.id)
+        db_item = await self.db.get(PingableRoles, guild_id=role.guild.id, role_id=role.id)
         menu_id = db_item.menu_id
         menu_data = self.roles.pop(menu_id)
         menu = menu_data.get("menu")
         await menu.message.delete()
-        self.db.delete(db_item)
+        await self.db.delete(db_item)
         self.all_role_ids.get(role.guild.id).pop(role.id)
 
         if role.id in self.roles_on_cooldown:
@@ -227,8 +268,12 @@ class PingableRolesCog(commands.Cog):
             menu_data = self.roles.get(menu_id).get("menu")
             loaded_menu = await PingableRoleMenu.from_dict(self.bot, menu_data)
             if isinstance(loaded_menu, dict):
-                db_item = self.db.get(PingableRoles, guild_id=menu_data.get("guild_id"), role_id=menu_data.get("role_id"))
-                self.db.delete(db_item)
+                db_item = await self.db.get(
+                    PingableRoles,
+                    guild_id=menu_data.get("guild_id"),
+                    role_id=menu_data.get("role_id")
+                )
+                await self.db.delete(db_item)
                 to_pop.append(menu_id)
             else:
                 self.roles[menu_id]["menu"] = loaded_menu
@@ -243,8 +288,8 @@ class PingableRolesCog(commands.Cog):
             menu_data = self.polls.get(poll_id).get("menu")
             loaded_menu = await PingableVoteMenu.from_dict(self.bot, menu_data)
             if isinstance(loaded_menu, dict):
-                db_item = self.db.get(PingablePolls, guild_id=menu_data.get("guild_id"), menu_id=poll_id)
-                self.db.delete(db_item)
+                db_item = await self.db.get(PingablePolls, guild_id=menu_data.get("guild_id"), menu_id=poll_id)
+                await self.db.delete(db_item)
                 to_pop.append(poll_id)
             else:
                 self.polls[poll_id]["menu"] = loaded_menu
@@ -260,7 +305,8 @@ class PingableRolesCog(commands.Cog):
         :return:
         """
         self.logger.debug("Loading menu guild settings for all guilds")
-        db_data = self.db.list(PingableSettings)
+        # Called while the cog is loaded, before the event loop is running, so the blocking gateway is fine here.
+        db_data = DBGatewayActions.list(PingableSettings)
 
         loaded_data = {}
 
@@ -277,7 +323,7 @@ class PingableRolesCog(commands.Cog):
 
         return loaded_data
 
-    def load_all_polls(self, guild_ids: List[int]) -> Dict:
+    async def load_all_polls(self, guild_ids: List[int]) -> Dict:
         """
         Loads any polls that were going on when the bot shutdown for all guilds .
         :param guild_ids: The listr of guild ids that the bot should load .
@@ -287,21 +333,21 @@ class PingableRolesCog(commands.Cog):
         loaded_data = {}
 
         for guild in guild_ids:
-            guild_data = self.load_guild_polls(guild)
+            guild_data = await self.load_guild_polls(guild)
             loaded_data = {**guild_data, **loaded_data}
 
         self.logger.info(f"Found {len(loaded_data)} pingable poll menu(s) in DB table")
 
         return loaded_data
 
-    def load_guild_polls(self, guild_id: int) -> Dict:
+    async def load_guild_polls(self, guild_id: int) -> Dict:
         """
          Loads any polls that were going on when the bot shutdown for a specific guild .
         :param guild_id: The guild to load on-going polls for .
         :return: A dictionary of all the polls happening in the guild specified .
         """
         self.logger.debug(f"Loading pingable polls for guild with id: {guild_id}")
-        guild_polls: [PingablePolls] = self.db.list(PingablePolls, guild_id=guild_id)
+        guild_polls: [PingablePolls] = await self.db.list(PingablePolls, guild_id=guild_id)
 
         guild_data = {}
 
@@ -312,7 +358,7 @@ class PingableRolesCog(commands.Cog):
 
         return guild_data
 
-    def load_all_roles(self, guild_ids: List[int]) -> Dict:
+    async def load_all_roles(self, guild_ids: List[int]) -> Dict:
         """
          Loads all the pingable roles for all guilds .
         :param guild_ids: The list of guild ids that the bot is in .
@@ -322,21 +368,21 @@ class PingableRolesCog(commands.Cog):
         loaded_data = {}
 
         for guild in guild_ids:
-            guild_data = self.load_guild_roles(guild)
+            guild_data = await self.load_guild_roles(guild)
             loaded_data = {**guild_data, **loaded_data}
 
         self.logger.info(f"Found {len(loaded_data)} pingable react menu(s) in DB table")
 
         return loaded_data
 
-    def load_guild_roles(self, guild_id: int) -> Dict:
+    async def load_guild_roles(self, guild_id: int) -> Dict:
         """
          Loads all the pingable roles for a specific guild .
         :param guild_id: The guild to load the roles from .
         :return: A dictionary of pingable role reaction menus .
         """
         self.logger.debug(f"Loading pingable react menus for guild with id: {guild_id}")
-        guild_roles: [PingableRoles] = self.db.list(PingableRoles, guild_id=guild_id)
+        guild_roles: [PingableRoles] = await self.db.list(PingableRoles, guild_id=guild_id)
 
         guild_data = {}
 
@@ -480,20 +526,28 @@ class PingableRolesCog(commands.Cog):
         embed_base.colour = Colour.random()
         embed_base.footer(text=f"Ping report for {today.strftime('%B %Y')}")
 
+        # Make sure the report includes the pings that are still buffered.
+        await self.flush_pings()
+
         for guild in self.bot.guilds:
-            guild_info = self.db.get(GuildInfo, guild_id=guild.id)
+            guild_info = await self.db.get(GuildInfo, guild_id=guild.id)
             if not guild_info or not guild_info.log_channel_id:
                 continue
 
-            guild_roles = self.db.list(PingableRoles, guild_id=guild.id)
+            guild_roles = await self.db.list(PingableRoles, guild_id=guild.id)
             guild_embed = embed_base.copy()
+            reported_pings = {}
             for pingable_role in guild_roles:
                 role_instance = guild.get_role(pingable_role.role_id)
                 guild_embed.add_field(
                     name=role_instance.name,
                     value=f"{role_instance.mention}\n{pingable_role.monthly_pings} pings"
                 )
-                pingable_role.monthly_pings = 0
+                reported_pings[(guild.id, pingable_role.role_id)] = -pingable_role.monthly_pings
+
+            # Only the reported pings are taken off, in a single statement, so that pings flushed since the roles were
+            # listed are kept for next month rather than overwritten by the listed rows.
+            await self.db.increment(PingableRoles, reported_pings, "monthly_pings")
 
             if guild_roles:
                 log_channel = guild.get_channel(guild_info.log_channel_id)
@@ -521,8 +575,8 @@ class PingableRolesCog(commands.Cog):
             await self.give_roles_to_reacts(poll_to_finish.message, role)
             self.logger.debug(f"Saved new pingable role information for {role.name} to DB!")
 
-        db_item = self.db.get(PingablePolls, guild_id=channel.guild.id, poll_id=poll_to_finish.id)
-        self.db.delete(db_item)
+        db_item = await self.db.get(PingablePolls, guild_id=channel.guild.id, poll_id=poll_to_finish.id)
+        await self.db.delete(db_item)
         await poll_to_finish.message.delete()
 
     async def create_reaction_menu(self, role, channel):
@@ -556,7 +610,7 @@ class PingableRolesCog(commands.Cog):
             monthly_pings=0,
             total_pings=0
         )
-        self.db.create(db_item)
+        await self.db.create(db_item)
 
     @staticmethod
     async def give_roles_to_reacts(message, role):
@@ -600,7 +654,7 @@ class PingableRolesCog(commands.Cog):
         :param context: The context of the command.
         :return: A Pingable_settings DB item if the guild is in the DB, else None.
         """
-        db_item = self.db.get(PingableSettings, guild_id=context.guild.id)
+        db_item = await self.db.get(PingableSettings, guild_id=context.guild.id)
         if not db_item:
             await context.send(
                 self.user_strings["needs_initialising"].format(
@@ -677,7 +731,7 @@ class PingableRolesCog(commands.Cog):
         """
         guild_id = context.guild.id
 
-        exists = self.db.get(PingableSettings, guild_id=guild_id)
+        exists = await self.db.get(PingableSettings, guild_id=guild_id)
 
         if exists:
             exists.default_poll_length = int(os.getenv("DEFAULT_POLL_LENGTH"))
@@ -685,7 +739,7 @@ class PingableRolesCog(commands.Cog):
             exists.default_cooldown_length = int(os.getenv("DEFAULT_COOLDOWN_LENGTH"))
             exists.default_poll_emoji = PINGABLE_POLL_EMOJI.to_dict()
             exists.default_role_emoji = PINGABLE_ROLE_EMOJI.to_dict()
-            self.db.update(exists)
+            await self.db.update(exists)
         else:
             current_item = PingableSettings(
                 guild_id=guild_id,
@@ -695,7 +749,7 @@ class PingableRolesCog(commands.Cog):
                 default_poll_emoji=PINGABLE_POLL_EMOJI.to_dict(),
                 default_role_emoji=PINGABLE_ROLE_EMOJI.to_dict()
             )
-            self.db.create(current_item)
+            await self.db.create(current_item)
 
         self.guild_settings[context.guild.id] = {}
         self.guild_settings[context.guild.id]["poll_length"] = int(os.getenv("DEFAULT_POLL_LENGTH"))
@@ -718,7 +772,7 @@ class PingableRolesCog(commands.Cog):
         if not db_item:
             return
         db_item.default_poll_length = poll_length
-        self.db.update(db_item)
+        await self.db.update(db_item)
 
         self.guild_settings[context.guild.id]["poll_length"] = poll_length
 
@@ -736,7 +790,7 @@ class PingableRolesCog(commands.Cog):
         if not db_item:
             return
         db_item.default_poll_threshold = vote_threshold
-        self.db.update(db_item)
+        await self.db.update(db_item)
 
         self.guild_settings[context.guild.id]["poll_threshold"] = vote_threshold
 
@@ -750,7 +804,7 @@ class PingableRolesCog(commands.Cog):
         :param context: The context of the command .
         :param role_cooldown: The number of seconds a role will be on cooldown for .
         """
-        db_item = self.db.get(PingableSettings, guild_id=context.guild.id)
+        db_item = await self.db.get(PingableSettings, guild_id=context.guild.id)
         if not db_item:
             await context.send(
                 self.user_strings["needs_initialising"].format(
@@ -760,7 +814,7 @@ class PingableRolesCog(commands.Cog):
             )
             return
         db_item.default_cooldown_length = role_cooldown
-        self.db.update(db_item)
+        await self.db.update(db_item)
 
         self.guild_settings[context.guild.id]["role_cooldown"] = role_cooldown
 
@@ -783,7 +837,7 @@ class PingableRolesCog(commands.Cog):
         if not db_item:
             return
         db_item.default_poll_emoji = poll_emoji.to_dict()
-        self.db.update(db_item)
+        await self.db.update(db_item)
 
         self.guild_settings[context.guild.id]["poll_emoji"] = poll_emoji
 
@@ -801,7 +855,7 @@ class PingableRolesCog(commands.Cog):
         if not db_item:
             return
         db_item.default_role_emoji = role_emoji.to_dict()
-        self.db.update(db_item)
+        await self.db.update(db_item)
 
         self.guild_settings[context.guild.id]["role_emoji"] = role_emoji
 
@@ -854,7 +908,7 @@ class PingableRolesCog(commands.Cog):
             poll_id=role_poll.id,
             poll=role_poll.to_dict()
         )
-        self.db.create(db_item)
+        await self.db.create(db_item)
         self.polls[role_poll.id] = {"name": role_name, "menu": role_poll}
         self.ensure_tasks()
         await context.reply(self.user_strings["create_success"])
@@ -874,7 +928,7 @@ class PingableRolesCog(commands.Cog):
         deleted_roles = []
 
         for role in context.message.role_mentions:
-            db_item = self.db.get(PingableRoles, guild_id=context.guild.id, role_id=role.id)
+            db_item = await self.db.get(PingableRoles, guild_id=context.guild.id, role_id=role.id)
             if not db_item:
                 await context.send(self.user_strings["not_pingable_role"].format(role=role.name))
             else:
@@ -904,7 +958,7 @@ class PingableRolesCog(commands.Cog):
         converted_roles = []
 
         for role in context.message.role_mentions:
-            db_item = self.db.get(PingableRoles, guild_id=context.guild.id, role_id=role.id)
+            db_item = await self.db.get(PingableRoles, guild_id=context.guild.id, role_id=role.id)
             if db_item:
                 await context.send(self.user_strings["already_exists"].format(role=role.name))
             else:
@@ -960,10 +1014,10 @@ class PingableRolesCog(commands.Cog):
         role_menu = await self.get_menu_from_role_ping(context, pingable_role)
         role_menu.cooldown = cooldown_seconds
 
-        db_item = self.db.get(PingableRoles, guild_id=context.guild.id, role_id=pingable_role.id)
+        db_item = await self.db.get(PingableRoles, guild_id=context.guild.id, role_id=pingable_role.id)
         if db_item:
             db_item.menu = role_menu.to_dict()
-            self.db.update(db_item)
+            await self.db.update(db_item)
         else:
             db_item = PingableRoles(
                 guild_id=context.guild.id,
@@ -973,7 +1027,7 @@ class PingableRolesCog(commands.Cog):
                 monthly_pings=0,
                 total_pings=0
             )
-            self.db.create(db_item)
+            await self.db.create(db_item)
 
         await context.reply(
             self.user_strings["role_cooldown_updated"].format(role=pingable_role.name,
@@ -3,7 +3,7 @@ import os
 import shlex
 
 from discord.ext import commands
-from esportsbot.db_gateway import DBGatewayActions
+from esportsbot.db_gateway import AsyncDBGatewayActions
 from esportsbot.DiscordReactableMenus.EmojiHandler import (EmojiKeyError, MultiEmoji)
 from esportsbot.DiscordReactableMenus.ExampleMenus import RoleReactMenu
 from esportsbot.DiscordReactableMenus.reactable_lib import get_menu
@@ -21,7 +21,7 @@ class RoleReactCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.user_strings = self.bot.STRINGS["role_reacts"]
-        self.db = DBGatewayActions()
+        self.db = AsyncDBGatewayActions()
         self.reaction_menus = {}
         self.logger = logging.getLogger(__name__)
         self.logger.info(f"Finished loading {__name__}... waiting for ready")
@@ -40,24 +40,24 @@ class RoleReactCog(commands.Cog):
         Loads saved role reaction menus from the DB for all guilds .
         :return: A dictionary of reaction menu IDs and their reaction menus .
         """
-        all_menus = self.db.list(RoleMenus)
+        all_menus = await self.db.list(RoleMenus)
         loaded_menus = {}
         for menu in all_menus:
             loaded_menus[menu.menu_id] = await RoleReactMenu.from_dict(self.bot, menu.menu)
         return loaded_menus
 
-    def add_or_update_db(self, menu_id):
+    async def add_or_update_db(self, menu_id):
         """
         Creates a new DB item or updates an existing one for a given menu id .
         :param menu_id: The menu id to create or update .
         """
-        db_item = self.db.get(RoleMenus, menu_id=menu_id)
+        db_item = await self.db.get(RoleMenus, menu_id=menu_id)
         if db_item:
             db_item.menu = self.reaction_menus.get(menu_id).to_dict()
-            self.db.update(db_item)
+            await self.db.update(db_item)
         else:
             db_item = RoleMenus(menu_id=menu_id, menu=self.reaction_menus.get(menu_id).to_dict())
-            self.db.create(db_item)
+            await self.db.create(db_item)
 
     @staticmethod
     def options_from_strings(message, roles):
@@ -136,7 +136,7 @@ class RoleReactCog(commands.Cog):
         await role_menu.finalise_and_send(self.bot, context.channel)
 
         self.reaction_menus[role_menu.id] = role_menu
-        self.add_or_update_db(role_menu.id)
+        await self.add_or_update_db(role_menu.id)
         if DELETE_ON_CREATE:
             await context.message.delete()
 
@@ -172,7 +172,7 @@ class RoleReactCog(commands.Cog):
 
         found_menu.add_many(options_to_add)
         await found_menu.update_message()
-        self.add_or_update_db(found_menu.id)
+        await self.add_or_update_db(found_menu.id)
 
     @command_group.command(name="remove-option")
     @commands.has_permissions(administrator=True)
@@ -191,7 +191,7 @@ class RoleReactCog(commands.Cog):
 
         menu.remove_option(option_key)
         await menu.update_message()
-        self.add_or_update_db(menu.id)
+        await self.add_or_update_db(menu.id)
 
     @command_group.command(name="disable-menu")
     @commands.has_permissions(administrator=True)
@@ -207,7 +207,7 @@ class RoleReactCog(commands.Cog):
             return
 
         await menu.disable_menu(self.bot)
-        self.add_or_update_db(menu.id)
+        await self.add_or_update_db(menu.id)
         await context.reply(self.user_strings["disable_menu"].format(menu_id=menu.id))
 
     @command_group.command(name="enable-menu")
@@ -224,7 +224,7 @@ class RoleReactCog(commands.Cog):
             return
 
         await menu.enable_menu(self.bot)
-        self.add_or_update_db(menu.id)
+        await self.add_or_update_db(menu.id)
         await context.reply(self.user_strings["enable_menu"].format(menu_id=menu.id))
 
     @command_group.command(name="delete-menu")
@@ -243,8 +243,8 @@ class RoleReactCog(commands.Cog):
 
         await menu.message.delete()
         self.reaction_menus.pop(menu.id)
-        db_item = self.db.get(RoleMenus, menu_id=menu.id)
-        self.db.delete(db_item)
+        db_item = await self.db.get(RoleMenus, menu_id=menu.id)
+        await self.db.delete(db_item)
         await context.reply(self.user_strings["delete_menu"].format(menu_id=menu.id))
 
     @command_group.command(name="toggle-ids")
@@ -260,7 +260,7 @@ class RoleReactCog(commands.Cog):
                 continue
             menu.toggle_footer()
             await menu.update_message()
-            self.add_or_update_db(menu_id)
+            await self.add_or_update_db(menu_id)
 
     @remove_menu_option.error
     async def remove_error(self, context: commands.Context, error):
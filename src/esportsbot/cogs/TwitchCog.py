@@ -8,9 +8,9 @@ Twitch notifications get sent and which accounts notifications are sent for.
 import asyncio
 import json
 from datetime import datetime
-import hashlib
-import hmac
 import os
+import threading
+import time
 from typing import Any
 
 import aiohttp
@@ -19,24 +19,30 @@ from discord import Webhook, Embed, AsyncWebhookAdapter
 from tornado.httpserver import HTTPServer
 import tornado.web
 
-import ast
-
-from discord.ext import commands
+from discord.ext import commands, tasks
 from tornado import httputil
 from tornado.web import Application
 
 import logging
 
-from esportsbot.db_gateway import DBGatewayActions
+from esportsbot.db_gateway import AsyncDBGatewayActions
+from esportsbot.lib import metrics
+from esportsbot.lib.cache import TTLCache
+from esportsbot.lib.dedup import ExpiringIdSet
 from esportsbot.lib.discordUtil import get_webhook_by_name, load_discord_hooks
+from esportsbot.lib.eventsub import json_loads, verify_signature
+from esportsbot.lib.webhook_dispatcher import WebhookDispatcher
 from esportsbot.models import TwitchInfo
 
 SUBSCRIPTION_SECRET = os.getenv("TWITCH_SUB_SECRET")
 CLIENT_ID = os.getenv("TWITCH_CLIENT_ID")
 CLIENT_SECRET = os.getenv("TWITCH_CLIENT_SECRET")
 BEARER_TEMP_FILE = os.getenv("TEMP_BEARER_FILE")
+SEEN_IDS_FILE = os.getenv("TWITCH_SEEN_IDS_FILE")  # Optional file the seen message IDs are saved to between restarts.
 WEBHOOK_PREFIX = "TwitchHook-"
-BEARER_PADDING = 2 * 60  # Number of minutes before expiration of bearer where the same bearer will still be used.
+BEARER_PADDING = 2 * 60  # Number of seconds before expiration of bearer where the same bearer will still be used.
+BEARER_REFRESH_AHEAD = 10 * 60  # Number of seconds before expiration of bearer that a new bearer is fetched in the background.
+BEARER_RETRY_DELAY = 60  # Number of seconds to wait before trying to fetch a new bearer again after failing to.
 DATETIME_FMT = "%d/%m/%Y %H:%M:%S"
 TWITCH_EMBED_COLOUR = 0x6441a4
 TWITCH_ICON = "https://pbs.twimg.com/profile_images/1189705970164875264/oXl0Jhyd_400x400.jpg"
@@ -49,6 +55,27 @@ TWITCH_SUB_BASE = TWITCH_EVENT_BASE + "/subscriptions"
 TWITCH_ID_BASE = "https://id.twitch.tv"
 TWITCH_BASE = "https://twitch.tv"
 
+# Every request to Twitch and to the Discord webhooks is made through one session, so connections are kept alive and reused.
+HTTP_CONNECTION_LIMIT = int(os.getenv("TWITCH_HTTP_CONNECTION_LIMIT", "50"))  # Total open connections.
+HTTP_HOST_CONNECTION_LIMIT = int(os.getenv("TWITCH_HTTP_HOST_CONNECTION_LIMIT", "20"))  # Open connections per host.
+HTTP_KEEPALIVE_TIMEOUT = 60  # Seconds an idle connection is kept open for.
+HTTP_DNS_CACHE_TTL = 300  # Seconds a DNS lookup is cached for.
+
+# The title, game and icon of tracked channels are cached so that go-live notifications can be sent without waiting on Twitch.
+# The cache of every tracked channel is refreshed in batches at twice the rate it expires, so it is normally always warm.
+BROADCASTER_CACHE_TTL = int(os.getenv("TWITCH_BROADCASTER_CACHE_TTL", "300"))
+BROADCASTER_CACHE_SIZE = 4096
+BROADCASTER_REFRESH_INTERVAL = BROADCASTER_CACHE_TTL / 2
+HELIX_BATCH_SIZE = 100  # The maximum number of IDs Twitch accepts in a single request.
+
+# Twitch retries a message it thinks was not received for up to 10 minutes, so the IDs of the messages received are
+# remembered for a little longer than that.
+SEEN_ID_WINDOW = 11 * 60
+SEEN_ID_BUCKET_LENGTH = 60
+SEEN_ID_MAX_SIZE = 100000
+# Seconds between saves of the seen message IDs, so that few are lost if the bot is killed rather than shut down.
+SEEN_ID_SAVE_INTERVAL = 30
+
 
 class TwitchApp(Application):
     """
@@ -57,81 +84,202 @@ class TwitchApp(Application):
     """
     def __init__(self, handlers=None, default_host=None, transforms=None, **settings: Any):
         super().__init__(handlers, default_host, transforms, **settings)
-        self.seen_ids = set()
+        self.seen_ids = ExpiringIdSet(SEEN_ID_WINDOW, SEEN_ID_BUCKET_LENGTH, SEEN_ID_MAX_SIZE)
+        self._seen_ids_saved = None  # The number of IDs that had been added to the seen IDs when they were last saved.
+        self._seen_ids_save_lock = threading.Lock()  # Saves are made from worker threads as well as the event loop.
+        self.seen_ids_metric = metrics.registry.stats_gauge(
+            "esportsbot_twitch_seen_message_ids",
+            "Duplicate, new and expired Twitch message IDs, and the number of IDs currently remembered.",
+            self.seen_ids.stats
+        )
         self.hooks = {}  # Hook ID: {"token": token, "guild id": guild id, "name": name}
         self.bearer = None
+        self.bearer_expires_at = 0.0  # The monotonic time the bearer expires at.
+        self._bearer_refresh = None  # The task fetching a new bearer, shared by every caller that needs it.
+        self._bearer_refresh_timer = None  # The timer handle that starts fetching a new bearer before the current expires.
         self.tracked_channels = None  # Channel ID : {Hook ID : message}
         self.subscriptions = []
         self.logger = logging.getLogger(__name__)
+        self._session = None
+        self.broadcaster_cache: TTLCache[str, dict] = TTLCache(BROADCASTER_CACHE_SIZE, BROADCASTER_CACHE_TTL)
+        self.webhook_dispatcher = WebhookDispatcher("twitch", lambda: self.session)
+
+    @property
+    def session(self):
+        """
+        The HTTP session shared by every request the app makes. It is created the first time it is used, as it must be
+        created from within the event loop.
+        :return: An aiohttp ClientSession.
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=HTTP_CONNECTION_LIMIT,
+                limit_per_host=HTTP_HOST_CONNECTION_LIMIT,
+                keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=HTTP_DNS_CACHE_TTL
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def close(self):
+        """
+        Close the HTTP session shared by the app and its webhook dispatcher, and all of its connections.
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self._bearer_refresh_timer is not None:
+            self._bearer_refresh_timer.cancel()
+            self._bearer_refresh_timer = None
+        if self._bearer_refresh is not None and not self._bearer_refresh.done():
+            self._bearer_refresh.cancel()
+        self.save_seen_ids()
+        metrics.registry.unregister(self.seen_ids_metric)
+
+    def bearer_valid(self):
+        """
+        Checks if the current bearer token will still be valid for at least the BEARER_PADDING time.
+        :return: True if the current bearer can still be used, else False.
+        """
+        return self.bearer is not None and time.monotonic() + BEARER_PADDING < self.bearer_expires_at
 
     async def get_bearer(self):
         """
         Gets the current bearer token and information or generates a new one if the current one has expired.
-        :return: A dictionary containing when the token was created, how long it lasts for and the token itself.
+        :return: A dictionary containing when the token was created, how long it lasts for and the token itself, or None if
+                 a new token was needed and could not be fetched.
         """
+        if self.bearer_valid():
+            return self.bearer
+        return await self.refresh_bearer()
 
-        self.logger.debug("Checking Twitch bearer token status...")
-        current_time = datetime.now()
-        if self.bearer is not None:
-            # If there is a currently active bearer, check if it is still valid.
-            grant_time = datetime.strptime(self.bearer.get("granted_on"), DATETIME_FMT)
-            time_delta = current_time - grant_time
-            delta_seconds = time_delta.total_seconds()
-            expires_in = self.bearer.get("expires_in")  # Number of seconds the token is valid for.
-            if delta_seconds + BEARER_PADDING < expires_in:
-                # The bearer is still valid, and will be still valid for the BEARER_PADDING time.
-                self.logger.debug(
-                    "Current Twitch bearer token is still valid, there are %d seconds remaining!",
-                    (expires_in - delta_seconds)
-                )
-                return self.bearer
+    async def refresh_bearer(self):
+        """
+        Fetches a new bearer token. If a new token is already being fetched, waits for that one instead of fetching another.
+        :return: The bearer token information, or None if there is no valid token.
+        """
+        if self._bearer_refresh is None or self._bearer_refresh.done():
+            self._bearer_refresh = asyncio.ensure_future(self.fetch_bearer())
+        # Shielded so that a caller being cancelled does not cancel the fetch for every other caller.
+        return await asyncio.shield(self._bearer_refresh)
+
+    async def get_auth_headers(self):
+        """
+        Gets the headers that authorise a request to the Twitch API with the current bearer token.
+        :return: A dictionary of headers, or None if there is no valid bearer token to make the request with.
+        """
+        bearer_info = await self.get_bearer()
+        if bearer_info is None:
+            self.logger.error("Unable to make a request to Twitch without a valid bearer token!")
+            return None
+        return {"Client-ID": CLIENT_ID, "Authorization": "Bearer " + bearer_info.get("access_token")}
 
+    async def fetch_bearer(self):
+        """
+        Requests a new bearer token from Twitch, and saves it if it was granted.
+        :return: The bearer token information, or None if there is no valid token.
+        """
+        self.logger.debug("Fetching a new Twitch bearer token...")
         bearer_url = TWITCH_ID_BASE + "/oauth2/token"
         params = {"client_id": CLIENT_ID, "client_secret": CLIENT_SECRET, "grant_type": "client_credentials"}
 
-        # Get a new bearer:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url=bearer_url, params=params) as response:
+        try:
+            async with self.session.post(url=bearer_url, params=params) as response:
                 if response.status != 200:
-                    self.bearer = None
-                else:
-                    data = await response.json()
-                    self.bearer = {
-                        "granted_on": current_time.strftime(DATETIME_FMT),
-                        "expires_in": data.get("expires_in"),
-                        "access_token": data.get("access_token")
-                    }
-
-        self.save_bearer()
+                    raise aiohttp.ClientResponseError(response.request_info, response.history, status=response.status)
+                data = await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            self.logger.error("Unable to get a new Twitch bearer token: %s", e)
+            self.schedule_bearer_refresh(BEARER_RETRY_DELAY)
+            return self.bearer if self.bearer_valid() else None
+
+        if not isinstance(data, dict) or not isinstance(data.get("access_token"), str) \
+                or not isinstance(data.get("expires_in"), (int, float)):
+            self.logger.error("Twitch did not grant a usable bearer token, the response was missing the token or its expiry")
+            self.schedule_bearer_refresh(BEARER_RETRY_DELAY)
+            return self.bearer if self.bearer_valid() else None
+
+        self.set_bearer(datetime.now(), data.get("expires_in"), data.get("access_token"))
+        await asyncio.get_event_loop().run_in_executor(None, self.save_bearer)
         return self.bearer
 
+    def set_bearer(self, granted_on, expires_in, access_token):
+        """
+        Sets the current bearer token, and schedules fetching the next one ahead of when it expires.
+        :param granted_on: The datetime the token was granted at.
+        :param expires_in: The number of seconds the token was valid for when it was granted.
+        :param access_token: The token itself.
+        """
+        self.bearer = {
+            "granted_on": granted_on.strftime(DATETIME_FMT),
+            "expires_in": expires_in,
+            "access_token": access_token
+        }
+        # The wall clock is only used to find how long is left, so that changes to the system time do not affect the expiry.
+        remaining = expires_in - (datetime.now() - granted_on).total_seconds()
+        self.bearer_expires_at = time.monotonic() + remaining
+        self.schedule_bearer_refresh(remaining - BEARER_REFRESH_AHEAD)
+
+    def schedule_bearer_refresh(self, delay):
+        """
+        Schedules fetching a new bearer token in the background.
+        :param delay: The number of seconds to wait before fetching the new token.
+        """
+        if self._bearer_refresh_timer is not None:
+            self._bearer_refresh_timer.cancel()
+        self._bearer_refresh_timer = asyncio.get_event_loop().call_later(
+            max(delay, 0),
+            lambda: asyncio.ensure_future(self.refresh_bearer())
+        )
+
     def load_bearer(self):
         """
         Load an existing bearer token from a file, if it exists.
         """
         try:
             with open(BEARER_TEMP_FILE, "r") as f:
-                lines = f.readlines()
-            self.bearer = {
-                "granted_on": lines[0].replace("\n",
-                                               ""),
-                "expires_in": int(lines[1].replace("\n",
-                                                   "")),
-                "access_token": lines[2].replace("\n",
-                                                 "")
-            }
-        except FileNotFoundError:
+                lines = f.read().splitlines()
+            self.set_bearer(datetime.strptime(lines[0], DATETIME_FMT), int(lines[1]), lines[2])
+        except (FileNotFoundError, IndexError, ValueError):
             self.bearer = None
 
     def save_bearer(self):
         """
-        Save the current bearer token to a file, so that it can be reused while still valid.
+        Save the current bearer token to a file, so that it can be reused while still valid. The file is replaced
+        atomically, so a crash while saving cannot leave a partially written token behind.
         """
         if self.bearer is not None:
-            with open(BEARER_TEMP_FILE, "w") as f:
+            temp_file = BEARER_TEMP_FILE + ".tmp"
+            with open(temp_file, "w") as f:
                 f.write(str(self.bearer.get("granted_on")) + "\n")
                 f.write(str(self.bearer.get("expires_in")) + "\n")
                 f.write(str(self.bearer.get("access_token")))
+            os.replace(temp_file, BEARER_TEMP_FILE)
+
+    def load_seen_ids(self):
+        """
+        Load the IDs of the messages received before the last restart, if they were saved.
+        """
+        if SEEN_IDS_FILE:
+            self.seen_ids.load(SEEN_IDS_FILE)
+            self.logger.info("Loaded %d seen Twitch message IDs", len(self.seen_ids))
+
+    def save_seen_ids(self):
+        """
+        Save the IDs of the messages received, so that messages Twitch retries after a restart are still ignored.
+        """
+        if not SEEN_IDS_FILE:
+            return
+        with self._seen_ids_save_lock:
+            added = self.seen_ids.misses
+            if added == self._seen_ids_saved:
+                # No new IDs have been seen since the last save.
+                return
+            try:
+                self.seen_ids.save(SEEN_IDS_FILE)
+                self._seen_ids_saved = added
+            except OSError as e:
+                self.logger.error("Unable to save the seen Twitch message IDs: %s", e)
 
     async def load_tracked_channels(self, db_channels):
         """
@@ -145,6 +293,11 @@ class TwitchApp(Application):
 
         # Get the list of events we are subscribed to from Twitch's end.
         subscribed_events = await self.get_subscribed_events()
+        if subscribed_events is None:
+            # Without the list of events the subscriptions cannot be checked, so they are left as they are.
+            self.logger.error("Unable to check the Twitch event subscriptions, they will not be updated")
+            self.tracked_channels = db_channels
+            return
         self.subscriptions = subscribed_events
         channels_not_tracked = list(db_channels.keys())
 
@@ -185,16 +338,16 @@ class TwitchApp(Application):
 
         delete_url = TWITCH_SUB_BASE
         params = {"id": event_id}
-        bearer_info = await self.get_bearer()
-        headers = {"Client-ID": CLIENT_ID, "Authorization": "Bearer " + bearer_info.get("access_token")}
-
-        async with aiohttp.ClientSession() as session:
-            async with session.delete(url=delete_url, params=params, headers=headers) as response:
-                if response.status == 204:
-                    # Remove the event from the list:
-                    self.subscriptions = [x for x in self.subscriptions if x.get("id") != event_id]
-                    return True
-                return False
+        headers = await self.get_auth_headers()
+        if headers is None:
+            return False
+
+        async with self.session.delete(url=delete_url, params=params, headers=headers) as response:
+            if response.status == 204:
+                # Remove the event from the list:
+                self.subscriptions = [x for x in self.subscriptions if x.get("id") != event_id]
+                return True
+            return False
 
     async def delete_channel_subscription(self, channel_id):
         """
@@ -229,19 +382,17 @@ class TwitchApp(Application):
             # Get the channel ID from the channel name.
             channel_info = await self.get_channel_info(channel_name)
 
-            if len(channel_info) == 0:
+            if not channel_info:
                 return False
 
             channel_info = channel_info[0]
             channel_id = channel_info.get("id")
 
         subscription_url = TWITCH_SUB_BASE
-        bearer_info = await self.get_bearer()
-        headers = {
-            "Client-ID": CLIENT_ID,
-            "Authorization": "Bearer " + bearer_info.get("access_token"),
-            "Content-Type": "application/json"
-        }
+        headers = await self.get_auth_headers()
+        if headers is None:
+            return False
+        headers["Content-Type"] = "application/json"
 
         # The required body to subscribe to an event:
         body = {
@@ -259,9 +410,8 @@ class TwitchApp(Application):
 
         # Needs to be as a json:
         body_json = json.dumps(body)
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url=subscription_url, data=body_json, headers=headers) as response:
-                return response.status == 202
+        async with self.session.post(url=subscription_url, data=body_json, headers=headers) as response:
+            return response.status == 202
 
     async def get_channel_info(self, channel_name):
         """
@@ -272,16 +422,96 @@ class TwitchApp(Application):
 
         channel_url = TWITCH_HELIX_BASE + "/search/channels"
         params = {"query": channel_name}
-        bearer_info = await self.get_bearer()
-        headers = {"Client-ID": CLIENT_ID, "Authorization": "Bearer " + bearer_info.get("access_token")}
+        headers = await self.get_auth_headers()
+        if headers is None:
+            return None
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url=channel_url, params=params, headers=headers) as response:
-                if response.status != 200:
-                    self.logger.error("Unable to get Twitch channel info! Response status was %d", response.status)
-                    return None
-                data = await response.json()
-                return data.get("data")
+        async with self.session.get(url=channel_url, params=params, headers=headers) as response:
+            if response.status != 200:
+                self.logger.error("Unable to get Twitch channel info! Response status was %d", response.status)
+                return None
+            data = await response.json()
+            return data.get("data")
+
+    async def get_broadcasters(self, broadcaster_ids):
+        """
+        Returns the information about the given channels using their IDs as the lookup parameter. Channels that were looked
+        up recently are returned from the cache, the rest are looked up together.
+        :param broadcaster_ids: A list of the IDs of the channels.
+        :return: A dictionary of channel ID to a dictionary containing the login, display name, stream title, game name
+                 and icon of the channel. Channels that could not be found are missing from the dictionary.
+        """
+        broadcasters = {}
+        missing_ids = []
+        for broadcaster_id in broadcaster_ids:
+            broadcaster = self.broadcaster_cache.get(broadcaster_id)
+            if broadcaster is None:
+                missing_ids.append(broadcaster_id)
+            else:
+                broadcasters[broadcaster_id] = broadcaster
+
+        if missing_ids:
+            broadcasters.update(await self.fetch_broadcasters(missing_ids))
+        return broadcasters
+
+    async def fetch_broadcasters(self, broadcaster_ids):
+        """
+        Looks up the information about the given channels from Twitch in batches, and caches the results.
+        :param broadcaster_ids: A list of the IDs of the channels.
+        :return: A dictionary of channel ID to a dictionary containing the login, display name, stream title, game name
+                 and icon of the channel.
+        """
+        headers = await self.get_auth_headers()
+        if headers is None:
+            return {}
+
+        broadcasters = {}
+        for i in range(0, len(broadcaster_ids), HELIX_BATCH_SIZE):
+            batch = broadcaster_ids[i:i + HELIX_BATCH_SIZE]
+            # The stream title and game come from the channel, but the icon only comes from the user.
+            channels, users = await asyncio.gather(
+                self.get_helix_data("/channels", [("broadcaster_id", x) for x in batch], headers),
+                self.get_helix_data("/users", [("id", x) for x in batch], headers)
+            )
+            if channels is None:
+                continue
+
+            users = {x.get("id"): x for x in users or []}
+            for channel in channels:
+                broadcaster_id = channel.get("broadcaster_id")
+                broadcaster = {
+                    "id": broadcaster_id,
+                    "broadcaster_login": channel.get("broadcaster_login"),
+                    "display_name": channel.get("broadcaster_name"),
+                    "title": channel.get("title"),
+                    "game_name": channel.get("game_name"),
+                    "thumbnail_url": users.get(broadcaster_id, {}).get("profile_image_url")
+                }
+                self.broadcaster_cache.set(broadcaster_id, broadcaster)
+                broadcasters[broadcaster_id] = broadcaster
+        return broadcasters
+
+    async def refresh_broadcasters(self):
+        """
+        Looks up the information about every tracked channel again, so that it is cached before any of them go live.
+        """
+        if self.tracked_channels:
+            await self.fetch_broadcasters(list(self.tracked_channels))
+
+    async def get_helix_data(self, endpoint, params, headers):
+        """
+        Makes a GET request to an endpoint of the Twitch Helix API.
+        :param endpoint: The path of the endpoint, relative to the Helix API.
+        :param params: The query parameters of the request.
+        :param headers: The headers of the request, including the authorisation.
+        :return: The list of data in the response, or None if there was an error.
+        """
+        async with self.session.get(url=TWITCH_HELIX_BASE + endpoint, params=params, headers=headers) as response:
+            if response.status != 200:
+                self.logger.error("Unable to get %s from Twitch! Response status was %d", endpoint, response.status)
+                return None
+            data = await response.json()
+            return data.get("data")
 
     async def get_subscribed_events(self):
         """
@@ -290,15 +520,15 @@ class TwitchApp(Application):
         """
 
         events_url = TWITCH_SUB_BASE
-        bearer_info = await self.get_bearer()
-        headers = {"Client-ID": CLIENT_ID, "Authorization": "Bearer " + bearer_info.get("access_token")}
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url=events_url, headers=headers) as response:
-                if response.status != 200:
-                    self.logger.error("Unable to get subscribed event list! Response status was %d", response.status)
-                    return None
-                data = await response.json()
-                return data.get("data")
+        headers = await self.get_auth_headers()
+        if headers is None:
+            return None
+        async with self.session.get(url=events_url, headers=headers) as response:
+            if response.status != 200:
+                self.logger.error("Unable to get subscribed event list! Response status was %d", response.status)
+                return None
+            data = await response.json()
+            return data.get("data")
 
     def add_hook(self, hook):
         """
@@ -334,19 +564,10 @@ class TwitchListener(tornado.web.RequestHandler):
         """
         Using the headers and the body of a message, confirm weather or not the incoming request came from Twitch.
         :param headers: The request's headers.
-        :param body: The raw body of the request, not turned into a dict or other kind of data.
+        :param body: The raw bytes of the body of the request, not decoded or turned into a dict or other kind of data.
         :return: True if the signature provided in the header is the same as the calculated signature.
         """
-
-        message_signature = headers.get("Twitch-Eventsub-Message-Signature")
-        hmac_message = headers.get("Twitch-Eventsub-Message-Id") + headers.get("Twitch-Eventsub-Message-Timestamp") + body
-        hmac_message_bytes = bytes(hmac_message, "utf-8")
-        secret_bytes = bytes(SUBSCRIPTION_SECRET, "utf-8")
-
-        calculated_signature = hmac.new(secret_bytes, hmac_message_bytes, hashlib.sha256)
-        expected_signature = "sha256=" + calculated_signature.hexdigest()
-
-        return expected_signature == message_signature
+        return verify_signature(SUBSCRIPTION_SECRET, headers, body)
 
     async def post(self):
         """
@@ -357,27 +578,32 @@ class TwitchListener(tornado.web.RequestHandler):
 
         self.logger.debug("Received a POST request on /webhook")
         current_request = self.request
-        message_body = current_request.body.decode("utf-8")
-        body_dict = ast.literal_eval(message_body)
         message_headers = current_request.headers
 
+        # Verify that the message we have received has come from Twitch, using the raw body so that nothing is decoded for
+        # messages that are not.
+        if not self.verify_twitch(message_headers, current_request.body):
+            self.logger.error(
+                "The message received at %s was not a legitimate message from Twitch, ignoring!",
+                message_headers.get("Twitch-Eventsub-Message-Timestamp")
+            )
+            self.set_status(403)
+            await self.finish()
+            return
+
         # Check for messages that have already been received and processed. Twitch will repeat a message if it
         # thinks we have not received it.
-        if message_headers.get("Twitch-Eventsub-Message-Id") in self.application.seen_ids:
-            self.logger.debug("The message was already received before, ignoring!")
+        if not self.application.seen_ids.add(message_headers.get("Twitch-Eventsub-Message-Id")):
+            self.logger.debug("The message was already received before, ignoring! %s", self.application.seen_ids.stats())
             self.set_status(208)
             await self.finish()
             return
-        else:
-            self.application.seen_ids.add(message_headers.get("Twitch-Eventsub-Message-Id"))
 
-        # Verify that the message we have received has come from Twitch.
-        if not self.verify_twitch(message_headers, message_body):
-            self.logger.error(
-                "The message received at %s was not a legitimate message from Twitch, ignoring!",
-                message_headers.get("Twitch-Eventsub-Message-Timestamp")
-            )
-            self.set_status(403)
+        try:
+            body_dict = json_loads(current_request.body)
+        except ValueError:
+            self.logger.error("The message received from Twitch was not valid JSON, ignoring!")
+            self.set_status(400)
             await self.finish()
             return
 
@@ -403,37 +629,42 @@ class TwitchListener(tornado.web.RequestHandler):
 
         event = request_body.get("event")
 
+        channel_id = event.get("broadcaster_user_id")
         channel_name = event.get("broadcaster_user_login")
 
-        channel_info = await self.application.get_channel_info(channel_name)
+        channel_info = (await self.application.get_broadcasters([channel_id])).get(channel_id)
         if not channel_info:
+            self.logger.error("Unable to get the Twitch channel info of %s(%s)!", channel_name, channel_id)
             return
-        channel_info = channel_info[0]
         game_name = channel_info.get("game_name")
         stream_title = channel_info.get("title")
         user_icon = channel_info.get("thumbnail_url")
 
-        async with aiohttp.ClientSession() as session:
-            hook_adapter = AsyncWebhookAdapter(session)
-            for hook_id in self.application.tracked_channels.get(channel_info.get("id")):
-                hook_token = self.application.hooks.get(hook_id).get("token")
-                webhook = Webhook.partial(id=hook_id, token=hook_token, adapter=hook_adapter)
-                custom_message = self.application.tracked_channels.get(channel_info.get("id")).get(hook_id)
+        deliveries = []
+        for hook_id in self.application.tracked_channels.get(channel_id):
+            hook_token = self.application.hooks.get(hook_id).get("token")
+            custom_message = self.application.tracked_channels.get(channel_id).get(hook_id)
 
-                description = "​" if custom_message is None else custom_message
+            description = "​" if custom_message is None else custom_message
 
-                embed = Embed(
-                    title=stream_title,
-                    url=f"{TWITCH_BASE}/{channel_name}",
-                    description=description,
-                    color=TWITCH_EMBED_COLOUR
-                )
-                embed.set_author(name=channel_name, url=f"{TWITCH_BASE}/{channel_name}", icon_url=user_icon)
-                embed.set_thumbnail(url=user_icon)
-                embed.add_field(name="**Current Game:**", value=f"**{game_name}**")
+            embed = Embed(
+                title=stream_title,
+                url=f"{TWITCH_BASE}/{channel_name}",
+                description=description,
+                color=TWITCH_EMBED_COLOUR
+            )
+            embed.set_author(name=channel_name, url=f"{TWITCH_BASE}/{channel_name}", icon_url=user_icon)
+            embed.set_thumbnail(url=user_icon)
+            embed.add_field(name="**Current Game:**", value=f"**{game_name}**")
+
+            message = {"embeds": [embed.to_dict()], "username": channel_name + " is Live!", "avatar_url": TWITCH_ICON}
+            deliveries.append((hook_id, hook_token, message))
 
-                await webhook.send(embed=embed, username=channel_name + " is Live!", avatar_url=TWITCH_ICON)
-                self.logger.info("Sending Twitch notification to Discord Webhook %s(%s)", webhook.name, hook_id)
+        # Send to every Webhook at once, rather than making the last guild wait for all the others.
+        self.logger.info("Sending Twitch notification for %s to %d Discord Webhook(s)", channel_name, len(deliveries))
+        results = await self.application.webhook_dispatcher.send(deliveries)
+        if not all(results):
+            self.logger.error("Failed to send %d Twitch notification(s) for %s", results.count(False), channel_name)
 
 
 class TwitchCog(commands.Cog):
@@ -443,9 +674,20 @@ class TwitchCog(commands.Cog):
     def __init__(self, bot):
         self._bot = bot
         self.logger = logging.getLogger(__name__)
-        self._db = DBGatewayActions()
+        self._db = AsyncDBGatewayActions()
         self.user_strings = self._bot.STRINGS["twitch"]
         self._http_server, self._twitch_app = self.setup_http_listener()
+        self._bot.add_shutdown_task(self._twitch_app.close)
+
+    def cog_unload(self):
+        """
+        Stop listening for requests from Twitch and close the HTTP session used to talk to Twitch and Discord.
+        """
+        self._http_server.stop()
+        self.refresh_broadcasters.cancel()
+        self.save_seen_ids.cancel()
+        self._bot.remove_shutdown_task(self._twitch_app.close)
+        asyncio.ensure_future(self._twitch_app.close())
 
     @staticmethod
     def setup_http_listener():
@@ -473,21 +715,22 @@ class TwitchCog(commands.Cog):
         """
 
         self._twitch_app.load_bearer()
+        self._twitch_app.load_seen_ids()
 
         self._http_server.start()
 
         self.logger.info("Loading Discord Webhooks for Twitch Cog...")
 
-        tasks = []
+        webhook_tasks = []
         for guild in self._bot.guilds:
             self.logger.info("Loading webhooks from guild %s(%s)", guild.name, guild.id)
             if guild.me.guild_permissions.manage_webhooks:
-                tasks.append(guild.webhooks())
+                webhook_tasks.append(guild.webhooks())
             else:
                 self.logger.error("Missing permission 'manage webhooks' in guild %s(%s)", guild.name, guild.id)
 
         # Wait for all the tasks to finish.
-        results = await asyncio.gather(*tasks)
+        results = await asyncio.gather(*webhook_tasks)
 
         # Add the hooks to the App.
         hooks = load_discord_hooks(WEBHOOK_PREFIX, results, self._bot.user.id)
@@ -499,14 +742,36 @@ class TwitchCog(commands.Cog):
         )
 
         # Load tracked channels from DB.
-        db_data = self.load_db_data()
-        cleaned_data = self.remove_missing_hooks(db_data)
+        db_data = await self.load_db_data()
+        cleaned_data = await self.remove_missing_hooks(db_data)
         await self._twitch_app.load_tracked_channels(cleaned_data)
         if len(cleaned_data) > 0:
             self.logger.info("Currently tracking %d Twitch channels(s)", len(cleaned_data))
         else:
             self.logger.warning("There are no Twitch channels that are currently tracked!")
 
+        if not self.refresh_broadcasters.is_running():
+            self.refresh_broadcasters.start()
+        if SEEN_IDS_FILE and not self.save_seen_ids.is_running():
+            self.save_seen_ids.start()
+
+    @tasks.loop(seconds=BROADCASTER_REFRESH_INTERVAL)
+    async def refresh_broadcasters(self):
+        """
+        Periodically refreshes the cached information of the tracked Twitch channels.
+        """
+        try:
+            await self._twitch_app.refresh_broadcasters()
+        except Exception as e:
+            self.logger.error("Unable to refresh the Twitch channel info: %s", e)
+
+    @tasks.loop(seconds=SEEN_ID_SAVE_INTERVAL)
+    async def save_seen_ids(self):
+        """
+        Periodically saves the IDs of the Twitch messages received, so that they survive the bot crashing or being killed.
+        """
+        await self._bot.loop.run_in_executor(None, self._twitch_app.save_seen_ids)
+
     @commands.Cog.listener()
     async def on_disconnect(self):
         """
@@ -542,13 +807,13 @@ class TwitchCog(commands.Cog):
         channel_id = channel_info.get("id")
         return str(channel_id)
 
-    def load_db_data(self):
+    async def load_db_data(self):
         """
         Loads all the currently tracked Twitch channels and which guilds they are tracked in from the database.
         :return: A dictionary of Twitch channel ID to a set of guild IDs.
         """
 
-        db_data = self._db.list(TwitchInfo)
+        db_data = await self._db.list(TwitchInfo)
         guild_info = {}
         for item in db_data:
             if str(item.channel_id) not in guild_info:
@@ -558,7 +823,7 @@ class TwitchCog(commands.Cog):
 
         return guild_info
 
-    def remove_missing_hooks(self, db_data):
+    async def remove_missing_hooks(self, db_data):
         """
         Removes any hooks for channels where the Discord Webhook has been deleted.
         :param db_data: The loaded DB data.
@@ -572,9 +837,9 @@ class TwitchCog(commands.Cog):
                 if hook in self._twitch_app.hooks:
                     cleaned_db[channel][hook] = hooks.get(hook)
                 else:
-                    db_item = self._db.get(TwitchInfo, channel_id=channel, hook_id=hook)
+                    db_item = await self._db.get(TwitchInfo, channel_id=channel, hook_id=hook)
                     if db_item:
-                        self._db.delete(db_item)
+                        await self._db.delete(db_item)
             if not cleaned_db.get(channel):
                 # If a channel has no hooks to post to, remove it from the list.
                 cleaned_db.pop(channel)
@@ -593,9 +858,9 @@ class TwitchCog(commands.Cog):
         if hook_id not in self._twitch_app.tracked_channels.get(channel_id):
             return False
         self._twitch_app.tracked_channels.get(channel_id).pop(hook_id)
-        db_item = self._db.get(TwitchInfo, channel_id=channel_id, hook_id=hook_id)
+        db_item = await self._db.get(TwitchInfo, channel_id=channel_id, hook_id=hook_id)
         if db_item:
-            self._db.delete(db_item)
+            await self._db.delete(db_item)
 
         if not self._twitch_app.tracked_channels.get(channel_id):
             return await self._twitch_app.delete_channel_subscription(channel_id)
@@ -611,14 +876,14 @@ class TwitchCog(commands.Cog):
 
         return await self.get_channel_id(channel)
 
-    def get_webhook_channels_as_embed(self, webhook_id, webhook_name):
+    async def get_webhook_channels_as_embed(self, webhook_id, webhook_name):
         """
         Gets the list of channels and their custom messages for a given webhook.
         :param webhook_id: The ID of the Webhook to get the channels of.
         :param webhook_name: The name of the Webhook.
         :return: An embed representing the Twitch channels that post updates to the given Webhook.
         """
-        db_items = self._db.list(TwitchInfo, hook_id=webhook_id)
+        db_items = await self._db.list(TwitchInfo, hook_id=webhook_id)
         embed = Embed(
             title="**Currently Tracked Channels:**",
             description=f"These are the currently tracked channels for the Webhook: \n`{webhook_name}`",
@@ -684,12 +949,15 @@ class TwitchCog(commands.Cog):
             return
 
         self._twitch_app.hooks.pop(hook_id)
-        async with aiohttp.ClientSession() as session:
-            webhook = Webhook.partial(id=hook_id, token=hook_info.get("token"), adapter=AsyncWebhookAdapter(session))
-            await webhook.delete(reason=f"Deleted {hook_name} Twitch Webhook with command!")
+        webhook = Webhook.partial(
+            id=hook_id,
+            token=hook_info.get("token"),
+            adapter=AsyncWebhookAdapter(self._twitch_app.session)
+        )
+        await webhook.delete(reason=f"Deleted {hook_name} Twitch Webhook with command!")
 
         # Ensure that channels that were posting to that webhook are no longer trying to:
-        hook_channels = self._db.list(TwitchInfo, guild_id=context.guild.id, hook_id=hook_id)
+        hook_channels = await self._db.list(TwitchInfo, guild_id=context.guild.id, hook_id=hook_id)
         if not hook_channels:
             await context.send(self.user_strings["webhook_deleted"].format(name=hook_info.get("name"), hook_id=hook_id))
             return
@@ -735,7 +1003,7 @@ class TwitchCog(commands.Cog):
                 custom_message=custom_message,
                 twitch_handle=channel
             )
-            self._db.create(db_item)
+            await self._db.create(db_item)
             return
 
         if await self._twitch_app.create_subscription("stream.online", channel_name=channel):
@@ -748,7 +1016,7 @@ class TwitchCog(commands.Cog):
                 custom_message=custom_message,
                 twitch_handle=channel
             )
-            self._db.create(db_item)
+            await self._db.create(db_item)
             await context.send(self.user_strings["channel_added"].format(twitch_channel=channel, discord_channel=webhook_name))
         else:
             # Otherwise don't if it failed.
@@ -805,13 +1073,13 @@ class TwitchCog(commands.Cog):
                     webhook_name,
                     context.guild.id, WEBHOOK_PREFIX
             )
-            embed = self.get_webhook_channels_as_embed(webhook_id, webhook_info.get("name"))
+            embed = await self.get_webhook_channels_as_embed(webhook_id, webhook_info.get("name"))
             await context.send(embed=embed)
             return
 
         # Get the accounts for all the Webhooks.
         for hook in self._twitch_app.hooks:
-            embed = self.get_webhook_channels_as_embed(hook, self._twitch_app.hooks.get(hook).get("name"))
+            embed = await self.get_webhook_channels_as_embed(hook, self._twitch_app.hooks.get(hook).get("name"))
             await context.send(embed=embed)
 
     @twitch.command(name="webhooks")
@@ -860,10 +1128,10 @@ class TwitchCog(commands.Cog):
                 await context.send(self.user_strings["channel_not_tracked"].format(name=channel, webhook=webhook_name))
                 return
             self._twitch_app.tracked_channels[channel_id][webhook_id] = custom_message
-            db_item = self._db.get(TwitchInfo, guild_id=context.guild.id, channel_id=channel_id, hook_id=webhook_id)
+            db_item = await self._db.get(TwitchInfo, guild_id=context.guild.id, channel_id=channel_id, hook_id=webhook_id)
             if db_item:
                 db_item.custom_message = custom_message
-                self._db.update(db_item)
+                await self._db.update(db_item)
             if not custom_message:
                 custom_message = "<empty>"
             await context.send(
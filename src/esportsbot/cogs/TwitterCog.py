@@ -7,7 +7,8 @@ from discord.ext import commands
 from discord import Webhook, AsyncWebhookAdapter
 from discord.errors import Forbidden
 
-from esportsbot.db_gateway import DBGatewayActions
+from esportsbot.db_gateway import AsyncDBGatewayActions
+from esportsbot.lib.webhook_dispatcher import WebhookDispatcher
 from esportsbot.lib.stringTyping import str_is_int, str_is_channel_mention
 import aiohttp
 import asyncio
@@ -39,6 +40,27 @@ class TwitterWebhook(tweepy.StreamListener):
         self.logger.info("Loaded Twitter Webhook")
         self._hooks = {}
         self._tracked_accounts = defaultdict(set)
+        self._session = None
+        self.webhook_dispatcher = WebhookDispatcher("twitter", lambda: self.session)
+
+    @property
+    def session(self):
+        """
+        The HTTP session used for every request to the Discord Webhooks. It is created the first time it is used, as it
+        must be created from within the event loop.
+        :return: An aiohttp ClientSession.
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    async def close(self):
+        """
+        Close the HTTP session used to talk to the Discord Webhooks.
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
 
     def on_data(self, data):
         """
@@ -228,22 +250,23 @@ class TwitterWebhook(tweepy.StreamListener):
         # Get the set of guilds to send the updates to for the account that has the new status.
         account_guilds = self._tracked_accounts.get(status.get("user").get("id_str"))
 
-        async with aiohttp.ClientSession() as session:
-            hook_adapter = AsyncWebhookAdapter(session)
-            for hook_id in self._hooks:
-                if self._hooks.get(hook_id).get("guild_id") not in account_guilds:
-                    # Ignore hooks for guilds that don't get the updates for this account.
-                    continue
-
-                hook_token = self._hooks.get(hook_id).get("token")
-                webhook = Webhook.partial(id=hook_id, token=hook_token, adapter=hook_adapter)
-                self.logger.info("Sending to Webhook %s(%s)", self._hooks.get(hook_id).get("name"), hook_id)
-                # TODO: Decide how to title the Webhook in discord
-                await webhook.send(
-                    content=url,
-                    username=screen_name + " Tweeted",
-                    avatar_url=status["user"]["profile_image_url_https"]
-                )
+        # TODO: Decide how to title the Webhook in discord
+        message = {
+            "content": url,
+            "username": screen_name + " Tweeted",
+            "avatar_url": status["user"]["profile_image_url_https"]
+        }
+        deliveries = []
+        for hook_id in self._hooks:
+            if self._hooks.get(hook_id).get("guild_id") not in account_guilds:
+                # Ignore hooks for guilds that don't get the updates for this account.
+                continue
+
+            hook_token = self._hooks.get(hook_id).get("token")
+            self.logger.info("Sending to Webhook %s(%s)", self._hooks.get(hook_id).get("name"), hook_id)
+            deliveries.append((hook_id, hook_token, message))
+
+        await self.webhook_dispatcher.send(deliveries)
 
 
 class TwitterCog(commands.Cog):
@@ -258,7 +281,7 @@ class TwitterCog(commands.Cog):
         self.logger = logging.getLogger(__name__)
         self.loop = loop if loop is not None else asyncio.get_event_loop()
         self.user_strings = self._bot.STRINGS["twitter"]
-        self._db = DBGatewayActions()
+        self._db = AsyncDBGatewayActions()
 
         auth = tweepy.OAuthHandler(CONSUMER_KEY, CONSUMER_SECRET)
         auth.set_access_token(ACCESS_TOKEN, ACCESS_TOKEN_SECRET)
@@ -266,15 +289,23 @@ class TwitterCog(commands.Cog):
         self._api.verify_credentials()
         self._stream_listener = TwitterWebhook(self._api)
         self._filter = tweepy.Stream(self._api.auth, self._stream_listener)
+        self._bot.add_shutdown_task(self._stream_listener.close)
         self.logger.info(f"Finished loading {__name__}... waiting for ready")
 
+    def cog_unload(self):
+        """
+        Close the HTTP session used to send Tweets to the Discord Webhooks.
+        """
+        self._bot.remove_shutdown_task(self._stream_listener.close)
+        asyncio.ensure_future(self._stream_listener.close())
+
     @commands.Cog.listener()
     async def on_ready(self):
         """
         The bot needs to be ready before the discord Webhooks can be loaded as they can only be fetched once logged in.
         """
         await self.load_discord_hooks()
-        guild_info = self.load_db_data()
+        guild_info = await self.load_db_data()
 
         if len(guild_info) > 0:
             self._filter.filter(follow=list(guild_info.keys()), is_async=True)
@@ -305,7 +336,7 @@ class TwitterCog(commands.Cog):
 
         self.logger.info("Got %d webhook(s) to post updates to.", len(self._stream_listener.hooks))
 
-    def load_db_data(self) -> Dict[str, set]:
+    async def load_db_data(self) -> Dict[str, set]:
         """
         Loads the Twitter accounts and which guilds they should send updates to. Uses a defaultdict to enable easier
         additions of new accounts.
@@ -313,7 +344,7 @@ class TwitterCog(commands.Cog):
         :rtype: dict
         """
 
-        db_data = self._db.list(TwitterInfo)
+        db_data = await self._db.list(TwitterInfo)
         guild_info = defaultdict(set)
         for item in db_data:
             guild_info[str(item.twitter_user_id)].add(item.guild_id)
@@ -483,10 +514,13 @@ class TwitterCog(commands.Cog):
             )
             return False
 
-        async with aiohttp.ClientSession() as session:
-            webhook = Webhook.partial(id=h_id, token=hook_info.get("token"), adapter=AsyncWebhookAdapter(session))
-            await webhook.delete(reason="Deleted with removehook command")
-            self._stream_listener.remove_hook(h_id)
+        webhook = Webhook.partial(
+            id=h_id,
+            token=hook_info.get("token"),
+            adapter=AsyncWebhookAdapter(self._stream_listener.session)
+        )
+        await webhook.delete(reason="Deleted with removehook command")
+        self._stream_listener.remove_hook(h_id)
         await ctx.send(self.user_strings["webhook_deleted"].format(name=hook_info.get("name"), hook_id=h_id))
         return True
 
@@ -532,7 +566,7 @@ class TwitterCog(commands.Cog):
 
             if tracked_guilds is None or ctx.guild.id not in tracked_guilds:
                 db_item = TwitterInfo(guild_id=ctx.guild.id, twitter_user_id=user_id, twitter_handle=account)
-                self._db.create(db_item)
+                await self._db.create(db_item)
 
             self.logger.info("Added %s to accounts tracked", account)
             await ctx.send(self.user_strings["account_added"].format(account=account))
@@ -581,8 +615,8 @@ class TwitterCog(commands.Cog):
                 # The account is no longer tracked in any guild, can be removed from the filter.
                 current_filter.remove(user_id)
                 asyncio.create_task(self.refresh_filter(current_filter))
-            db_item = self._db.get(TwitterInfo, guild_id=ctx.guild.id, twitter_user_id=user_id)
-            self._db.delete(db_item)
+            db_item = await self._db.get(TwitterInfo, guild_id=ctx.guild.id, twitter_user_id=user_id)
+            await self._db.delete(db_item)
             self.logger.info("Removed %s from being tracked in %s(%s)", account, ctx.guild.name, ctx.guild.id)
             await ctx.send(self.user_strings["account_removed"].format(account=account))
 
@@ -600,7 +634,7 @@ class TwitterCog(commands.Cog):
         :return: None
         :rtype: NoneType
         """
-        handles = self._db.list(TwitterInfo, guild_id=ctx.guild.id)
+        handles = await self._db.list(TwitterInfo, guild_id=ctx.guild.id)
         if not handles:
             await ctx.send(self.user_strings["accounts_empty"])
             return
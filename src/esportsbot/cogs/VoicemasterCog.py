@@ -1,7 +1,7 @@
 import re
 from discord.ext import commands
 from esportsbot.base_functions import (get_whether_in_vm_parent, get_whether_in_vm_child)
-from esportsbot.db_gateway import DBGatewayActions
+from esportsbot.db_gateway import AsyncDBGatewayActions
 from esportsbot.models import VoicemasterMaster, VoicemasterSlave
 
 
@@ -50,21 +50,25 @@ class VoicemasterCog(commands.Cog):
 
         if before.channel:
             # The user has either disconnected or moved voice channels.
-            if get_whether_in_vm_child(before.channel.guild.id, before.channel.id):
+            if await get_whether_in_vm_child(before.channel.guild.id, before.channel.id):
                 # If the user was in a VM child.
-                vm_child = DBGatewayActions().get(VoicemasterSlave, guild_id=member.guild.id, channel_id=before.channel.id)
+                vm_child = await AsyncDBGatewayActions().get(
+                    VoicemasterSlave,
+                    guild_id=member.guild.id,
+                    channel_id=before.channel.id
+                )
                 if not before.channel.members:
                     # The VM is empty, delete it.
                     await before.channel.delete()
-                    DBGatewayActions().delete(vm_child)
+                    await AsyncDBGatewayActions().delete(vm_child)
                 elif vm_child.owner_id == member.id:
                     # It was the owner of the channel that left, transfer ownership.
                     if not vm_child.custom_name:
                         await before.channel.edit(name=f"{before.channel.members[0].display_name}'s VC")
                     vm_child.owner_id = before.channel.members[0].id
-                    DBGatewayActions().update(vm_child)
+                    await AsyncDBGatewayActions().update(vm_child)
 
-        if after.channel and get_whether_in_vm_parent(after.channel.guild.id, after.channel.id):
+        if after.channel and await get_whether_in_vm_parent(after.channel.guild.id, after.channel.id):
             child_channel = await member.guild.create_voice_channel(
                 f"{member.display_name}'s VC",
                 category=after.channel.category
@@ -76,7 +80,7 @@ class VoicemasterCog(commands.Cog):
                 locked=False,
                 custom_name=False
             )
-            DBGatewayActions().create(child_db_entry)
+            await AsyncDBGatewayActions().create(child_db_entry)
             await member.move_to(child_channel)
 
     @commands.group("voice", aliases=["vm"])
@@ -98,13 +102,24 @@ class VoicemasterCog(commands.Cog):
         is_a_valid_id = given_channel_id and given_channel_id.isdigit() and len(given_channel_id) == 18
 
         if is_a_valid_id:
-            is_a_parent = DBGatewayActions().get(VoicemasterMaster, guild_id=ctx.author.guild.id, channel_id=given_channel_id)
+            is_a_parent = await AsyncDBGatewayActions().get(
+                VoicemasterMaster,
+                guild_id=ctx.author.guild.id,
+                channel_id=given_channel_id
+            )
             is_voice_channel = hasattr(self.bot.get_channel(int(given_channel_id)), 'voice_states')
-            is_a_child = DBGatewayActions().get(VoicemasterSlave, guild_id=ctx.author.guild.id, channel_id=given_channel_id)
+            is_a_child = await AsyncDBGatewayActions().get(
+                VoicemasterSlave,
+                guild_id=ctx.author.guild.id,
+                channel_id=given_channel_id
+            )
 
             if is_voice_channel and not (is_a_parent or is_a_child):
                 # Not currently a Parent and is voice channel, add it
-                DBGatewayActions().create(VoicemasterMaster(guild_id=ctx.author.guild.id, channel_id=given_channel_id))
+                await AsyncDBGatewayActions().create(
+                    VoicemasterMaster(guild_id=ctx.author.guild.id,
+                                      channel_id=given_channel_id)
+                )
                 await ctx.channel.send("This VC has now been set as a VM parent")
                 new_vm_parent_channel = self.bot.get_channel(int(given_channel_id))
                 await self.bot.admin_log(
@@ -147,7 +162,7 @@ class VoicemasterCog(commands.Cog):
         Get a list of the current voice channels set as parent voice channels.
         :param ctx: The context of the command.
         """
-        parent_vm_exists = DBGatewayActions().list(VoicemasterMaster, guild_id=ctx.author.guild.id)
+        parent_vm_exists = await AsyncDBGatewayActions().list(VoicemasterMaster, guild_id=ctx.author.guild.id)
 
         if parent_vm_exists:
             parent_vm_str = str()
@@ -166,13 +181,13 @@ class VoicemasterCog(commands.Cog):
         :param given_channel_id: The ID of the voice channel to remove from being a parent voice channel.
         """
         if given_channel_id:
-            channel_exists = DBGatewayActions().get(
+            channel_exists = await AsyncDBGatewayActions().get(
                 VoicemasterMaster,
                 guild_id=ctx.author.guild.id,
                 channel_id=given_channel_id
             )
             if channel_exists:
-                DBGatewayActions().delete(channel_exists)
+                await AsyncDBGatewayActions().delete(channel_exists)
                 await ctx.channel.send(self.STRINGS['success_vm_unset'])
                 removed_vm_parent = self.bot.get_channel(given_channel_id)
                 await self.bot.admin_log(
@@ -203,9 +218,9 @@ class VoicemasterCog(commands.Cog):
         Remove all the current parent voice channels from the current server.
         :param ctx: The context of the command.
         """
-        all_vm_parents = DBGatewayActions().list(VoicemasterMaster, guild_id=ctx.author.guild.id)
+        all_vm_parents = await AsyncDBGatewayActions().list(VoicemasterMaster, guild_id=ctx.author.guild.id)
         for vm_parent in all_vm_parents:
-            DBGatewayActions().delete(vm_parent)
+            await AsyncDBGatewayActions().delete(vm_parent)
         await ctx.channel.send(self.STRINGS['success_vm_parents_cleared'])
         await self.bot.admin_log(
             responsible_user=ctx.author,
@@ -224,12 +239,12 @@ class VoicemasterCog(commands.Cog):
         Delete all the child voice channels, no matter if there are users in them or not.
         :param ctx: THe context of the command.
         """
-        all_vm_children = DBGatewayActions().list(VoicemasterSlave, guild_id=ctx.author.guild.id)
+        all_vm_children = await AsyncDBGatewayActions().list(VoicemasterSlave, guild_id=ctx.author.guild.id)
         for vm_child in all_vm_children:
             vm_child_channel = self.bot.get_channel(vm_child.channel_id)
             if vm_child_channel:
                 await vm_child_channel.delete()
-            DBGatewayActions().delete(vm_child)
+            await AsyncDBGatewayActions().delete(vm_child)
         await ctx.channel.send(self.STRINGS['success_vm_children_cleared'])
         await self.bot.admin_log(
             responsible_user=ctx.author,
@@ -251,7 +266,7 @@ class VoicemasterCog(commands.Cog):
         if not ctx.author.voice:
             await ctx.channel.send(self.STRINGS['error_not_in_vm_child'])
             return
-        in_vm_child = DBGatewayActions().get(
+        in_vm_child = await AsyncDBGatewayActions().get(
             VoicemasterSlave,
             guild_id=ctx.author.guild.id,
             channel_id=ctx.author.voice.channel.id
@@ -261,7 +276,7 @@ class VoicemasterCog(commands.Cog):
             if in_vm_child.owner_id == ctx.author.id:
                 if not in_vm_child.locked:
                     in_vm_child.locked = True
-                    DBGatewayActions().update(in_vm_child)
+                    await AsyncDBGatewayActions().update(in_vm_child)
                     await ctx.author.voice.channel.edit(user_limit=len(ctx.author.voice.channel.members))
                     await ctx.channel.send(self.STRINGS['success_child_locked'])
                     await self.bot.admin_log(
@@ -290,7 +305,7 @@ class VoicemasterCog(commands.Cog):
         if not ctx.author.voice:
             await ctx.channel.send(self.STRINGS['error_not_in_vm_child'])
             return
-        in_vm_child = DBGatewayActions().get(
+        in_vm_child = await AsyncDBGatewayActions().get(
             VoicemasterSlave,
             guild_id=ctx.author.guild.id,
             channel_id=ctx.author.voice.channel.id
@@ -300,7 +315,7 @@ class VoicemasterCog(commands.Cog):
             if in_vm_child.owner_id == ctx.author.id:
                 if in_vm_child.locked:
                     in_vm_child.locked = False
-                    DBGatewayActions().update(in_vm_child)
+                    await AsyncDBGatewayActions().update(in_vm_child)
                     await ctx.author.voice.channel.edit(user_limit=0)
                     await ctx.channel.send(self.STRINGS['success_child_unlocked'])
                     await self.bot.admin_log(
@@ -329,7 +344,7 @@ class VoicemasterCog(commands.Cog):
         if not ctx.author.voice:
             await ctx.channel.send(self.STRINGS['error_not_in_vm_child'])
             return
-        in_vm_child = DBGatewayActions().get(
+        in_vm_child = await AsyncDBGatewayActions().get(
             VoicemasterSlave,
             guild_id=ctx.author.guild.id,
             channel_id=ctx.author.voice.channel.id
@@ -372,7 +387,7 @@ class VoicemasterCog(commands.Cog):
                                                                             new_name=set_name)
                     }
                 )
-                DBGatewayActions().update(in_vm_child)
+                await AsyncDBGatewayActions().update(in_vm_child)
             else:
                 await ctx.channel.send(self.STRINGS['error_not_owned'])
         else:
@@ -5,7 +5,7 @@ from discord.ext import commands
 
 from esportsbot.DiscordReactableMenus.ExampleMenus import PollReactMenu
 from esportsbot.DiscordReactableMenus.reactable_lib import get_all_options
-from esportsbot.db_gateway import DBGatewayActions
+from esportsbot.db_gateway import AsyncDBGatewayActions
 from esportsbot.models import VotingMenus
 
 DELETE_ON_CREATE = os.getenv("DELETE_VOTING_CREATION", "FALSE").lower() == "true"
@@ -23,7 +23,7 @@ class VotingCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.logger = logging.getLogger(__name__)
-        self.db = DBGatewayActions()
+        self.db = AsyncDBGatewayActions()
         self.voting_menus = {}
         self.user_strings = bot.STRINGS["vote_reacts"]
         self.logger.info(f"Finished loading {__name__}... waiting for ready")
@@ -42,7 +42,7 @@ class VotingCog(commands.Cog):
         Loads saved role reaction menus from the DB for all guilds .
         :return: A dictionary of reaction menu IDs and their reaction menus .
         """
-        all_menus = self.db.list(VotingMenus)
+        all_menus = await self.db.list(VotingMenus)
         loaded_menus = {}
         for menu in all_menus:
             loaded_menus[menu.menu_id] = await PollReactMenu.from_dict(self.bot, menu.menu)
@@ -68,18 +68,18 @@ class VotingCog(commands.Cog):
 
         return voting_menu, True
 
-    def add_or_update_db(self, menu_id):
+    async def add_or_update_db(self, menu_id):
         """
         Creates a new DB item or updates an existing one for a given menu id .
         :param menu_id: The menu id to create or update .
         """
-        db_item = self.db.get(VotingMenus, menu_id=menu_id)
+        db_item = await self.db.get(VotingMenus, menu_id=menu_id)
         if db_item:
             db_item.menu = self.voting_menus.get(menu_id).to_dict()
-            self.db.update(db_item)
+            await self.db.update(db_item)
         else:
             db_item = VotingMenus(menu_id=menu_id, menu=self.voting_menus.get(menu_id).to_dict())
-            self.db.create(db_item)
+            await self.db.create(db_item)
 
     async def finalise_poll(self, menu):
         """
@@ -89,8 +89,8 @@ class VotingCog(commands.Cog):
         results = await menu.generate_results()
         await menu.message.channel.send(embed=results)
         self.voting_menus.pop(menu.id)
-        db_item = self.db.get(VotingMenus, menu_id=menu.id)
-        self.db.delete(db_item)
+        db_item = await self.db.get(VotingMenus, menu_id=menu.id)
+        await self.db.delete(db_item)
         await menu.message.delete()
 
     @commands.group(name="votes")
@@ -125,7 +125,7 @@ class VotingCog(commands.Cog):
         await voting_menu.finalise_and_send(self.bot, context.channel)
 
         self.voting_menus[voting_menu.id] = voting_menu
-        self.add_or_update_db(voting_menu.id)
+        await self.add_or_update_db(voting_menu.id)
         if DELETE_ON_CREATE:
             await context.message.delete()
 
@@ -147,7 +147,7 @@ class VotingCog(commands.Cog):
 
         voting_menu.add_option(emoji, description)
         await voting_menu.update_message()
-        self.add_or_update_db(voting_menu.id)
+        await self.add_or_update_db(voting_menu.id)
 
     @command_group.command(name="remove-option", aliases=["remove", "roption"])
     async def remove_poll_option(self, context: commands.Context, menu_id: int, emoji):
@@ -164,7 +164,7 @@ class VotingCog(commands.Cog):
 
         voting_menu.remove_option(emoji)
         await voting_menu.update_message()
-        self.add_or_update_db(voting_menu.id)
+        await self.add_or_update_db(voting_menu.id)
 
     @command_group.command(name="delete-poll", aliases=["delete", "del"])
     async def delete_poll(self, context: commands.Context, menu_id: int):
@@ -180,8 +180,8 @@ class VotingCog(commands.Cog):
 
         await voting_menu.message.delete()
         self.voting_menus.pop(voting_menu.id)
-        db_item = self.db.get(VotingMenus, menu_id=voting_menu.id)
-        self.db.delete(db_item)
+        db_item = await self.db.get(VotingMenus, menu_id=voting_menu.id)
+        await self.db.delete(db_item)
         await context.reply(self.user_strings["delete_menu"].format(menu_id=voting_menu.id))
 
     @command_group.command(name="end-poll", aliases=["finish", "complete", "end"])
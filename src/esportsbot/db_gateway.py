@@ -1,29 +1,112 @@
+import asyncio
+import copy
+import functools
 import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Tuple
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import and_, column, create_engine, inspect, update, values
+from sqlalchemy.exc import NoInspectionAvailable
+from sqlalchemy.orm import make_transient_to_detached, sessionmaker
 from sqlalchemy_utils import create_database, database_exists
 
-from esportsbot.models import base
+from esportsbot.lib import metrics
+from esportsbot.lib.cache import TTLCache
+from esportsbot.models import (DefaultRoles, GuildInfo, MusicChannels, PingableSettings, VoicemasterMaster, base)
 
 load_dotenv(dotenv_path=os.path.join("..", "secrets.env"))
 
 db_string = f"postgresql://{os.getenv('POSTGRES_USER')}:{os.getenv('POSTGRES_PASSWORD')}@{os.getenv('POSTGRES_HOST')}:5432/{os.getenv('POSTGRES_DB')}"
 
-db = create_engine(db_string)
+# Connection pool settings, each unit of work checks a connection out of this pool for as long as it needs it.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # Seconds before a pooled connection is replaced.
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "TRUE").lower() == "true"
+
+db = create_engine(
+    db_string,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING
+)
 
 if not database_exists(db.url):
     create_database(db.url)
 
-Session = sessionmaker(db)
-session = Session()
+# Objects are used on the event loop thread after their session has closed, so they must not be expired (and need to be
+# lazily re-loaded) when the session commits.
+Session = sessionmaker(db, expire_on_commit=False)
+
+# Every worker gets its own session, so there can be as many workers as there are connections in the pool.
+db_executor = ThreadPoolExecutor(max_workers=DB_POOL_SIZE + DB_MAX_OVERFLOW, thread_name_prefix="db_gateway")
+
+# Small, frequently read configuration tables. Reads of these models through the AsyncDBGatewayActions are served from
+# memory until the entry expires or the gateway writes to that model.
+CACHED_MODELS = {GuildInfo, MusicChannels, PingableSettings, DefaultRoles, VoicemasterMaster}
+DB_CACHE_SIZE = int(os.getenv("DB_CACHE_SIZE", "2048"))
+DB_CACHE_TTL = int(os.getenv("DB_CACHE_TTL", "300"))  # Seconds before a cached query is read from the database again.
+
+query_cache: TTLCache[Tuple, Any] = TTLCache(max_size=DB_CACHE_SIZE, ttl=DB_CACHE_TTL)
+# Incremented every time a cached model is written to, so that a read which started before the write does not put its
+# now stale result into the cache.
+model_generations = defaultdict(int)
+
+metrics.registry.stats_gauge(
+    "esportsbot_db_query_cache",
+    "Hits, misses, evictions and size of the cache of database queries.",
+    query_cache.stats
+)
 
 base.metadata.create_all(db)
 
 print("[DATABASE] - Models created")
 
 
+def ensure_indexes():
+    """
+    Creates any indexes declared on the models that are missing from the database. `create_all` only creates indexes
+    together with a new table, so this brings the tables of existing deployments up to date. An index that cannot be
+    created, such as a unique index over rows that are already duplicated, is reported and skipped so that the bot still
+    starts.
+    """
+    for table in base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=db, checkfirst=True)
+            except Exception as err:
+                print(f"[DATABASE] - Unable to create index {index.name} on {table.name} - {err}")
+
+
+ensure_indexes()
+
+print("[DATABASE] - Indexes checked")
+
+
+@contextmanager
+def session_scope():
+    """
+    Provides a session for a single unit of work. The work is committed if it succeeds and rolled back if it fails, and the
+    connection is always returned to the pool afterwards, so a failed query cannot affect any other unit of work.
+
+    Yields:
+        [Session]: [A new session bound to the pooled engine]
+    """
+    session = Session()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
 class DBGatewayActions:
     """
     Base class for handling database queries
@@ -41,8 +124,8 @@ class DBGatewayActions:
             [list]: [Returns a list of all models that fit the input models criteria]
         """
         try:
-            query = session.query(db_model).filter_by(**args).all()
-            return query
+            with session_scope() as session:
+                return session.query(db_model).filter_by(**args).all()
         except Exception as err:
             raise Exception(f"Error occurred when using list - {err}")
 
@@ -59,7 +142,8 @@ class DBGatewayActions:
             [list]: [Returns a list of all models that fit the input models criteria]
         """
         try:
-            query = session.query(db_model).filter_by(**args).all()
+            with session_scope() as session:
+                query = session.query(db_model).filter_by(**args).all()
             return query[0] if query != [] else query
         except Exception as err:
             raise Exception(f"Error occurred when using get - {err}")
@@ -67,14 +151,15 @@ class DBGatewayActions:
     @staticmethod
     def update(model):
         """
-        Method for updating a record in the database
+        Method for updating a record in the database. The changes are copied onto the record loaded in a new session, so the
+        given model is never attached to a session and can be updated again from another thread.
 
         Args:
             model (database_model): [A class that contains the necessary information for an entry]
         """
         try:
-            session.add(model)
-            session.commit()
+            with session_scope() as session:
+                session.merge(model)
         except Exception as err:
             raise Exception(f"Error occurred when using update - {err}")
 
@@ -87,8 +172,8 @@ class DBGatewayActions:
             model (database_model): [A class that contains the necessary information for an entry]
         """
         try:
-            session.delete(model)
-            session.commit()
+            with session_scope() as session:
+                session.delete(session.merge(model))
         except Exception as err:
             raise Exception(f"Error occurred when using delete - {err}")
 
@@ -101,7 +186,206 @@ class DBGatewayActions:
             model (database_model): [A class that contains the necessary information for an entry]
         """
         try:
-            session.add(model)
-            session.commit()
+            with session_scope() as session:
+                session.add(model)
         except Exception as err:
             raise Exception(f"Error occurred when using create - {err}")
+
+    @staticmethod
+    def increment(db_model, increments, *columns):
+        """
+        Method for adding to integer columns of many records with a single UPDATE statement
+
+        Args:
+            db_model (database_model): [The model to update in the database]
+            increments (dict): [The primary key of each record, in the order of the table's primary key columns, mapped to
+                                the amount to add to that record]
+            *columns (str): [The names of the columns to add the amounts to]
+        """
+        if not increments:
+            return
+        try:
+            table = db_model.__table__
+            key_columns = list(table.primary_key.columns)
+            # The increments are joined to the table as a VALUES list: UPDATE ... SET x = x + amount FROM (VALUES ...)
+            amounts = values(
+                *[column(x.name, x.type) for x in key_columns],
+                column("amount", table.c[columns[0]].type),
+                name="increments"
+            ).data([(*key, amount) for key, amount in increments.items()])
+            statement = update(table).where(and_(*[x == amounts.c[x.name] for x in key_columns])).values({
+                x: table.c[x] + amounts.c.amount
+                for x in columns
+            })
+            with session_scope() as session:
+                session.execute(statement)
+        except Exception as err:
+            raise Exception(f"Error occurred when using increment - {err}")
+
+
+async def run_in_db_executor(func, *args, **kwargs):
+    """
+    Runs a blocking database function in the database worker thread and waits for the result without blocking the event loop.
+
+    Args:
+        func (callable): [The blocking function to run]
+        *args, **kwargs: [The arguments to call the function with]
+
+    Returns:
+        [any]: [The return value of the function]
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, functools.partial(func, *args, **kwargs))
+
+
+def detached_copy(result):
+    """
+    Copies the column values of query results into new detached instances, so that whoever changes the copy does not change
+    the original. Values that are not model instances, or lists of them, are returned as they are.
+
+    Args:
+        result (any): [A model instance, a list of model instances or any other query result]
+
+    Returns:
+        [any]: [A copy of the result]
+    """
+    if isinstance(result, list):
+        return [detached_copy(x) for x in result]
+    try:
+        mapper = inspect(type(result))
+    except NoInspectionAvailable:
+        return result
+
+    instance = mapper.class_manager.new_instance()
+    for attr in mapper.column_attrs:
+        setattr(instance, attr.key, copy.deepcopy(getattr(result, attr.key)))
+    make_transient_to_detached(instance)
+    return instance
+
+
+async def cached_query(query_func, db_model, **args):
+    """
+    Runs a read query in the database worker thread, using the query cache for models in CACHED_MODELS.
+
+    Args:
+        query_func (callable): [The DBGatewayActions read method to run]
+        db_model (database_model): [The model to query in the database]
+        **args (model_attributes): [The attributes specified for the query]
+
+    Returns:
+        [any]: [The result of the query]
+    """
+    if db_model not in CACHED_MODELS:
+        return await run_in_db_executor(query_func, db_model, **args)
+
+    key = (db_model, query_func.__name__, tuple(sorted(args.items())))
+    result = query_cache.get(key)
+    if result is None:
+        generation = model_generations[db_model]
+        result = await run_in_db_executor(query_func, db_model, **args)
+        if generation == model_generations[db_model]:
+            query_cache.set(key, detached_copy(result))
+        return result
+
+    # Every caller gets its own copy of the cached instances, so changes made before (or without) an update are not seen
+    # by anyone else, and the same instance is never written from two database workers at once.
+    return detached_copy(result)
+
+
+async def invalidating_write(write_func, model):
+    """
+    Runs a write in the database worker thread, then removes any cached queries for the model that was written to.
+
+    Args:
+        write_func (callable): [The DBGatewayActions write method to run]
+        model (database_model): [A class that contains the necessary information for an entry]
+    """
+    db_model = type(model)
+    try:
+        await run_in_db_executor(write_func, model)
+    finally:
+        if db_model in CACHED_MODELS:
+            model_generations[db_model] += 1
+            query_cache.invalidate_where(lambda key: key[0] is db_model)
+
+
+class AsyncDBGatewayActions:
+    """
+    Awaitable versions of the DBGatewayActions queries, which should be used from within the event loop so that a slow
+    database round-trip does not block the bot. Reads of the models in CACHED_MODELS are cached.
+    """
+    @staticmethod
+    async def list(db_model, **args):
+        """
+        Method to return a list of results that suit the model criteria
+
+        Args:
+            db_model (database_model): [The model to query in the database]
+            **args (model_attributes): [The attributes specified for the query]
+
+        Returns:
+            [list]: [Returns a list of all models that fit the input models criteria]
+        """
+        return await cached_query(DBGatewayActions.list, db_model, **args)
+
+    @staticmethod
+    async def get(db_model, **args):
+        """
+        Method to return a record that suits the model criteria
+
+        Args:
+            db_model (database_model): [The model to query in the database]
+            **args (model_attributes): [The attributes specified for the query]
+
+        Returns:
+            [list]: [Returns a list of all models that fit the input models criteria]
+        """
+        return await cached_query(DBGatewayActions.get, db_model, **args)
+
+    @staticmethod
+    async def update(model):
+        """
+        Method for updating a record in the database
+
+        Args:
+            model (database_model): [A class that contains the necessary information for an entry]
+        """
+        await invalidating_write(DBGatewayActions.update, model)
+
+    @staticmethod
+    async def delete(model):
+        """
+        Method for deleting a record from the database
+
+        Args:
+            model (database_model): [A class that contains the necessary information for an entry]
+        """
+        await invalidating_write(DBGatewayActions.delete, model)
+
+    @staticmethod
+    async def create(model):
+        """
+        Method for adding a record to the database
+
+        Args:
+            model (database_model): [A class that contains the necessary information for an entry]
+        """
+        await invalidating_write(DBGatewayActions.create, model)
+
+    @staticmethod
+    async def increment(db_model, increments, *columns):
+        """
+        Method for adding to integer columns of many records with a single UPDATE statement
+
+        Args:
+            db_model (database_model): [The model to update in the database]
+            increments (dict): [The primary key of each record, in the order of the table's primary key columns, mapped to
+                                the amount to add to that record]
+            *columns (str): [The names of the columns to add the amounts to]
+        """
+        try:
+            await run_in_db_executor(DBGatewayActions.increment, db_model, increments, *columns)
+        finally:
+            if db_model in CACHED_MODELS:
+                model_generations[db_model] += 1
+                query_cache.invalidate_where(lambda key: key[0] is db_model)
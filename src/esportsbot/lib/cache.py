@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# Sentinel used to tell apart a cached None from a missing entry.
+_MISSING = object()
+
+
+class TTLCache(Generic[K, V]):
+    """
+    A size bounded mapping where every entry expires after a fixed number of seconds. When the cache is full the least
+    recently used entry is evicted to make room. The cache is safe to use from multiple threads.
+    """
+    def __init__(self, max_size: int, ttl: float):
+        """
+        :param int max_size: The maximum number of entries to hold before evicting the least recently used entry.
+        :param float ttl: The number of seconds an entry stays valid for after it was set.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[K, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        """
+        Get the value stored for a key, marking it as the most recently used entry.
+
+        :param K key: The key to look up.
+        :param default: The value to return if the key is not cached or has expired.
+        :return: The cached value, or the default if there was no valid entry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                self._entries.pop(key)
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: K, value: V):
+        """
+        Store a value for a key, evicting the least recently used entries if the cache is full.
+
+        :param K key: The key to store the value under.
+        :param V value: The value to store.
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        """
+        Remove a key from the cache.
+
+        :param K key: The key to remove.
+        :param default: The value to return if the key was not cached.
+        :return: The value that was removed, or the default if there was none.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def invalidate_where(self, predicate):
+        """
+        Remove every entry whose key matches the predicate.
+
+        :param predicate: A function taking a key and returning True if the entry should be removed.
+        """
+        with self._lock:
+            for key in [x for x in self._entries if predicate(x)]:
+                self._entries.pop(key)
+
+    def clear(self):
+        """
+        Remove every entry from the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the usage counters of the cache.
+
+        :return: A dictionary of the number of hits, misses, evictions and the current size of the cache.
+        """
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self._entries)}
@@ -2,13 +2,16 @@ from types import FrameType
 from discord.ext import commands
 from discord import Intents, Embed, Colour, Member, User
 from esportsbot.DiscordReactableMenus.EmojiHandler import MultiEmoji
-from esportsbot.db_gateway import DBGatewayActions
+from esportsbot.db_gateway import AsyncDBGatewayActions
 from esportsbot.lib.CustomHelpCommand import CustomHelpCommand
+from esportsbot.lib import metrics
+from esportsbot.lib.loop_monitor import LoopMonitor
 from esportsbot.models import GuildInfo
 from typing import Dict, MutableMapping, Union, Any
 from datetime import datetime
 import os
 import signal
+import time
 import asyncio
 import toml
 
@@ -30,6 +33,30 @@ class EsportsBot(commands.Bot):
         self.unknown_command_emoji = MultiEmoji(os.getenv("UNKNOWN_COMMAND_EMOJI", "⁉"))
         self.STRINGS: StringTable = toml.load(user_strings_file)
 
+        # Coroutine functions that are awaited before the bot logs out, used by cogs to save any state they hold in memory.
+        self.shutdown_tasks = []
+
+        # Optionally report lag and callbacks that block the event loop, to find handlers doing blocking work.
+        self.loop_monitor = None
+        if os.getenv("ENABLE_LOOP_MONITOR", "FALSE").lower() == "true":
+            self.loop_monitor = LoopMonitor(
+                self.loop,
+                slow_callback_threshold=float(os.getenv("LOOP_MONITOR_SLOW_CALLBACK_MS", "100")) / 1000,
+                sample_interval=float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "500")) / 1000
+            )
+            self.loop_monitor.start()
+            self.add_shutdown_task(self.loop_monitor.stop)
+
+        # Optionally record command and cog listener metrics, served for Prometheus on a local HTTP endpoint.
+        self.metrics_enabled = os.getenv("ENABLE_METRICS", "FALSE").lower() == "true"
+        self.metrics_server = None
+        self._timed_listeners = {}  # (Listener, event name): the listener wrapped to record its metrics
+        if self.metrics_enabled:
+            self.metrics_server = metrics.start_metrics_server(
+                int(os.getenv("METRICS_PORT", "9100")),
+                os.getenv("METRICS_ADDRESS", "127.0.0.1")
+            )
+
         signal.signal(signal.SIGINT, self.interrupt_received)  # keyboard interrupt
         signal.signal(signal.SIGTERM, self.interrupt_received)  # graceful exit request
 
@@ -47,8 +74,71 @@ class EsportsBot(commands.Bot):
         """Shut down the bot gracefully.
         """
         print("[EsportsBot] Shutting down...")
+        for shutdown_task in self.shutdown_tasks:
+            try:
+                await shutdown_task()
+            except Exception as e:
+                print(f"[EsportsBot] Shutdown task {shutdown_task.__qualname__} failed - {e}")
         await self.logout()
 
+    async def invoke(self, ctx: commands.Context):
+        """Invoke the command given in the context, recording how long it takes when metrics are enabled.
+        Errors are recorded by the `on_command_error` event, as the base invoke does not raise them.
+
+        :param commands.Context ctx: The context of the command to invoke.
+        """
+        if not self.metrics_enabled or ctx.command is None:
+            await super().invoke(ctx)
+            return
+
+        labels = {"cog": ctx.cog.qualified_name if ctx.cog else "", "command": ctx.command.qualified_name}
+        metrics.COMMANDS_IN_FLIGHT.inc(**labels)
+        start = time.perf_counter()
+        try:
+            await super().invoke(ctx)
+        finally:
+            metrics.COMMAND_LATENCY.observe(time.perf_counter() - start, **labels)
+            metrics.COMMANDS_IN_FLIGHT.dec(**labels)
+
+    def add_listener(self, func, name=None):
+        """Register an event listener. When metrics are enabled the listener is wrapped to record its latency and errors.
+
+        :param func: The coroutine function to call when the event is dispatched.
+        :param str name: The name of the event to listen for, defaults to the name of the function.
+        """
+        name = func.__name__ if name is None else name
+        if self.metrics_enabled:
+            cog = getattr(func, "__self__", None)
+            cog_name = cog.qualified_name if isinstance(cog, commands.Cog) else ""
+            timed_func = metrics.time_listener(func, name, cog_name)
+            self._timed_listeners[(func, name)] = timed_func
+            func = timed_func
+        super().add_listener(func, name)
+
+    def remove_listener(self, func, name=None):
+        """Remove an event listener, including the wrapper that records its metrics.
+
+        :param func: The coroutine function that was registered with `add_listener`.
+        :param str name: The name of the event the function was listening for.
+        """
+        name = func.__name__ if name is None else name
+        super().remove_listener(self._timed_listeners.pop((func, name), func), name)
+
+    def add_shutdown_task(self, shutdown_task):
+        """Register a coroutine function to be awaited when the bot shuts down.
+
+        :param shutdown_task: The coroutine function to await before the bot logs out.
+        """
+        self.shutdown_tasks.append(shutdown_task)
+
+    def remove_shutdown_task(self, shutdown_task):
+        """Stop a coroutine function from being awaited when the bot shuts down.
+
+        :param shutdown_task: The coroutine function that was registered with `add_shutdown_task`.
+        """
+        if shutdown_task in self.shutdown_tasks:
+            self.shutdown_tasks.remove(shutdown_task)
+
     async def admin_log(
         self,
         guild_id: int,
@@ -58,7 +148,7 @@ class EsportsBot(commands.Bot):
                                 User] = None,
         colour=None
     ):
-        guild_settings = DBGatewayActions().get(GuildInfo, guild_id=guild_id)
+        guild_settings = await AsyncDBGatewayActions().get(GuildInfo, guild_id=guild_id)
         if not guild_settings or not guild_settings.log_channel_id:
             return
         log_channel = await self.fetch_channel(guild_settings.log_channel_id)
@@ -0,0 +1,122 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Set
+
+
+class ExpiringIdSet:
+    """
+    A set of IDs where every ID is forgotten once a fixed window of time has passed since it was added, used to spot
+    messages that have been delivered more than once. IDs are grouped into buckets by the time they were added, and a whole
+    bucket is dropped at once when it falls out of the window, so the memory used stays in proportion to the number of IDs
+    added within a single window. The set is safe to use from multiple threads.
+    """
+    def __init__(self, window: float, bucket_length: float = 60, max_size: Optional[int] = None):
+        """
+        :param float window: The number of seconds an ID is remembered for. IDs are remembered for up to one extra bucket.
+        :param float bucket_length: The number of seconds of IDs grouped into each bucket.
+        :param max_size: The maximum number of IDs to hold. If the set is full the oldest buckets are dropped early, but
+                         the bucket IDs are currently being added to is always kept.
+        """
+        self.window = window
+        self.bucket_length = bucket_length
+        self.max_size = max_size
+        self._buckets: "OrderedDict[int, Set[Hashable]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, item: Hashable) -> bool:
+        with self._lock:
+            self._expire(time.time())
+            return any(item in x for x in self._buckets.values())
+
+    def add(self, item: Hashable) -> bool:
+        """
+        Add an ID to the set if it has not been seen within the window.
+
+        :param item: The ID to add.
+        :return: True if the ID was added, False if it had already been seen.
+        """
+        with self._lock:
+            now = time.time()
+            self._expire(now)
+            if any(item in x for x in self._buckets.values()):
+                self.hits += 1
+                return False
+
+            self.misses += 1
+            self._buckets.setdefault(self._bucket_of(now), set()).add(item)
+            self._size += 1
+            while self.max_size is not None and self._size > self.max_size and len(self._buckets) > 1:
+                self._drop_oldest_bucket()
+            return True
+
+    def _bucket_of(self, timestamp: float) -> int:
+        return int(timestamp // self.bucket_length)
+
+    def _expire(self, now: float):
+        """
+        Drop every bucket whose IDs were all added before the start of the window.
+
+        :param float now: The current time.
+        """
+        oldest_bucket = self._bucket_of(now - self.window)
+        while self._buckets and next(iter(self._buckets)) < oldest_bucket:
+            self._drop_oldest_bucket()
+
+    def _drop_oldest_bucket(self):
+        _, items = self._buckets.popitem(last=False)
+        self._size -= len(items)
+        self.evictions += len(items)
+
+    def save(self, path: str):
+        """
+        Write the IDs in the set to a file, so that they can be loaded again after a restart. The file is replaced
+        atomically, so a crash while saving cannot leave a partially written file behind.
+
+        :param str path: The path of the file to write to.
+        """
+        with self._lock:
+            self._expire(time.time())
+            data = {str(bucket): list(items) for bucket, items in self._buckets.items()}
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+
+    def load(self, path: str):
+        """
+        Add the IDs saved to a file by `save` to the set, ignoring any that have since expired. A missing file is ignored.
+
+        :param str path: The path of the file to read from.
+        """
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+
+        with self._lock:
+            for bucket, items in sorted(data.items(), key=lambda x: int(x[0])):
+                existing = self._buckets.setdefault(int(bucket), set())
+                self._size -= len(existing)
+                existing.update(items)
+                self._size += len(existing)
+            self._buckets = OrderedDict(sorted(self._buckets.items()))
+            self._expire(time.time())
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the usage counters of the set.
+
+        :return: A dictionary of the number of duplicate IDs seen, new IDs added, IDs expired and the current size.
+        """
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": self._size}
@@ -0,0 +1,34 @@
+import hashlib
+import hmac
+import json
+
+try:
+    # orjson is optional, but decodes the bodies of the requests from Twitch much faster when it is installed.
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+
+def verify_signature(secret, headers, body):
+    """
+    Using the headers and the body of a Twitch EventSub message, confirm weather or not the message was signed with the
+    secret of the subscription, and so came from Twitch.
+    :param secret: The secret given to Twitch when subscribing to the event.
+    :param headers: The request's headers.
+    :param body: The raw bytes of the body of the request, not decoded or turned into a dict or other kind of data.
+    :return: True if the signature provided in the header is the same as the calculated signature.
+    """
+    message_signature = headers.get("Twitch-Eventsub-Message-Signature")
+    message_id = headers.get("Twitch-Eventsub-Message-Id")
+    message_timestamp = headers.get("Twitch-Eventsub-Message-Timestamp")
+    if message_signature is None or message_id is None or message_timestamp is None:
+        return False
+
+    hmac_message_bytes = bytes(message_id + message_timestamp, "utf-8") + body
+    secret_bytes = bytes(secret, "utf-8")
+
+    calculated_signature = hmac.new(secret_bytes, hmac_message_bytes, hashlib.sha256)
+    expected_signature = b"sha256=" + calculated_signature.hexdigest().encode("ascii")
+
+    # Compared as bytes, as compare_digest raises a TypeError for strings that are not ASCII, which any header can contain.
+    return hmac.compare_digest(expected_signature, message_signature.encode("utf-8"))
@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+# Coroutines defined in files under this directory are the ones a slow callback is attributed to.
+_PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class LoopMonitor:
+    """
+    Measures how responsive the event loop is. Two things are tracked:
+
+    * Lag, found by repeatedly sleeping for a fixed interval and measuring how late the loop was in waking back up.
+    * Slow callbacks, found by timing every callback the loop runs. When a callback takes longer than the threshold, the
+      coroutines of this bot that the callback was running (eg: the cog listener or command and whatever it awaited) are
+      logged and recorded, so the handler that blocked the loop can be found.
+    """
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        slow_callback_threshold: float = 0.1,
+        sample_interval: float = 0.5,
+        history_size: int = 50
+    ):
+        """
+        :param asyncio.AbstractEventLoop loop: The event loop to monitor.
+        :param float slow_callback_threshold: The number of seconds a callback can run for before it is reported as slow.
+        :param float sample_interval: The number of seconds between each lag sample.
+        :param int history_size: The number of lag samples and slow callbacks to keep.
+        """
+        self.loop = loop
+        self.slow_callback_threshold = slow_callback_threshold
+        self.sample_interval = sample_interval
+        self.logger = logging.getLogger(__name__)
+
+        self.lag_samples = deque(maxlen=history_size)
+        self.max_lag = 0.0
+        self.slow_callbacks = deque(maxlen=history_size)  # The most recent slow callbacks, as (timestamp, duration, name)
+        self.slow_callback_totals: Dict[str, Dict[str, float]] = {}  # Name: {count, total, max}
+
+        self._original_run = None
+        self._sampler = None
+
+    @property
+    def running(self) -> bool:
+        return self._original_run is not None
+
+    def start(self):
+        """
+        Start sampling lag and timing the callbacks run by the loop.
+        """
+        if self.running:
+            return
+
+        monitor = self
+        original_run = asyncio.events.Handle._run
+
+        def _timed_run(handle):
+            if handle._loop is not monitor.loop:
+                return original_run(handle)
+            # The coroutines are found before running, as the task may finish (and drop its await chain) while running.
+            task = getattr(handle._callback, "__self__", None)
+            coroutines = _coroutine_chain(task) if isinstance(task, asyncio.Task) else None
+            start = time.perf_counter()
+            try:
+                return original_run(handle)
+            finally:
+                duration = time.perf_counter() - start
+                if duration >= monitor.slow_callback_threshold:
+                    monitor._record_slow_callback(handle, coroutines, duration)
+
+        self._original_run = original_run
+        asyncio.events.Handle._run = _timed_run
+        self._sampler = self.loop.create_task(self._sample_lag())
+        self.logger.info(
+            "Monitoring the event loop, reporting callbacks slower than %.0fms",
+            self.slow_callback_threshold * 1000
+        )
+
+    async def stop(self):
+        """
+        Stop sampling lag and restore the loop's original callback handling.
+        """
+        if not self.running:
+            return
+
+        asyncio.events.Handle._run = self._original_run
+        self._original_run = None
+        self._sampler.cancel()
+        self._sampler = None
+
+    async def _sample_lag(self):
+        """
+        Sleep for the sample interval in a loop, recording how much later than requested the loop woke up each time.
+        """
+        while True:
+            expected = self.loop.time() + self.sample_interval
+            await asyncio.sleep(self.sample_interval)
+            lag = max(self.loop.time() - expected, 0.0)
+            self.lag_samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+    def _record_slow_callback(self, handle: asyncio.Handle, coroutines: Optional[List], duration: float):
+        """
+        Log a callback that took longer than the threshold and add it to the recorded slow callbacks.
+        :param asyncio.Handle handle: The handle of the callback that was run.
+        :param coroutines: The chain of coroutines that were awaiting each other if the callback was a step of a task.
+        :param float duration: The number of seconds the callback ran for.
+        """
+        name = _describe_callback(handle, coroutines)
+        self.logger.warning("Event loop blocked for %.0fms by %s", duration * 1000, name)
+
+        self.slow_callbacks.append((time.time(), duration, name))
+        totals = self.slow_callback_totals.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+        totals["count"] += 1
+        totals["total"] += duration
+        totals["max"] = max(totals["max"], duration)
+
+    def lag_stats(self) -> Dict[str, float]:
+        """
+        Get the current, average and maximum lag of the event loop in seconds.
+        :return: A dictionary of the lag statistics.
+        """
+        if not self.lag_samples:
+            return {"current": 0.0, "average": 0.0, "max": self.max_lag}
+        return {
+            "current": self.lag_samples[-1],
+            "average": sum(self.lag_samples) / len(self.lag_samples),
+            "max": self.max_lag
+        }
+
+    def worst_callbacks(self, limit: int = 5) -> List:
+        """
+        Get the slow callbacks that have blocked the event loop for the most time in total.
+        :param int limit: The maximum number of callbacks to return.
+        :return: A list of (name, totals) tuples, ordered by the total time spent blocking.
+        """
+        return sorted(self.slow_callback_totals.items(), key=lambda x: x[1]["total"], reverse=True)[:limit]
+
+
+def _coroutine_chain(task: asyncio.Task) -> List:
+    """
+    Get the coroutines a task is running, from the outermost coroutine to the one that is currently awaiting.
+    :param asyncio.Task task: The task to get the coroutines of.
+    :return: A list of coroutine objects.
+    """
+    chain = []
+    coroutine = task.get_coro()
+    while coroutine is not None and (hasattr(coroutine, "cr_code") or hasattr(coroutine, "gi_code")):
+        chain.append(coroutine)
+        coroutine = getattr(coroutine, "cr_await", None) or getattr(coroutine, "gi_yieldfrom", None)
+    return chain
+
+
+def _describe_callback(handle: asyncio.Handle, coroutines: Optional[List]) -> str:
+    """
+    Get a readable name for the code a callback ran.
+    :param asyncio.Handle handle: The handle of the callback.
+    :param coroutines: The chain of coroutines the callback was running, if it was a step of a task.
+    :return: The names of this bot's coroutines in the chain, falling back to every coroutine in the chain or the name of
+             the callback.
+    """
+    if coroutines:
+        own_coroutines = [
+            x.__qualname__ for x in coroutines
+            if getattr(x, "cr_code", getattr(x, "gi_code", None)).co_filename.startswith(_PACKAGE_DIR)
+        ]
+        return " -> ".join(own_coroutines or [x.__qualname__ for x in coroutines])
+
+    callback = handle._callback
+    return getattr(callback, "__qualname__", repr(callback))
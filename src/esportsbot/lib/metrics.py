@@ -0,0 +1,279 @@
+import functools
+import logging
+import time
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import tornado.web
+from tornado.httpserver import HTTPServer
+
+# Upper bounds, in seconds, of the latency histogram buckets.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class Metric:
+    """
+    A named value that is tracked separately for each combination of label values, rendered in the Prometheus text format.
+    Metrics are only updated from the event loop, so they are not locked.
+    """
+    type_name = "untyped"
+
+    def __init__(self, name: str, description: str, label_names: Sequence[str] = ()):
+        """
+        :param str name: The name of the metric as it is exported.
+        :param str description: The help text exported with the metric.
+        :param label_names: The names of the labels each value of the metric is recorded under.
+        """
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self._values = {}
+
+    def _key(self, labels: Dict) -> Tuple:
+        return tuple(str(labels.get(x, "")) for x in self.label_names)
+
+    def _labels(self, key: Tuple, **extra) -> str:
+        pairs = list(zip(self.label_names, key)) + list(extra.items())
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def render(self) -> List[str]:
+        """
+        Get the lines of the Prometheus text format that describe this metric.
+        :return: A list of lines.
+        """
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.type_name}"]
+        for key, value in self._values.items():
+            lines.append(f"{self.name}{self._labels(key)} {value}")
+        return lines
+
+
+class Counter(Metric):
+    """
+    A value that only ever increases, such as the number of errors.
+    """
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """
+    A value that can go up and down, such as the number of commands currently running.
+    """
+    type_name = "gauge"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    """
+    Counts observations, such as latencies, into buckets so that percentiles can be calculated by the metrics server.
+    """
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        """
+        :param str name: The name of the metric as it is exported.
+        :param str description: The help text exported with the metric.
+        :param label_names: The names of the labels each value of the metric is recorded under.
+        :param buckets: The upper bounds of each bucket, in increasing order.
+        """
+        super().__init__(name, description, label_names)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        if key not in self._values:
+            # Counts of each bucket (not cumulative), the sum of the observations and the number of observations.
+            self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+        bucket_counts, _, _ = entry = self._values[key]
+        for i, upper_bound in enumerate(self.buckets):
+            if value <= upper_bound:
+                bucket_counts[i] += 1
+                break
+        entry[1] += value
+        entry[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.type_name}"]
+        for key, (bucket_counts, total, count) in self._values.items():
+            cumulative = 0
+            for upper_bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{self._labels(key, le=str(upper_bound))} {cumulative}")
+            lines.append(f"{self.name}_bucket{self._labels(key, le='+Inf')} {count}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {total}")
+            lines.append(f"{self.name}_count{self._labels(key)} {count}")
+        return lines
+
+
+class StatsGauge(Metric):
+    """
+    Reports the counters of an object that keeps its own statistics, such as a cache, read from it every time the metrics
+    are rendered. Each counter is exported under the "stat" label.
+    """
+    type_name = "gauge"
+
+    def __init__(self, name: str, description: str, stats: Callable[[], Dict[str, float]]):
+        """
+        :param str name: The name of the metric as it is exported.
+        :param str description: The help text exported with the metric.
+        :param stats: A function returning a dictionary of the name of each counter mapped to its current value.
+        """
+        super().__init__(name, description, ("stat", ))
+        self.stats = stats
+
+    def render(self) -> List[str]:
+        self._values = {(name, ): value for name, value in self.stats().items()}
+        return super().render()
+
+
+class MetricsRegistry:
+    """
+    The collection of metrics that are served by the metrics endpoint.
+    """
+    def __init__(self):
+        self.metrics: List[Metric] = []
+
+    def counter(self, name: str, description: str, label_names: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, description, label_names))
+
+    def gauge(self, name: str, description: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, description, label_names))
+
+    def histogram(self, name: str, description: str, label_names: Sequence[str] = ()) -> Histogram:
+        return self.register(Histogram(name, description, label_names))
+
+    def stats_gauge(self, name: str, description: str, stats: Callable[[], Dict[str, float]]) -> StatsGauge:
+        return self.register(StatsGauge(name, description, stats))
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def unregister(self, metric: Metric):
+        """
+        Stop serving a metric, such as one that reads the stats of an object that is being removed.
+        :param Metric metric: The metric to remove.
+        """
+        if metric in self.metrics:
+            self.metrics.remove(metric)
+
+    def render(self) -> str:
+        """
+        Get every metric in the Prometheus text format.
+        :return: The text to serve from the metrics endpoint.
+        """
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+COMMAND_LATENCY = registry.histogram(
+    "esportsbot_command_duration_seconds",
+    "Time taken to run a command, including its checks.",
+    ("cog",
+     "command")
+)
+COMMAND_ERRORS = registry.counter(
+    "esportsbot_command_errors_total",
+    "Number of commands that raised an error.",
+    ("cog",
+     "command",
+     "error")
+)
+COMMANDS_IN_FLIGHT = registry.gauge(
+    "esportsbot_commands_in_flight",
+    "Number of commands currently running.",
+    ("cog",
+     "command")
+)
+LISTENER_LATENCY = registry.histogram(
+    "esportsbot_listener_duration_seconds",
+    "Time taken to run a cog's event listener.",
+    ("cog",
+     "event")
+)
+LISTENER_ERRORS = registry.counter(
+    "esportsbot_listener_errors_total",
+    "Number of cog event listeners that raised an error.",
+    ("cog",
+     "event",
+     "error")
+)
+LISTENERS_IN_FLIGHT = registry.gauge(
+    "esportsbot_listeners_in_flight",
+    "Number of cog event listeners currently running.",
+    ("cog",
+     "event")
+)
+
+
+def time_listener(listener, event: str, cog: str):
+    """
+    Wrap an event listener so that its latency, errors and the number of running calls are recorded.
+    :param listener: The coroutine function that handles the event.
+    :param str event: The name of the event the listener handles.
+    :param str cog: The name of the cog the listener belongs to.
+    :return: A coroutine function that calls the listener.
+    """
+    @functools.wraps(listener)
+    async def timed_listener(*args, **kwargs):
+        LISTENERS_IN_FLIGHT.inc(cog=cog, event=event)
+        start = time.perf_counter()
+        try:
+            return await listener(*args, **kwargs)
+        except Exception as e:
+            LISTENER_ERRORS.inc(cog=cog, event=event, error=type(e).__name__)
+            raise
+        finally:
+            LISTENER_LATENCY.observe(time.perf_counter() - start, cog=cog, event=event)
+            LISTENERS_IN_FLIGHT.dec(cog=cog, event=event)
+
+    return timed_listener
+
+
+class MetricsHandler(tornado.web.RequestHandler):
+    """
+    Serves the metrics of the registry in the Prometheus text format.
+    """
+    def get(self):
+        self.set_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.write(registry.render())
+
+
+def start_metrics_server(port: int, address: str = "127.0.0.1") -> HTTPServer:
+    """
+    Start serving the metrics on /metrics.
+    :param int port: The port to listen on.
+    :param str address: The address to listen on. Defaults to only listening locally.
+    :return: The HTTP server serving the metrics.
+    """
+    http_server = HTTPServer(tornado.web.Application([(r"/metrics", MetricsHandler)]))
+    http_server.listen(port, address=address)
+    logging.getLogger(__name__).info("Serving metrics on http://%s:%d/metrics", address, port)
+    return http_server
@@ -0,0 +1,45 @@
+class Track:
+    """
+    A song in a queue. Only the data shown in the music channel and needed to stream the song is kept, as queues can hold
+    thousands of songs.
+    """
+    __slots__ = ("title", "thumbnail", "link", "stream_url", "codec")
+
+    def __init__(self, title, thumbnail, link, stream_url=None, codec=None):
+        """
+        :param title: The title of the song.
+        :param thumbnail: The URL of the thumbnail of the song.
+        :param link: The YouTube URL of the song.
+        :param stream_url: The URL of the audio stream of the song, once it has been extracted.
+        :param codec: The audio codec of the stream, once it has been extracted.
+        """
+        self.title = title
+        self.thumbnail = thumbnail
+        self.link = link
+        self.stream_url = stream_url
+        self.codec = codec
+
+    def with_stream(self, song_info):
+        """
+        Create a copy of this track that can be streamed, from the information extracted for it.
+        :param song_info: The information extracted for the song by yt-dlp.
+        :return: A new Track with the stream data set.
+        """
+        return Track(self.title, self.thumbnail, self.link, stream_url=song_info.get("url"), codec=song_info.get("acodec"))
+
+    def to_list(self):
+        """
+        Get the compact form of this track that is saved to the DB. The stream is not saved as it will have expired by the
+        time the track is loaded again.
+        :return: A list of the title, thumbnail and link of the track.
+        """
+        return [self.title, self.thumbnail, self.link]
+
+    @classmethod
+    def from_list(cls, track_data):
+        """
+        Create a track from its compact form saved in the DB.
+        :param track_data: A list of the title, thumbnail and link of the track.
+        :return: A new Track without a stream.
+        """
+        return cls(*track_data)
@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import aiohttp
+
+from esportsbot.lib import metrics
+
+WEBHOOK_URL = "https://discord.com/api/v9/webhooks/{hook_id}/{token}"
+
+# The maximum number of webhook messages being sent at once, across every webhook.
+WEBHOOK_CONCURRENCY = int(os.getenv("WEBHOOK_CONCURRENCY", "10"))
+# The number of times a message is sent again after being rate limited or after a server error.
+WEBHOOK_MAX_RETRIES = int(os.getenv("WEBHOOK_MAX_RETRIES", "3"))
+# Seconds to wait before the first retry after a server error, doubled for each retry after that.
+RETRY_BASE_DELAY = 0.5
+# The maximum number of seconds of random jitter added to each retry, so that retries of many webhooks do not line up.
+RETRY_JITTER = 0.5
+
+# An HTTP session, or a function returning one for sessions that are created lazily.
+SessionSource = Union[aiohttp.ClientSession, Callable[[], aiohttp.ClientSession]]
+
+WEBHOOK_LATENCY = metrics.registry.histogram(
+    "esportsbot_webhook_delivery_duration_seconds",
+    "Time taken to deliver a message to a Discord webhook, including retries.",
+    ("source",
+     "result")
+)
+WEBHOOK_RETRIES = metrics.registry.counter(
+    "esportsbot_webhook_retries_total",
+    "Number of webhook messages that were sent again after a rate limit or server error.",
+    ("source",
+     "reason")
+)
+
+
+class WebhookDispatcher:
+    """
+    Sends a message to many Discord webhooks at the same time, while staying within Discord's rate limits:
+
+    * Messages to the same webhook are sent one at a time, and wait for the webhook's rate limit bucket to reset when it
+      runs out.
+    * Every message waits for the global rate limit to reset if Discord reports it has been hit, and no more than
+      `WEBHOOK_CONCURRENCY` messages are sent at once.
+
+    Messages that are rate limited or fail with a server error are retried with jitter.
+
+    The dispatcher sends messages with the HTTP session of whatever owns it, and does not close that session.
+    """
+    def __init__(
+        self,
+        source: str,
+        session: SessionSource,
+        concurrency: int = WEBHOOK_CONCURRENCY,
+        max_retries: int = WEBHOOK_MAX_RETRIES
+    ):
+        """
+        :param str source: The name of what is sending the messages, used in the logs and metrics.
+        :param session: The HTTP session to send the messages with, or a function that returns it if the session is only
+                        created once it is first used.
+        :param int concurrency: The maximum number of messages to send at once.
+        :param int max_retries: The number of times to retry a message before giving up on it.
+        """
+        self.source = source
+        self._session = session
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.logger = logging.getLogger(__name__)
+
+        self._concurrency = asyncio.Semaphore(concurrency)
+        self._hook_locks: Dict[int, asyncio.Lock] = {}
+        self._hook_resets: Dict[int, float] = {}  # Hook ID: monotonic time the rate limit bucket of the hook resets at
+        self._global_reset = 0.0  # Monotonic time the global rate limit resets at
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """
+        The HTTP session the messages are sent with.
+        :return: An aiohttp ClientSession.
+        """
+        return self._session() if callable(self._session) else self._session
+
+    async def send(self, deliveries: Iterable[Tuple[int, str, dict]]) -> List[bool]:
+        """
+        Send messages to many webhooks at once.
+        :param deliveries: The (hook ID, hook token, message) of each message to send. The message is the JSON body of a
+                           Discord execute webhook request.
+        :return: A list of whether each message was delivered, in the same order as the deliveries.
+        """
+        return list(await asyncio.gather(*[self.deliver(*x) for x in deliveries]))
+
+    async def deliver(self, hook_id: int, token: str, message: dict) -> bool:
+        """
+        Send a message to a single webhook, retrying if it is rate limited or Discord has a server error.
+        :param int hook_id: The ID of the webhook.
+        :param str token: The token of the webhook.
+        :param dict message: The JSON body of a Discord execute webhook request.
+        :return: True if the message was delivered, False if it failed or ran out of retries.
+        """
+        start = time.perf_counter()
+        delivered = False
+        async with self._hook_locks.setdefault(hook_id, asyncio.Lock()):
+            for attempt in range(self.max_retries + 1):
+                await self._wait_for_rate_limits(hook_id)
+                retry_reason = await self._post(hook_id, token, message)
+                if retry_reason is None:
+                    delivered = True
+                    break
+                if retry_reason == "failed" or attempt == self.max_retries:
+                    break
+                WEBHOOK_RETRIES.inc(source=self.source, reason=retry_reason)
+                delay = 0.0 if retry_reason == "rate_limited" else RETRY_BASE_DELAY * 2**attempt
+                await asyncio.sleep(delay + random.uniform(0, RETRY_JITTER))
+
+        duration = time.perf_counter() - start
+        WEBHOOK_LATENCY.observe(duration, source=self.source, result="delivered" if delivered else "failed")
+        if delivered:
+            self.logger.info("Delivered %s message to webhook %s in %.0fms", self.source, hook_id, duration * 1000)
+        else:
+            self.logger.error("Unable to deliver %s message to webhook %s", self.source, hook_id)
+        return delivered
+
+    async def _wait_for_rate_limits(self, hook_id: int):
+        """
+        Wait until neither the global rate limit nor the rate limit of the webhook are exhausted.
+        :param int hook_id: The ID of the webhook about to be sent to.
+        """
+        reset_at = max(self._global_reset, self._hook_resets.get(hook_id, 0.0))
+        delay = reset_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _post(self, hook_id: int, token: str, message: dict) -> Optional[str]:
+        """
+        Make a single attempt at sending a message to a webhook, recording any rate limits Discord reports.
+        :param int hook_id: The ID of the webhook.
+        :param str token: The token of the webhook.
+        :param dict message: The JSON body of a Discord execute webhook request.
+        :return: None if the message was sent, else why it was not: "rate_limited" or "server_error" if it should be
+                 retried, or "failed" if it should not.
+        """
+        url = WEBHOOK_URL.format(hook_id=hook_id, token=token)
+        try:
+            async with self._concurrency:
+                async with self.session.post(url, json=message) as response:
+                    self._update_rate_limit(hook_id, response.headers)
+                    if response.status < 300:
+                        return None
+                    if response.status == 429:
+                        data = await response.json(content_type=None)
+                        reset_at = time.monotonic() + float(data.get("retry_after", 1))
+                        if data.get("global") or response.headers.get("X-RateLimit-Global"):
+                            self._global_reset = max(self._global_reset, reset_at)
+                        else:
+                            self._hook_resets[hook_id] = max(self._hook_resets.get(hook_id, 0.0), reset_at)
+                        return "rate_limited"
+                    if response.status >= 500:
+                        return "server_error"
+                    self.logger.error("Webhook %s rejected a %s message with status %d", hook_id, self.source, response.status)
+                    return "failed"
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.logger.warning("Error sending %s message to webhook %s: %s", self.source, hook_id, e)
+            return "server_error"
+
+    def _update_rate_limit(self, hook_id: int, headers):
+        """
+        Record when the rate limit bucket of a webhook resets if the last request used up the bucket.
+        :param int hook_id: The ID of the webhook.
+        :param headers: The headers of the response from Discord.
+        """
+        if headers.get("X-RateLimit-Remaining") == "0" and headers.get("X-RateLimit-Reset-After"):
+            self._hook_resets[hook_id] = time.monotonic() + float(headers.get("X-RateLimit-Reset-After"))
@@ -0,0 +1,58 @@
+import re
+from enum import IntEnum
+
+
+class MessageTypeEnum(IntEnum):
+    youtube_url = 0
+    youtube_playlist = 1
+    youtube_thumbnail = 2
+    string = 3
+    invalid = 4
+
+
+# Matches every common form of YouTube video, playlist and thumbnail URL, capturing the ID of whichever it is for. IDs
+# are only matched in full, so a URL with a truncated ID is treated as invalid rather than a different video.
+YOUTUBE_URL_PATTERN = re.compile(
+    r"(?:https?://)?(?:(?:www|m|music)\.)?(?:"
+    r"youtube\.com/(?:"
+    r"watch\?(?:[^#\s]*&)?v=(?P<video_id>[A-Za-z0-9_-]{11})"
+    r"|(?:shorts|embed|live|v)/(?P<path_video_id>[A-Za-z0-9_-]{11})"
+    r"|playlist\?(?:[^#\s]*&)?list=(?P<playlist_id>[A-Za-z0-9_-]+)"
+    r")"
+    r"|youtu\.be/(?P<short_video_id>[A-Za-z0-9_-]{11})"
+    r"|i\.ytimg\.com/vi(?:_webp)?/(?P<thumbnail_id>[A-Za-z0-9_-]{11})"
+    r")(?![A-Za-z0-9_-])",
+    re.IGNORECASE
+)
+
+
+def find_url_type(url):
+    """
+    Finds what kind of url the given url is, along with the ID of what it is for, in a single match.
+    :param url: The url to identify.
+    :return: A tuple of a MessageTypeEnum depicting what type of url the given url is and the ID of the video, playlist
+             or thumbnail the url is for, or None if the url is invalid.
+    """
+    match = YOUTUBE_URL_PATTERN.match(url)
+    if not match:
+        return MessageTypeEnum.invalid, None
+
+    if match.group("playlist_id"):
+        return MessageTypeEnum.youtube_playlist, match.group("playlist_id")
+    if match.group("thumbnail_id"):
+        return MessageTypeEnum.youtube_thumbnail, match.group("thumbnail_id")
+    video_id = match.group("video_id") or match.group("path_video_id") or match.group("short_video_id")
+    return MessageTypeEnum.youtube_url, video_id
+
+
+def find_request_type(request):
+    """
+    Find what kind of string the request is. If the string is a URL, determine what kind of URL it is.
+    :param request: The request to identify.
+    :return: A tuple of a MessageTypeEnum depicting the type of string and the ID of the YouTube video, playlist or
+             thumbnail the request is for, or None if the request is not a YouTube URL.
+    """
+    request_type, youtube_id = find_url_type(request.strip())
+    if request_type == MessageTypeEnum.invalid and not request.startswith(("https://", "http://")):
+        return MessageTypeEnum.string, None
+    return request_type, youtube_id
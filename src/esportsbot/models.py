@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, BigInteger, Boolean
+from sqlalchemy import Column, String, BigInteger, Boolean, Float, Index
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -18,6 +18,7 @@ __all__ = [
     "TwitchInfo",
     "TwitterInfo",
     "MusicChannels",
+    "MusicQueues",
     "base"
 ]
 
@@ -33,6 +34,7 @@ class DefaultRoles(base):
     default_roles_id = Column(BigInteger, primary_key=True, autoincrement=True, nullable=False)
     guild_id = Column(BigInteger, nullable=False)
     role_id = Column(BigInteger, nullable=False)
+    __table_args__ = (Index("ix_default_roles_guild_role", "guild_id", "role_id"), )
 
 
 class PingablePolls(base):
@@ -88,6 +90,7 @@ class VoicemasterMaster(base):
     master_id = Column(BigInteger, primary_key=True, autoincrement=True, nullable=False)
     guild_id = Column(BigInteger, nullable=False)
     channel_id = Column(BigInteger, nullable=False)
+    __table_args__ = (Index("ux_voicemaster_master_guild_channel", "guild_id", "channel_id", unique=True), )
 
 
 class VoicemasterSlave(base):
@@ -98,6 +101,7 @@ class VoicemasterSlave(base):
     owner_id = Column(BigInteger, nullable=False)
     locked = Column(Boolean, nullable=False)
     custom_name = Column(Boolean, nullable=False)
+    __table_args__ = (Index("ux_voicemaster_slave_guild_channel", "guild_id", "channel_id", unique=True), )
 
 
 class TwitchInfo(base):
@@ -107,6 +111,10 @@ class TwitchInfo(base):
     hook_id = Column(BigInteger, primary_key=True, nullable=False)
     twitch_handle = Column(String, nullable=False)
     custom_message = Column(String, nullable=True)
+    __table_args__ = (
+        Index("ix_twitch_info_hook", "hook_id"),
+        Index("ix_twitch_info_guild_hook", "guild_id", "hook_id"),
+    )
 
 
 class TwitterInfo(base):
@@ -115,6 +123,7 @@ class TwitterInfo(base):
     guild_id = Column(BigInteger, nullable=False)
     twitter_user_id = Column(String, nullable=False)
     twitter_handle = Column(String, nullable=False)
+    __table_args__ = (Index("ux_twitter_info_guild_user", "guild_id", "twitter_user_id", unique=True), )
 
 
 class MusicChannels(base):
@@ -124,3 +133,12 @@ class MusicChannels(base):
     channel_id = Column(BigInteger, nullable=False)
     queue_message_id = Column(BigInteger, nullable=False)
     preview_message_id = Column(BigInteger, nullable=False)
+    __table_args__ = (Index("ux_music_channels_guild", "guild_id", unique=True), )
+
+
+class MusicQueues(base):
+    __tablename__ = 'music_queues'
+    guild_id = Column(BigInteger, primary_key=True, nullable=False)
+    current_song = Column(JSONB, nullable=True)  # [title, thumbnail, link]
+    queue = Column(JSONB, nullable=False)  # A list of [title, thumbnail, link]
+    volume = Column(Float, nullable=False)
@@ -0,0 +1,123 @@
+"""
+Measures how responsive the event loop stays while event handlers make concurrent queries through the DB gateway, some of
+which are slow, compared to making the same queries with the blocking gateway on the event loop.
+
+The tests connect to the database configured by the POSTGRES_* variables, the same as the bot, so they are skipped unless
+POSTGRES_HOST is set.
+"""
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+pytestmark = pytest.mark.skipif(not os.getenv("POSTGRES_HOST"), reason="POSTGRES_HOST is not set")
+
+# Guild IDs far outside the range of real Discord snowflakes, so that the test cannot touch real guilds.
+TEST_GUILDS = [2**62 + x for x in range(10)]
+MESSAGE_HANDLERS = 20  # Concurrent handlers reading the settings of a guild, as on_message does.
+VOICE_HANDLERS = 5  # Concurrent handlers updating the settings of a guild, as on_voice_state_update does.
+EVENTS_PER_HANDLER = 20
+LOCK_SECONDS = 0.5  # How long the row of the first test guild is locked for, making every update of it slow.
+TICK_SECONDS = 0.01
+
+
+@pytest.fixture(scope="module")
+def gateway():
+    from esportsbot import db_gateway
+    from esportsbot.models import GuildInfo
+
+    for guild_id in TEST_GUILDS:
+        db_gateway.DBGatewayActions.update(GuildInfo(guild_id=guild_id, log_channel_id=None))
+    yield db_gateway
+    for guild_id in TEST_GUILDS:
+        db_gateway.DBGatewayActions.delete(GuildInfo(guild_id=guild_id))
+    db_gateway.query_cache.clear()
+
+
+def lock_guild_row(gateway, locked, release):
+    """
+    Hold a lock on the row of the first test guild in another connection, as a long running transaction would.
+    :param gateway: The db_gateway module.
+    :param threading.Event locked: Set once the row is locked.
+    :param threading.Event release: The lock is released once this is set.
+    """
+    from sqlalchemy import text
+
+    with gateway.session_scope() as session:
+        session.execute(text("SELECT * FROM guild_info WHERE guild_id = :g FOR UPDATE"), {"g": TEST_GUILDS[0]})
+        locked.set()
+        release.wait(LOCK_SECONDS)
+
+
+async def handle_events(gateway, db, handler_id, update):
+    """
+    Handle a stream of events the way the cogs do, reading the settings of a guild and, for voice events, updating them.
+    :param gateway: The db_gateway module.
+    :param db: The gateway to query through, either AsyncDBGatewayActions or the blocking DBGatewayActions.
+    :param int handler_id: The number of this handler, used to spread the handlers across the test guilds.
+    :param bool update: True to update the settings of the guild, as voice events do, else only read them.
+    """
+    from esportsbot.models import GuildInfo
+
+    for event in range(EVENTS_PER_HANDLER):
+        guild_id = TEST_GUILDS[(handler_id + event) % len(TEST_GUILDS)]
+        result = db.get(GuildInfo, guild_id=guild_id)
+        guild_info = await result if asyncio.iscoroutine(result) else result
+        if update:
+            guild_info.log_channel_id = handler_id * 1000 + event
+            result = db.update(guild_info)
+            if asyncio.iscoroutine(result):
+                await result
+        await asyncio.sleep(0)
+
+
+async def max_loop_lag(gateway, db):
+    """
+    Run the event handlers concurrently while a row they update is locked, and measure how late the event loop wakes up a
+    ticker in the meantime.
+    :return: The longest delay of a tick past when it was due, in seconds.
+    """
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            due = time.perf_counter() + TICK_SECONDS
+            await asyncio.sleep(TICK_SECONDS)
+            lags.append(time.perf_counter() - due)
+
+    locked, release = threading.Event(), threading.Event()
+    locker = threading.Thread(target=lock_guild_row, args=(gateway, locked, release))
+    locker.start()
+    locked.wait()
+
+    ticker_task = asyncio.ensure_future(ticker())
+    await asyncio.sleep(TICK_SECONDS)
+    await asyncio.gather(
+        *[handle_events(gateway, db, x, update=False) for x in range(MESSAGE_HANDLERS)],
+        *[handle_events(gateway, db, x, update=True) for x in range(VOICE_HANDLERS)]
+    )
+    done.set()
+    await ticker_task
+    release.set()
+    locker.join()
+    return max(lags)
+
+
+def test_loop_responsive_during_concurrent_queries(gateway):
+    blocking_lag = asyncio.run(max_loop_lag(gateway, gateway.DBGatewayActions))
+    gateway.query_cache.clear()
+    async_lag = asyncio.run(max_loop_lag(gateway, gateway.AsyncDBGatewayActions))
+    print(
+        f"\nMax event loop lag with {MESSAGE_HANDLERS} message and {VOICE_HANDLERS} voice handlers while a row is locked "
+        f"for {LOCK_SECONDS}s: {blocking_lag * 1000:.1f}ms blocking on the loop, {async_lag * 1000:.1f}ms through "
+        f"AsyncDBGatewayActions"
+    )
+
+    # Blocking on the loop stalls every handler until the lock is released, the async gateway only stalls the updates.
+    assert blocking_lag >= LOCK_SECONDS * 0.5
+    assert async_lag < 0.05
@@ -0,0 +1,91 @@
+import hashlib
+import hmac
+import json
+import time
+
+from esportsbot.lib.eventsub import json_loads, verify_signature
+
+SECRET = "subscription-secret"
+MESSAGE_ID = "befa7b53-d79d-478f-86b9-120f112b044e"
+TIMESTAMP = "2021-09-14T18:17:24.617393212Z"
+
+# A stream.online notification, as sent by Twitch.
+BODY = json.dumps({
+    "subscription": {
+        "id": "f1c2a387-161a-49f9-a165-0f21d7a4e1c4",
+        "type": "stream.online",
+        "version": "1",
+        "status": "enabled",
+        "cost": 0,
+        "condition": {
+            "broadcaster_user_id": "1337"
+        },
+        "transport": {
+            "method": "webhook",
+            "callback": "https://example.com/webhook"
+        },
+        "created_at": "2019-11-16T10:11:12.634234626Z"
+    },
+    "event": {
+        "id": "9001",
+        "broadcaster_user_id": "1337",
+        "broadcaster_user_login": "cool_user",
+        "broadcaster_user_name": "Cool_User",
+        "type": "live",
+        "started_at": "2020-10-11T10:11:12.123Z"
+    }
+}).encode("utf-8")
+
+
+def signed_headers(body=BODY, secret=SECRET):
+    signature = hmac.new(secret.encode("utf-8"), (MESSAGE_ID + TIMESTAMP).encode("utf-8") + body, hashlib.sha256)
+    return {
+        "Twitch-Eventsub-Message-Id": MESSAGE_ID,
+        "Twitch-Eventsub-Message-Timestamp": TIMESTAMP,
+        "Twitch-Eventsub-Message-Signature": "sha256=" + signature.hexdigest()
+    }
+
+
+def test_valid_signature():
+    assert verify_signature(SECRET, signed_headers(), BODY)
+
+
+def test_wrong_secret():
+    assert not verify_signature(SECRET, signed_headers(secret="another-secret"), BODY)
+
+
+def test_tampered_body():
+    assert not verify_signature(SECRET, signed_headers(), BODY.replace(b"1337", b"1338"))
+
+
+def test_missing_headers():
+    for header in signed_headers():
+        headers = signed_headers()
+        headers.pop(header)
+        assert not verify_signature(SECRET, headers, BODY)
+
+
+def test_non_ascii_signature():
+    headers = signed_headers()
+    headers["Twitch-Eventsub-Message-Signature"] = "sha256=éè" + "0" * 62
+    assert not verify_signature(SECRET, headers, BODY)
+
+
+def test_non_ascii_message_id():
+    headers = signed_headers()
+    headers["Twitch-Eventsub-Message-Id"] = "é" + MESSAGE_ID
+    assert not verify_signature(SECRET, headers, BODY)
+
+
+def test_verify_and_decode_throughput():
+    # Every request from Twitch is verified and then decoded, so a burst of notifications should be handled far faster
+    # than Twitch sends them.
+    headers = signed_headers()
+    iterations = 20000
+    start = time.perf_counter()
+    for _ in range(iterations):
+        assert verify_signature(SECRET, headers, BODY)
+        json_loads(BODY)
+    per_message = (time.perf_counter() - start) / iterations
+    print(f"verify_signature + {json_loads.__module__}.loads: {1 / per_message:.0f} messages/s")
+    assert per_message < 0.001
@@ -0,0 +1,138 @@
+"""
+Benchmarks how long a message of several song requests takes to queue when the lines are looked up concurrently by
+MusicCog.process_requests, against looking them up one after another with MusicCog.process_request as the music channel
+used to, and counts the edits made to the queue message for each message of requests.
+
+Looking up a song and extracting its stream are replaced with a fixed delay, so no requests are made to YouTube. Loading the
+cog connects to the database configured by the POSTGRES_* variables, the same as the bot, so the tests are skipped unless
+POSTGRES_HOST is set.
+"""
+import asyncio
+import os
+import time
+from collections import deque
+
+import pytest
+
+for module in ("discord", "yt_dlp", "googleapiclient", "youtubesearchpython"):
+    pytest.importorskip(module)
+
+pytestmark = pytest.mark.skipif(not os.getenv("POSTGRES_HOST"), reason="POSTGRES_HOST is not set")
+
+GUILD_ID = 2**62  # Far outside the range of real Discord snowflakes.
+LOOKUP_SECONDS = 0.05
+BATCH_SIZES = [1, 10, 50]
+
+
+class Bot:
+    """
+    The parts of the bot the cog uses while queueing songs.
+    """
+    STRINGS = {"music": {}, "command_error_generic": ""}
+    voice_clients = []
+
+    @property
+    def loop(self):
+        return asyncio.get_event_loop()
+
+    def add_shutdown_task(self, task):
+        pass
+
+
+class VoiceClient:
+    """
+    A voice client that is always playing, so that requests are only queued.
+    """
+    def is_playing(self):
+        return True
+
+    def is_paused(self):
+        return False
+
+
+class Message:
+    def __init__(self):
+        self.edits = 0
+
+    async def edit(self, **kwargs):
+        self.edits += 1
+
+
+@pytest.fixture
+def cog():
+    from esportsbot.cogs.MusicCog import MusicCog
+    from esportsbot.lib.track import Track
+
+    cog = MusicCog(Bot())
+    cog.active_guilds[GUILD_ID] = {
+        "voice_channel": None,
+        "voice_client": VoiceClient(),
+        "queue": deque(),
+        "current_song": None,
+        "volume": 1
+    }
+    cog.music_channels[GUILD_ID] = 1
+    cog.music_messages[GUILD_ID] = (Message(), Message())
+
+    async def resolve_request(request):
+        await asyncio.sleep(LOOKUP_SECONDS)
+        return [Track(request, "https://i.ytimg.com/vi/0/hqdefault.jpg", f"https://www.youtube.com/watch?v={request}")], None
+
+    async def extract_youtube_info(url, executor=None):
+        await asyncio.sleep(LOOKUP_SECONDS)
+        return {"url": url, "acodec": "opus"}
+
+    async def save_queue(guild_id):
+        pass
+
+    cog.resolve_request = resolve_request
+    cog.extract_youtube_info = extract_youtube_info
+    cog.save_queue = save_queue
+    return cog
+
+
+async def queue_batch(cog, requests, sequential):
+    """
+    Queue a message of song requests, then wait for the queue message to be updated.
+    :return: The seconds taken to queue the requests, and the number of edits made to the queue message.
+    """
+    queue_message = cog.music_messages[GUILD_ID][0]
+    edits_before = queue_message.edits
+    # Each batch is a separate message, sent long enough after the last one that its update is not delayed.
+    cog.last_message_updates.clear()
+
+    start = time.perf_counter()
+    if sequential:
+        results = [await cog.process_request(GUILD_ID, x) for x in requests]
+    else:
+        results = await cog.process_requests(GUILD_ID, requests)
+    elapsed = time.perf_counter() - start
+
+    await asyncio.gather(*cog.message_update_tasks)
+    assert all(results)
+    return elapsed, queue_message.edits - edits_before
+
+
+def test_concurrent_requests_are_faster(cog):
+    async def run():
+        timings = {}
+        for size in BATCH_SIZES:
+            for sequential in (True, False):
+                requests = [f"{'sequential' if sequential else 'concurrent'}-{size}-{x}" for x in range(size)]
+                timings[(size, sequential)] = await queue_batch(cog, requests, sequential)
+        return timings
+
+    timings = asyncio.run(run())
+    for size in BATCH_SIZES:
+        sequential_time, sequential_edits = timings[(size, True)]
+        concurrent_time, concurrent_edits = timings[(size, False)]
+        print(
+            f"\n{size} line(s) with a {LOOKUP_SECONDS * 1000:.0f}ms lookup each: {sequential_time * 1000:.0f}ms and "
+            f"{sequential_edits} queue edit(s) one line at a time, {concurrent_time * 1000:.0f}ms and {concurrent_edits} "
+            f"queue edit(s) concurrently ({sequential_time / concurrent_time:.1f}x)"
+        )
+        assert concurrent_edits == 1
+        if size > 1:
+            assert concurrent_time < sequential_time / 2
+        else:
+            assert concurrent_time < sequential_time + LOOKUP_SECONDS
@@ -0,0 +1,67 @@
+"""
+Compares the CPU time ffmpeg takes to stream a song to discord when an Opus stream is passed through, as it is at the
+default volume, against re-encoding it with a volume filter, as it is at any other volume. The ffmpeg arguments match the
+ones FFmpegOpusAudio and MusicCog.make_audio_source use.
+
+The tests need ffmpeg with the libopus encoder, so they are skipped if it is not installed.
+"""
+import resource
+import shutil
+import subprocess
+
+import pytest
+
+FFMPEG = shutil.which("ffmpeg")
+SONG_SECONDS = 60
+OPUS_BITRATE = 128  # kbps, the same as MusicCog.OPUS_BITRATE
+
+pytestmark = pytest.mark.skipif(FFMPEG is None, reason="ffmpeg is not installed")
+
+
+@pytest.fixture(scope="module")
+def opus_song(tmp_path_factory):
+    # A stereo Opus stream in a WebM container, like the audio-only formats YouTube serves.
+    path = tmp_path_factory.mktemp("music") / "song.webm"
+    subprocess.run(
+        [
+            FFMPEG,
+            "-loglevel", "error",
+            "-f", "lavfi", "-i", f"sine=frequency=440:duration={SONG_SECONDS}",
+            "-f", "lavfi", "-i", f"sine=frequency=660:duration={SONG_SECONDS}",
+            "-filter_complex", "amerge=inputs=2",
+            "-c:a", "libopus", "-b:a", "160k",
+            str(path)
+        ],
+        check=True
+    )
+    return path
+
+
+def stream_cpu_seconds(song, codec, options):
+    """
+    Stream a song the way FFmpegOpusAudio does, discarding the output.
+    :param song: The path of the song to stream.
+    :param codec: The Opus codec argument, "copy" to pass the stream through or "libopus" to re-encode it.
+    :param options: The extra output options MusicCog adds.
+    :return: The CPU time ffmpeg used, in seconds.
+    """
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    subprocess.run(
+        [FFMPEG, "-i", str(song)]
+        + ["-map_metadata", "-1", "-f", "opus", "-c:a", codec, "-ar", "48000", "-ac", "2", "-b:a", f"{OPUS_BITRATE}k"]
+        + ["-loglevel", "warning"] + options.split() + ["pipe:1"],
+        stdout=subprocess.DEVNULL,
+        check=True
+    )
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+
+
+def test_passthrough_cpu(opus_song):
+    passthrough = stream_cpu_seconds(opus_song, "copy", "-vn")
+    reencoded = stream_cpu_seconds(opus_song, "libopus", "-vn -filter:a volume=0.50")
+    print(
+        f"\nCPU time to stream {SONG_SECONDS}s of Opus: {passthrough * 1000:.0f}ms passed through at the default volume, "
+        f"{reencoded * 1000:.0f}ms re-encoded at another volume ({reencoded / max(passthrough, 1e-3):.1f}x)"
+    )
+    assert passthrough < reencoded / 2
@@ -0,0 +1,54 @@
+import tracemalloc
+from collections import deque
+
+from esportsbot.lib.track import Track
+
+QUEUE_LENGTH = 1000
+
+
+def make_song(i):
+    return (
+        f"Song number {i} (Official Music Video)",
+        f"https://i.ytimg.com/vi/{i:011d}/hqdefault.jpg",
+        f"https://www.youtube.com/watch?v={i:011d}",
+    )
+
+
+def allocated_bytes(build):
+    """
+    Measure the memory allocated by building a queue, not counting the strings shared by both kinds of queue.
+    :param build: A function that builds a queue from a list of (title, thumbnail, link) tuples.
+    :return: The number of bytes still allocated after building the queue, and the queue itself.
+    """
+    songs = [make_song(i) for i in range(QUEUE_LENGTH)]
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        queue = build(songs)
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return after - before, queue
+
+
+def test_track_queue_memory():
+    # Queue entries used to be dicts of the song details, held in a list.
+    dict_bytes, dict_queue = allocated_bytes(
+        lambda songs: [{"title": title, "thumbnail": thumbnail, "link": link} for title, thumbnail, link in songs]
+    )
+    track_bytes, track_queue = allocated_bytes(lambda songs: deque(Track(*x) for x in songs))
+    print(
+        f"\n{QUEUE_LENGTH} queued songs: {dict_bytes / 1024:.1f}KiB as a list of dicts, "
+        f"{track_bytes / 1024:.1f}KiB as a deque of Tracks ({track_bytes / dict_bytes:.0%})"
+    )
+    assert len(dict_queue) == len(track_queue) == QUEUE_LENGTH
+    assert track_bytes < dict_bytes
+
+
+def test_track_round_trip():
+    track = Track(*make_song(1))
+    assert Track.from_list(track.to_list()).to_list() == track.to_list()
+
+    streamable = track.with_stream({"url": "https://example.com/stream", "acodec": "opus", "formats": [{}] * 50})
+    assert (streamable.link, streamable.stream_url, streamable.codec) == (track.link, "https://example.com/stream", "opus")
+    assert track.stream_url is None
@@ -0,0 +1,118 @@
+import time
+
+import pytest
+
+from esportsbot.lib.youtube_urls import MessageTypeEnum, find_request_type, find_url_type
+
+VIDEO_ID = "dQw4w9WgXcQ"
+PLAYLIST_ID = "PLFgquLnL59alCl_2TQvOiD5Vgm1hCaGSI"
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        f"https://www.youtube.com/watch?v={VIDEO_ID}",
+        f"http://youtube.com/watch?v={VIDEO_ID}",
+        f"youtube.com/watch?v={VIDEO_ID}",
+        f"https://m.youtube.com/watch?v={VIDEO_ID}",
+        f"https://music.youtube.com/watch?v={VIDEO_ID}&feature=share",
+        f"https://www.youtube.com/watch?feature=share&v={VIDEO_ID}",
+        f"https://www.youtube.com/watch?app=desktop&t=42&v={VIDEO_ID}#comments",
+        f"https://www.youtube.com/watch?v={VIDEO_ID}&list={PLAYLIST_ID}&index=2",
+        f"https://WWW.YouTube.com/watch?v={VIDEO_ID}",
+        f"https://www.youtube.com/shorts/{VIDEO_ID}",
+        f"https://www.youtube.com/shorts/{VIDEO_ID}?feature=share",
+        f"https://www.youtube.com/embed/{VIDEO_ID}",
+        f"https://www.youtube.com/live/{VIDEO_ID}?si=abcDEF123",
+        f"https://www.youtube.com/v/{VIDEO_ID}",
+        f"https://youtu.be/{VIDEO_ID}",
+        f"https://youtu.be/{VIDEO_ID}?si=Xy-Z_0123456789",
+        f"https://youtu.be/{VIDEO_ID}?t=30",
+        f"youtu.be/{VIDEO_ID}",
+    ]
+)
+def test_video_urls(url):
+    assert find_url_type(url) == (MessageTypeEnum.youtube_url, VIDEO_ID)
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        f"https://www.youtube.com/playlist?list={PLAYLIST_ID}",
+        f"https://music.youtube.com/playlist?list={PLAYLIST_ID}",
+        f"https://m.youtube.com/playlist?si=abc&list={PLAYLIST_ID}",
+        f"https://www.youtube.com/playlist?list={PLAYLIST_ID}#top",
+    ]
+)
+def test_playlist_urls(url):
+    assert find_url_type(url) == (MessageTypeEnum.youtube_playlist, PLAYLIST_ID)
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        f"https://i.ytimg.com/vi/{VIDEO_ID}/hqdefault.jpg",
+        f"https://i.ytimg.com/vi/{VIDEO_ID}/maxresdefault.jpg?sqp=-oaymwE",
+        f"https://i.ytimg.com/vi_webp/{VIDEO_ID}/sddefault.webp",
+    ]
+)
+def test_thumbnail_urls(url):
+    assert find_url_type(url) == (MessageTypeEnum.youtube_thumbnail, VIDEO_ID)
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        # Truncated or over-long IDs.
+        "https://www.youtube.com/watch?v=dQw4w9WgXc",
+        f"https://www.youtube.com/watch?v={VIDEO_ID}X",
+        "https://youtu.be/dQw4w9",
+        f"https://www.youtube.com/shorts/{VIDEO_ID}abc",
+        # No video or playlist.
+        "https://www.youtube.com/",
+        "https://www.youtube.com/watch",
+        "https://www.youtube.com/watch?list=",
+        f"https://www.youtube.com/watch?vv={VIDEO_ID}",
+        "https://www.youtube.com/channel/UCuAXFkgsw1L7xaCfnd5JJOw",
+        "https://www.youtube.com/@FragSoc",
+        # Lookalike hosts and other sites.
+        f"https://www.youtube.co/watch?v={VIDEO_ID}",
+        f"https://youtube.com.evil.example/watch?v={VIDEO_ID}",
+        f"https://notyoutube.com/watch?v={VIDEO_ID}",
+        f"https://gaming.youtube.com/watch?v={VIDEO_ID}",
+        f"https://youtu.bee/{VIDEO_ID}",
+        f"https://vimeo.com/watch?v={VIDEO_ID}",
+        f"https://example.com/?next=https://youtu.be/{VIDEO_ID}",
+        f"https://i.ytimg.com/vi/{VIDEO_ID[:-1]}/hqdefault.jpg",
+        f"ftp://youtu.be/{VIDEO_ID}",
+        "",
+    ]
+)
+def test_invalid_urls(url):
+    assert find_url_type(url) == (MessageTypeEnum.invalid, None)
+
+
+def test_request_types():
+    assert find_request_type(f"  https://youtu.be/{VIDEO_ID}  ") == (MessageTypeEnum.youtube_url, VIDEO_ID)
+    assert find_request_type("never gonna give you up") == (MessageTypeEnum.string, None)
+    assert find_request_type("https://vimeo.com/76979871") == (MessageTypeEnum.invalid, None)
+
+
+def test_classifier_speed():
+    # The classifier runs for every line of every song request, so it should stay well under a millisecond per URL, even
+    # for long URLs that do not match.
+    urls = [
+        f"https://www.youtube.com/watch?v={VIDEO_ID}",
+        f"https://youtu.be/{VIDEO_ID}?si=Xy-Z_0123456789",
+        f"https://www.youtube.com/playlist?list={PLAYLIST_ID}",
+        "never gonna give you up",
+        "https://www.youtube.com/watch?" + "&".join(f"param{x}=value" for x in range(200)),
+    ]
+    iterations = 2000
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for url in urls:
+            find_request_type(url)
+    per_url = (time.perf_counter() - start) / (iterations * len(urls))
+    print(f"find_request_type: {per_url * 1e6:.2f}us per URL")
+    assert per_url < 0.001